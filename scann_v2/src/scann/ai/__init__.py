@@ -1,5 +1,12 @@
 """AI layer - model definition, inference, training."""
 
-from scann.ai.training_worker import TrainingWorker
-
 __all__ = ["TrainingWorker"]
+
+
+def __getattr__(name):
+    # 延迟导入: TrainingWorker 依赖 torch, 仅在实际访问时加载
+    if name == "TrainingWorker":
+        from scann.ai.training_worker import TrainingWorker
+
+        return TrainingWorker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
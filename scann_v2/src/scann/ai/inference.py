@@ -9,15 +9,21 @@
 
 from __future__ import annotations
 
+import functools
+import heapq
+import math
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import numpy as np
-import torch
-from torchvision import transforms
 
 from scann.core.models import Candidate, Detection, MarkerType
 
+if TYPE_CHECKING:
+    import torch
+
+# torch/torchvision 在首次推理或加载模型时才导入, 仅用到 GUI 的场景无需承担其导入开销
+
 
 @dataclass
 class InferenceConfig:
@@ -27,6 +33,222 @@ class InferenceConfig:
     use_amp: bool = True       # 混合精度
     device: str = "auto"       # "auto", "cuda:0", "cpu"
     model_format: str = "auto" # "auto", "v1_classifier", "v2_classifier"
+    compile_model: bool = False  # 用 torch.compile 融合滑动窗口预处理与前向
+    min_std: float = 0.0       # 滑动窗口标准差低于此值视为平坦背景, 跳过推理 (绝对值, 依赖数据单位; ≤0 关闭)
+    # 两级 NMS (可选): 设置后检测数超过 pre_nms_topk 时按分块先做局部 NMS, 结果可能与全局 NMS 不同
+    pre_nms_topk: Optional[int] = None  # 每个分块进入 NMS 的最大检测数 (None: 始终全局 NMS)
+    post_nms_topk_per_tile: Optional[int] = None  # 每个分块 NMS 后保留的最大检测数 (None: 不截断)
+    nms_tile_size: int = 2048          # NMS 分块边长 (像素)
+
+
+def _intersection_union(
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+    areas: np.ndarray,
+    i: int,
+    rest: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """第 i 个框与 rest 中各框的交集/并集面积 (广播, 不做除法)
+
+    Args:
+        x1, y1, x2, y2: 各框坐标数组 (M,)
+        areas: 各框面积 (M,)
+        i: 基准框索引
+        rest: 比较框索引数组
+
+    Returns:
+        (交集面积, 并集面积), 形状均为 rest.shape
+    """
+    iw = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+    ih = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+    inter = iw * ih
+    return inter, areas[i] + areas[rest] - inter
+
+
+def _iou_below(
+    inter: np.ndarray,
+    union: np.ndarray,
+    iou_threshold: float,
+    has_degenerate: bool = True,
+) -> np.ndarray:
+    """IoU < 阈值 的掩码, 不做除法
+
+    union > 0 时 inter / union < t ⇔ inter < t × union;
+    union ≤ 0 时 IoU 视为 0, 掩码为 0 < t。
+
+    Args:
+        inter: 交集面积
+        union: 并集面积
+        iou_threshold: IoU 阈值
+        has_degenerate: 是否可能出现 union ≤ 0 (调用方确定没有零面积框时传 False)
+
+    Returns:
+        布尔掩码, 形状同 inter
+    """
+    below = inter < iou_threshold * union
+    if has_degenerate:
+        below = np.where(union > 0, below, 0.0 < iou_threshold)
+    return below
+
+
+def _nms_numpy(
+    boxes: np.ndarray, scores: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """向量化 NMS (纯 NumPy, 不依赖 torch/torchvision)
+
+    每轮保留剩余中置信度最高的框, 用广播一次算出它与其余框的交集/并集,
+    IoU ≥ 阈值 (inter ≥ 阈值 × union, 不做除法) 的框被抑制。
+
+    Args:
+        boxes: 边界框数组 (M, 4), [x1, y1, x2, y2]
+        scores: 置信度数组 (M,)
+        iou_threshold: IoU 阈值
+
+    Returns:
+        保留框的索引 (按置信度降序)
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    widths = x2 - x1
+    heights = y2 - y1
+    areas = widths * heights
+    # 稳定排序: 置信度相同时保持原始顺序
+    order = np.argsort(-scores, kind="stable")
+
+    # 滑动窗口产生的框尺寸相同: 重叠 = max(0, W-|Δx|) * max(0, H-|Δy|),
+    # 并集 = 2WH - 重叠, 省去逐对 min/max
+    same_size = (
+        widths.size > 0
+        and bool(np.all(widths == widths[0]))
+        and bool(np.all(heights == heights[0]))
+    )
+    if same_size:
+        box_w, box_h = widths[0], heights[0]
+        double_area = 2.0 * box_w * box_h
+
+    # 只有零面积框之间 union 才可能 ≤ 0 (此时 IoU 视为 0), 无此类框时跳过修正
+    has_degenerate = bool(np.any(areas <= 0))
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        if same_size:
+            iw = np.maximum(0.0, box_w - np.abs(x1[rest] - x1[i]))
+            ih = np.maximum(0.0, box_h - np.abs(y1[rest] - y1[i]))
+            inter = iw * ih
+            union = double_area - inter
+        else:
+            inter, union = _intersection_union(x1, y1, x2, y2, areas, i, rest)
+
+        order = rest[_iou_below(inter, union, iou_threshold, has_degenerate)]
+
+    return np.array(keep, dtype=np.intp)
+
+
+def _nms_matrix(
+    boxes: np.ndarray, scores: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """一次算出全部框对的抑制关系, 再按置信度顺序贪心遍历
+
+    按置信度排序后只需上三角 (高分框抑制低分框); 框数较少时
+    一次 M×M 广播比逐轮广播的 Python 循环开销更小。
+
+    Args:
+        boxes: 边界框数组 (M, 4), [x1, y1, x2, y2]
+        scores: 置信度数组 (M,)
+        iou_threshold: IoU 阈值
+
+    Returns:
+        保留框的索引 (按置信度降序), 与 _nms_numpy 一致
+    """
+    # 稳定排序: 置信度相同时保持原始顺序
+    order = np.argsort(-scores, kind="stable")
+    x1, y1, x2, y2 = boxes[order].T
+    areas = (x2 - x1) * (y2 - y1)
+
+    iw = np.maximum(0.0, np.minimum.outer(x2, x2) - np.maximum.outer(x1, x1))
+    ih = np.maximum(0.0, np.minimum.outer(y2, y2) - np.maximum.outer(y1, y1))
+    inter = iw * ih
+    union = areas[:, None] + areas[None, :] - inter
+    below = _iou_below(inter, union, iou_threshold, bool(np.any(areas <= 0)))
+    suppress = np.triu(~below, k=1)
+
+    suppressed = np.zeros(order.size, dtype=bool)
+    keep = []
+    for a in range(order.size):
+        if suppressed[a]:
+            continue
+        keep.append(order[a])
+        suppressed |= suppress[a]
+    return np.array(keep, dtype=np.intp)
+
+
+# _nms 从 Detection 列表提取的字段 (float64: 整数坐标与阈值比较保持精确)
+_NMS_RECORD = np.dtype([
+    ("x", np.float64),
+    ("y", np.float64),
+    ("half_w", np.float64),
+    ("half_h", np.float64),
+    ("score", np.float64),
+])
+
+# 检测数超过此值且安装了 numba 时, NMS 改用 JIT 内核 (小输入用 NumPy 即可)
+_NUMBA_NMS_MIN_DETECTIONS = 64
+# 检测数不超过此值时用 _nms_matrix (M×M 矩阵更大时内存带宽反而成为瓶颈)
+_NMS_MATRIX_MAX_DETECTIONS = 256
+
+
+def _inference_mode(fn):
+    """以 torch.inference_mode() 执行被装饰的方法 (延迟导入 torch)"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        import torch
+
+        with torch.inference_mode():
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _probability_to_logit(p: float) -> float:
+    """二分类概率阈值转换为 logit 差阈值
+
+    softmax(l)[1] > p  ⇔  l[1] - l[0] > log(p / (1 - p))
+    """
+    if p <= 0.0:
+        return -math.inf
+    if p >= 1.0:
+        return math.inf
+    return math.log(p / (1.0 - p))
+
+
+def _prepare_windows(batch: torch.Tensor) -> torch.Tensor:
+    """滑动窗口批次预处理
+
+    逐窗口 min-max 归一化到 0~1 (平坦窗口保持原值), 并扩展为 3 通道。
+    整批一次完成, 可在设备端执行, 也可被 torch.compile 与前向融合。
+
+    Args:
+        batch: (N, 1, P, P) float32
+
+    Returns:
+        (N, 3, P, P) 张量
+    """
+    import torch
+
+    flat = batch.flatten(1)
+    mins = flat.amin(dim=1)
+    ranges = flat.amax(dim=1) - mins
+    is_flat = ranges <= 0
+    mins = torch.where(is_flat, torch.zeros_like(mins), mins)
+    ranges = torch.where(is_flat, torch.ones_like(ranges), ranges)
+    normalized = (batch - mins.view(-1, 1, 1, 1)) / ranges.view(-1, 1, 1, 1)
+    return normalized.expand(-1, 3, -1, -1)
 
 
 class InferenceEngine:
@@ -39,14 +261,21 @@ class InferenceEngine:
     ):
         self.config = config or InferenceConfig()
         self.device = self._resolve_device()
-        self.model = None
+        self._model = None
         self._threshold = 0.5
         self._channel_order = (0, 1, 2)  # 默认通道顺序
+        self._batch_buf: Optional[np.ndarray] = None  # 滑动窗口批次缓冲区
+        self._window_forward = None  # 预处理 + 前向 (可选 torch.compile)
 
         if model_path:
             self._load_model(model_path)
+            # 预先编译 NMS 内核 (未安装 numba 时为空操作), 首次推理不再承担 JIT 开销
+            from scann.ai._nms_numba import warm_up
+            warm_up()
 
     def _resolve_device(self) -> torch.device:
+        import torch
+
         if self.config.device == "auto":
             if torch.cuda.is_available():
                 return torch.device("cuda:0")
@@ -57,6 +286,7 @@ class InferenceEngine:
         """加载模型 (自动检测 v1/v2 格式)"""
         import logging
         _logger = logging.getLogger(__name__)
+        import torch
         from scann.ai.model import ModelFormat, SCANNClassifier
 
         # 解析模型格式
@@ -70,6 +300,11 @@ class InferenceEngine:
         )
         self._model_format = fmt
 
+        # NHWC 布局: oneDNN / Ampere+ 卷积内核沿连续的通道维分块
+        self.model.to(memory_format=torch.channels_last)
+        self.model.eval()
+        self._window_forward = self._build_window_forward()
+
         # 尝试读取保存的阈值和元数据
         ckpt = torch.load(path, map_location="cpu", weights_only=False)
         if isinstance(ckpt, dict):
@@ -116,6 +351,16 @@ class InferenceEngine:
     V2_NORMALIZE_MEAN = (0.26, 0.27, 0.27)
     V2_NORMALIZE_STD = (0.09, 0.11, 0.11)
 
+    @property
+    def model(self):
+        """当前模型; 重新赋值时丢弃已构建的滑动窗口前向"""
+        return self._model
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+        self._window_forward = None
+
     @property
     def is_ready(self) -> bool:
         return self.model is not None
@@ -140,7 +385,7 @@ class InferenceEngine:
         """模型训练时使用的通道顺序"""
         return self._channel_order
 
-    @torch.no_grad()
+    @_inference_mode
     def classify_patches(
         self,
         patches: List[np.ndarray],
@@ -162,6 +407,9 @@ class InferenceEngine:
         if not patches:
             return []
 
+        import torch
+        from torchvision import transforms
+
         # 根据模型格式自动选择归一化常数
         if normalize_mean is None or normalize_std is None:
             if self.is_v1:
@@ -186,7 +434,9 @@ class InferenceEngine:
                 t = norm(t)
                 tensors.append(t)
 
-            stack = torch.stack(tensors).to(self.device)
+            stack = torch.stack(tensors).to(
+                self.device, memory_format=torch.channels_last
+            )
 
             if self.config.use_amp and self.device.type == "cuda":
                 with torch.amp.autocast("cuda"):
@@ -199,6 +449,7 @@ class InferenceEngine:
 
         return all_probs
 
+    @_inference_mode
     def detect_full_image(
         self,
         image: np.ndarray,
@@ -219,11 +470,11 @@ class InferenceEngine:
         Returns:
             检测结果列表
         """
-        from skimage.transform import resize
-
         if self.model is None:
             return []
 
+        import torch
+
         height, width = image.shape[:2]
 
         # 如果图像小于窗口大小，先进行填充
@@ -233,59 +484,186 @@ class InferenceEngine:
             image = padded
             height, width = patch_size, patch_size
 
-        # 收集所有窗口的检测结果
-        all_detections = []
-
-        # 滑动窗口遍历
-        for y in range(0, height - patch_size + 1, stride):
-            for x in range(0, width - patch_size + 1, stride):
-                # 提取窗口
-                patch = image[y:y+patch_size, x:x+patch_size]
-
-                # 归一化
-                if patch.max() > patch.min():
-                    patch = (patch - patch.min()) / (patch.max() - patch.min())
-
-                # 转换为张量并添加 batch 和 channel 维度
-                patch_tensor = torch.from_numpy(patch).float()
-                patch_tensor = patch_tensor.unsqueeze(0).unsqueeze(0)  # (1, 1, H, W)
-
-                # 重复为 3 通道（如果模型期望 RGB 输入）
-                patch_tensor = patch_tensor.repeat(1, 3, 1, 1)
-
-                # 推理
-                with torch.no_grad():
-                    patch_tensor = patch_tensor.to(self.device)
-                    output = self.model(patch_tensor)
-
-                # 获取概率
-                probs = torch.softmax(output, dim=1)[0, 1].cpu().item()
-
-                # 如果置信度超过阈值，添加到结果
-                if probs > self._threshold:
-                    # 计算窗口中心坐标
-                    center_x = int(x + patch_size / 2.0)
-                    center_y = int(y + patch_size / 2.0)
-
-                    # 边界框大小
-                    bbox_width = patch_size
-                    bbox_height = patch_size
-
-                    detection = Detection(
-                        x=center_x,
-                        y=center_y,
-                        width=bbox_width,
-                        height=bbox_height,
-                        confidence=probs,
-                        marker_type=MarkerType.BOUNDING_BOX
-                    )
-                    all_detections.append(detection)
+        # 窗口原点网格 (SoA): 第 i 个窗口左上角为 (x0[i], y0[i])
+        n_rows = (height - patch_size) // stride + 1
+        n_cols = (width - patch_size) // stride + 1
+        n_windows = n_rows * n_cols
+        yy, xx = np.meshgrid(
+            np.arange(n_rows) * stride, np.arange(n_cols) * stride, indexing="ij"
+        )
+        y0 = yy.ravel()
+        x0 = xx.ravel()
+        half = patch_size / 2.0
+        center_x = (x0 + half).astype(np.int64)
+        center_y = (y0 + half).astype(np.int64)
+        scores = np.zeros(n_windows, dtype=np.float32)
+
+        # 平坦/全零窗口不送入模型 (得分保持 0)
+        if self.config.min_std > 0:
+            stds = self._window_stds(image, y0, x0, patch_size)
+            active = np.nonzero(stds > self.config.min_std)[0]
+        else:
+            active = np.arange(n_windows)
+
+        batch_size = self.config.batch_size
+        buf = self._get_batch_buffer(batch_size, patch_size)
+        logit_threshold = _probability_to_logit(self._threshold)
+
+        for start in range(0, len(active), batch_size):
+            idx = active[start:start + batch_size]
+            count = len(idx)
+            chunk = buf[:count]
+
+            # 将窗口拷入预分配的 float32 缓冲区 (N, 1, P, P)
+            for k in range(count):
+                y, x = y0[idx[k]], x0[idx[k]]
+                np.copyto(
+                    chunk[k, 0], image[y:y + patch_size, x:x + patch_size],
+                    casting="unsafe",
+                )
+
+            batch = torch.from_numpy(chunk)
+            if self.device.type == "cuda":
+                batch = batch.pin_memory().to(self.device, non_blocking=True)
+            else:
+                batch = batch.to(self.device)
+
+            # 归一化 + 3 通道扩展 + 推理 (模型未经 _load_model 注入时按需构建)
+            if self._window_forward is None:
+                self._window_forward = self._build_window_forward()
+            output = self._window_forward(batch)
+
+            # 先在 logit 差上按阈值筛选, 只对幸存窗口计算 softmax
+            survivors = torch.nonzero(
+                output[:, 1] - output[:, 0] > logit_threshold
+            ).flatten()
+            if survivors.numel() > 0:
+                probs = torch.softmax(output[survivors], dim=1)[:, 1]
+                scores[idx[survivors.cpu().numpy()]] = probs.cpu().numpy()
+
+        # 置信度超过阈值的窗口 → 检测结果 (未通过 logit 筛选的窗口得分为 0) (边界框大小即窗口大小)
+        keep = np.nonzero(scores > self._threshold)[0]
+        all_detections = [
+            Detection(
+                x=int(center_x[i]),
+                y=int(center_y[i]),
+                width=patch_size,
+                height=patch_size,
+                confidence=float(scores[i]),
+                marker_type=MarkerType.BOUNDING_BOX,
+            )
+            for i in keep
+        ]
 
         # 应用 NMS 合并重叠检测
-        if len(all_detections) > 1:
-            all_detections = self._nms(all_detections, iou_threshold)
+        return self._apply_nms(all_detections, iou_threshold)
+
+    def _apply_nms(
+        self,
+        detections: List[Detection],
+        iou_threshold: float,
+    ) -> List[Detection]:
+        """合并重叠检测
 
-        return all_detections
+        默认始终做全局 NMS; 仅当设置了 pre_nms_topk 且检测数超过它时走两级 NMS。
+
+        Args:
+            detections: 检测结果列表
+            iou_threshold: IoU 阈值
+
+        Returns:
+            合并后的检测结果列表
+        """
+        pre_k = self.config.pre_nms_topk
+        if pre_k is not None and len(detections) > pre_k:
+            return self._tiled_nms(detections, iou_threshold, self.config.nms_tile_size)
+        if len(detections) > 1:
+            return self._nms(detections, iou_threshold)
+        return detections
+
+    def _build_window_forward(self):
+        """构建滑动窗口前向函数: 预处理与模型前向合为一次调用"""
+        import torch
+
+        def forward(batch: torch.Tensor) -> torch.Tensor:
+            # 先扩展为 3 通道再转 channels_last, 使首层卷积输入即为 NHWC
+            x = _prepare_windows(batch).contiguous(memory_format=torch.channels_last)
+            return self.model(x)
+
+        if self.config.compile_model:
+            return torch.compile(forward)
+        return forward
+
+    @staticmethod
+    def _window_stds(
+        image: np.ndarray, y0: np.ndarray, x0: np.ndarray, patch_size: int
+    ) -> np.ndarray:
+        """用只在窗口边界处取值的积分图一次算出所有窗口的标准差 (O(像素数))
+
+        先减去全图均值再累加, 降低 E[x²] - E[x]² 的相消误差。行方向前缀和
+        只保留窗口上下边界所在的行 (逐段累加相邻边界之间的行带), 列方向再
+        只取左右边界列, 额外内存约为 (边界行数 × W), 而不是两张整幅积分图。
+
+        Args:
+            image: 图像 (H, W)
+            y0: 窗口左上角 y 坐标 (N,)
+            x0: 窗口左上角 x 坐标 (N,)
+            patch_size: 窗口大小
+
+        Returns:
+            每个窗口的标准差 (N,)
+        """
+        centered = image.astype(np.float64)
+        centered -= centered.mean()
+        width = centered.shape[1]
+
+        y1 = y0 + patch_size
+        x1 = x0 + patch_size
+        ys = np.unique(np.concatenate([y0, y1]))
+        xs = np.unique(np.concatenate([x0, x1]))
+
+        # rows[k] / rows_sq[k]: 第 0..ys[k]-1 行逐列之和 (平方和)
+        rows = np.empty((len(ys), width + 1), dtype=np.float64)
+        rows_sq = np.empty((len(ys), width + 1), dtype=np.float64)
+        rows[:, 0] = 0.0
+        rows_sq[:, 0] = 0.0
+        acc = np.zeros(width, dtype=np.float64)
+        acc_sq = np.zeros(width, dtype=np.float64)
+        start = 0
+        for k, stop in enumerate(ys):
+            band = centered[start:stop]
+            acc += band.sum(axis=0)
+            acc_sq += np.einsum("ij,ij->j", band, band)
+            rows[k, 1:] = acc
+            rows_sq[k, 1:] = acc_sq
+            start = stop
+        del centered
+
+        # 列方向前缀和, 只取窗口左右边界列: integral[k, m] 为 [0, ys[k]) × [0, xs[m]) 之和
+        np.cumsum(rows[:, 1:], axis=1, out=rows[:, 1:])
+        np.cumsum(rows_sq[:, 1:], axis=1, out=rows_sq[:, 1:])
+        integral = rows[:, xs]
+        integral_sq = rows_sq[:, xs]
+
+        iy0 = np.searchsorted(ys, y0)
+        iy1 = np.searchsorted(ys, y1)
+        ix0 = np.searchsorted(xs, x0)
+        ix1 = np.searchsorted(xs, x1)
+
+        def window_sum(t: np.ndarray) -> np.ndarray:
+            return t[iy1, ix1] - t[iy0, ix1] - t[iy1, ix0] + t[iy0, ix0]
+
+        n = float(patch_size * patch_size)
+        mean = window_sum(integral) / n
+        var = window_sum(integral_sq) / n - mean * mean
+        return np.sqrt(np.maximum(var, 0.0))
+
+    def _get_batch_buffer(self, batch_size: int, patch_size: int) -> np.ndarray:
+        """获取 (batch_size, 1, P, P) float32 批次缓冲区, 形状不变时复用"""
+        shape = (batch_size, 1, patch_size, patch_size)
+        if self._batch_buf is None or self._batch_buf.shape != shape:
+            self._batch_buf = np.empty(shape, dtype=np.float32)
+        return self._batch_buf
 
     def _nms(self, detections: List[Detection], iou_threshold: float) -> List[Detection]:
         """非极大值抑制（Non-Maximum Suppression）
@@ -302,39 +680,85 @@ class InferenceEngine:
         if len(detections) == 0:
             return []
 
-        # 按置信度排序（降序）
-        sorted_detections = sorted(detections, key=lambda d: d.confidence, reverse=True)
-
-        keep = []
-        while len(sorted_detections) > 0:
-            # 保留置信度最高的检测
-            current = sorted_detections.pop(0)
-            keep.append(current)
-
-            # 计算当前检测的边界框（从中心点和宽高计算）
-            bbox1 = [
-                current.x - current.width // 2,
-                current.y - current.height // 2,
-                current.x + current.width // 2,
-                current.y + current.height // 2
-            ]
-
-            # 移除与当前检测重叠的其他检测
-            remaining = []
-            for d in sorted_detections:
-                bbox2 = [
-                    d.x - d.width // 2,
-                    d.y - d.height // 2,
-                    d.x + d.width // 2,
-                    d.y + d.height // 2
-                ]
-                iou = self._calculate_iou(bbox1, bbox2)
-                if iou < iou_threshold:
-                    remaining.append(d)
-
-            sorted_detections = remaining
-
-        return keep
+        # 一次遍历取出各字段 (结构化数组), 再按列向量化算出边界框
+        rec = np.fromiter(
+            ((d.x, d.y, d.width // 2, d.height // 2, d.confidence) for d in detections),
+            dtype=_NMS_RECORD,
+            count=len(detections),
+        )
+        x, y, half_w, half_h = rec["x"], rec["y"], rec["half_w"], rec["half_h"]
+        boxes = np.stack([x - half_w, y - half_h, x + half_w, y + half_h], axis=1)
+        scores = rec["score"]
+
+        if len(detections) > _NUMBA_NMS_MIN_DETECTIONS:
+            from scann.ai._nms_numba import nms_numba
+            if nms_numba is not None:
+                keep = nms_numba(boxes, scores, iou_threshold)
+                return [detections[i] for i in keep]
+
+        if len(detections) <= _NMS_MATRIX_MAX_DETECTIONS:
+            keep = _nms_matrix(boxes, scores, iou_threshold)
+        else:
+            keep = _nms_numpy(boxes, scores, iou_threshold)
+        return [detections[i] for i in keep]
+
+    def _tiled_nms(
+        self,
+        detections: List[Detection],
+        iou_threshold: float,
+        tile_size: int,
+    ) -> List[Detection]:
+        """两级 NMS
+
+        先在每个分块内保留置信度最高的 pre_nms_topk 个检测并做 NMS
+        (设置了 post_nms_topk_per_tile 时再截断到该数量, 默认不截断);
+        再只对靠近分块边缘的结果做全局 NMS。
+        中心距分块边缘超过最大框边长的检测不可能与相邻分块的框重叠, 直接保留。
+        分块截断与跨边缘的抑制链都可能使结果与全局 NMS 不同, 因此仅在显式启用时使用。
+
+        Args:
+            detections: 检测结果列表
+            iou_threshold: IoU 阈值
+            tile_size: 分块边长 (像素)
+
+        Returns:
+            合并后的检测结果列表 (按置信度降序)
+        """
+        if len(detections) == 0:
+            return []
+
+        pre_k = self.config.pre_nms_topk
+        post_k = self.config.post_nms_topk_per_tile
+
+        tiles: Dict[Tuple[int, int], List[Detection]] = {}
+        for d in detections:
+            tiles.setdefault((d.y // tile_size, d.x // tile_size), []).append(d)
+
+        # 边缘带宽度: 最大框边长
+        band = max(max(d.width, d.height) for d in detections)
+
+        interior: List[Detection] = []
+        edge: List[Detection] = []
+        for (ty, tx), group in tiles.items():
+            top = group if pre_k is None else heapq.nlargest(
+                pre_k, group, key=lambda d: d.confidence
+            )
+            survivors = self._nms(top, iou_threshold)
+            if post_k is not None:
+                survivors = survivors[:post_k]
+
+            x0, y0 = tx * tile_size, ty * tile_size
+            x1, y1 = x0 + tile_size, y0 + tile_size
+            for d in survivors:
+                if (d.x - x0 < band or x1 - d.x <= band
+                        or d.y - y0 < band or y1 - d.y <= band):
+                    edge.append(d)
+                else:
+                    interior.append(d)
+
+        merged = interior + self._nms(edge, iou_threshold)
+        merged.sort(key=lambda d: d.confidence, reverse=True)
+        return merged
 
     def _calculate_iou(self, bbox1: List[float], bbox2: List[float]) -> float:
         """计算两个边界框的 IoU (Intersection over Union)
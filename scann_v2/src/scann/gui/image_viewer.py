@@ -30,9 +30,12 @@ from PyQt5.QtGui import (
     QWheelEvent,
 )
 from PyQt5.QtWidgets import (
+    QGraphicsEllipseItem,
+    QGraphicsItemGroup,
     QGraphicsLineItem,
     QGraphicsPixmapItem,
     QGraphicsScene,
+    QGraphicsTextItem,
     QGraphicsView,
 )
 
@@ -62,9 +65,29 @@ class FitsImageViewer(QGraphicsView):
     ZOOM_MAX = 20.0    # 2000%
     ZOOM_FACTOR = 1.25
 
+    # ── 标记样式 (类级缓存, 避免每次绘制重复构造 Qt 对象) ──
+    _MARKER_RADIUS = 15
+    _CROSS_LEN = 25
+    _PEN_SEL = QPen(QColor(255, 0, 0), 3)            # 红色 = 选中
+    _PEN_MANUAL = QPen(QColor(255, 0, 255), 2)       # 紫色 = 手动
+    _PEN_KNOWN = QPen(QColor(128, 128, 128), 1)      # 灰色 = 已知
+    _PEN_DEFAULT = QPen(QColor(0, 255, 0), 2)        # 绿色 = 自动检测
+    _PEN_CROSS = QPen(QColor(255, 0, 0, 180), 1, Qt.DashLine)
+    _COLOR_LABEL = QColor(255, 255, 0)
+    _COLOR_VERDICT_REAL = QColor(76, 175, 80)
+    _COLOR_VERDICT_BOGUS = QColor(244, 67, 54)
+    _FONT_LABEL = QFont("Arial", 10, QFont.Bold)
+    _FONT_VERDICT = QFont("Arial", 12, QFont.Bold)
+    _VERDICT_ICON_SIZE = 20
+    # 判决图标 (✓/✗) 预渲染 pixmap, 首次创建查看器时生成 (需 QApplication)
+    _ICON_REAL: Optional[QPixmap] = None
+    _ICON_BOGUS: Optional[QPixmap] = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scene = QGraphicsScene(self)
+        # 场景只有一张 pixmap 和少量每帧重建的标记, BSP 索引维护开销大于收益
+        self._scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.setScene(self._scene)
 
         # 渲染设置
@@ -83,8 +106,22 @@ class FitsImageViewer(QGraphicsView):
         self._scene.addItem(self._pixmap_item)
 
         # 标记图层分组 (z-value: pixmap=0, mpcorb=5, markers=10)
+        # 每次绘制的标记统一放入一个 QGraphicsItemGroup, 整组一次加入/移出场景
+        self._marker_group: Optional[QGraphicsItemGroup] = None
         self._marker_items: list = []
 
+        # 判决图标
+        if FitsImageViewer._ICON_REAL is None:
+            FitsImageViewer._ICON_REAL = self._render_glyph("✓", self._COLOR_VERDICT_REAL)
+            FitsImageViewer._ICON_BOGUS = self._render_glyph("✗", self._COLOR_VERDICT_BOGUS)
+        self._icon_real = FitsImageViewer._ICON_REAL
+        self._icon_bogus = FitsImageViewer._ICON_BOGUS
+
+        # 当前显示的 uint8 缓冲区 (QImage 引用其内存)
+        self._display_buffer: Optional[np.ndarray] = None
+        # 反色查找表: 一次索引完成 255 - v
+        self._inv_lut = np.arange(255, -1, -1, dtype=np.uint8)
+
         # 状态
         self._is_panning = False
         self._pan_start = QPointF()
@@ -104,36 +141,28 @@ class FitsImageViewer(QGraphicsView):
         if data is None:
             return
 
-        # 转换为 uint8 显示
-        if data.dtype == np.float32 or data.dtype == np.float64:
-            display = (np.clip(data, 0, 1) * 255).astype(np.uint8)
-        elif data.dtype == np.uint16:
-            dmin, dmax = float(data.min()), float(data.max())
-            if dmax > dmin:
-                display = ((data.astype(np.float32) - dmin) / (dmax - dmin) * 255).astype(np.uint8)
-            else:
-                display = np.zeros_like(data, dtype=np.uint8)
-        else:
-            display = data.astype(np.uint8)
+        display = self._to_uint8(data)
 
         if inverted:
-            display = 255 - display
+            display = self._inv_lut[display]
 
-        # 转为 QImage
         if display.ndim == 2:
-            h, w = display.shape
-            bytes_per_line = w
-            qimg = QImage(display.data.tobytes(), w, h, bytes_per_line, QImage.Format_Grayscale8)
+            fmt = QImage.Format_Grayscale8
         elif display.ndim == 3 and display.shape[2] == 3:
-            h, w, ch = display.shape
-            bytes_per_line = ch * w
-            if not display.flags["C_CONTIGUOUS"]:
-                display = np.ascontiguousarray(display)
-            qimg = QImage(display.data.tobytes(), w, h, bytes_per_line, QImage.Format_RGB888)
+            fmt = QImage.Format_RGB888
         else:
             return
 
-        pixmap = QPixmap.fromImage(qimg)
+        # QImage 直接引用 NumPy 缓冲区 (不经 tobytes 拷贝), 需保持缓冲区存活;
+        # 与调用方数组共享内存时先拷贝, 避免外部原地修改影响显示
+        display = np.ascontiguousarray(display)
+        if np.shares_memory(display, data):
+            display = display.copy()
+        self._display_buffer = display
+        h, w = display.shape[:2]
+        qimg = QImage(display.data, w, h, display.strides[0], fmt)
+
+        pixmap = QPixmap.fromImage(qimg, Qt.NoFormatConversion)
         self._pixmap_item.setPixmap(pixmap)
 
         # 首次加载时适配视图
@@ -144,6 +173,43 @@ class FitsImageViewer(QGraphicsView):
         else:
             self._scene.setSceneRect(QRectF(pixmap.rect()))
 
+    @classmethod
+    def _render_glyph(cls, glyph: str, color: QColor) -> QPixmap:
+        """将单个字符渲染为透明背景的方形 pixmap"""
+        size = cls._VERDICT_ICON_SIZE
+        img = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        img.fill(Qt.transparent)
+        painter = QPainter(img)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(cls._FONT_VERDICT)
+        painter.setPen(color)
+        painter.drawText(img.rect(), Qt.AlignCenter, glyph)
+        painter.end()
+        return QPixmap.fromImage(img)
+
+    @staticmethod
+    def _to_uint8(data: np.ndarray) -> np.ndarray:
+        """将显示数据一次性向量化转换为 uint8
+
+        - float32/float64: 视为 0~1, 截断后映射到 0~255
+        - uint16: 按 min/max 线性拉伸到 0~255
+        - 其他: 直接转 uint8 (已是 uint8 时不拷贝)
+        """
+        if data.dtype == np.float32 or data.dtype == np.float64:
+            scaled = np.multiply(data, 255.0, dtype=np.float32)
+            np.clip(scaled, 0, 255, out=scaled)
+            return scaled.astype(np.uint8)
+        if data.dtype == np.uint16:
+            dmin, dmax = float(data.min()), float(data.max())
+            if dmax <= dmin:
+                return np.zeros(data.shape, dtype=np.uint8)
+            scaled = np.subtract(data, dmin, dtype=np.float32)
+            # 先乘后除: 预先计算 255/range 的 float32 舍入误差会使最大值落到 254
+            scaled *= 255.0
+            scaled /= dmax - dmin
+            return scaled.astype(np.uint8)
+        return data.astype(np.uint8, copy=False)
+
     # ══════════════════════════════════════════════
     #  候选标记绘制
     # ══════════════════════════════════════════════
@@ -169,15 +235,20 @@ class FitsImageViewer(QGraphicsView):
             hide_all: 隐藏所有标记
         """
         # 清除旧标记 (保留 pixmap 和 z < 10 的叠加层如 MPCORB)
-        for item in self._marker_items:
-            self._scene.removeItem(item)
+        if self._marker_group is not None:
+            self._scene.removeItem(self._marker_group)
+            self._marker_group = None
         self._marker_items.clear()
 
         if hide_all:
             return
 
-        font = QFont("Arial", 10, QFont.Bold)
-        verdict_font = QFont("Arial", 12, QFont.Bold)
+        radius = self._MARKER_RADIUS
+        cross_len = self._CROSS_LEN
+
+        group = QGraphicsItemGroup()
+        group.setZValue(10)
+        items = self._marker_items
 
         for i, cand in enumerate(candidates):
             cx, cy = cand.x, cand.y
@@ -185,66 +256,60 @@ class FitsImageViewer(QGraphicsView):
 
             # 颜色选择
             if is_selected:
-                color = QColor(255, 0, 0)  # 红色 = 选中
-                pen_width = 3
+                pen = self._PEN_SEL
             elif cand.is_manual:
-                color = QColor(255, 0, 255)  # 紫色 = 手动
-                pen_width = 2
+                pen = self._PEN_MANUAL
             elif cand.is_known:
-                color = QColor(128, 128, 128)  # 灰色 = 已知
-                pen_width = 1
+                pen = self._PEN_KNOWN
             else:
-                color = QColor(0, 255, 0)  # 绿色 = 自动检测
-                pen_width = 2
-
-            pen = QPen(color, pen_width)
+                pen = self._PEN_DEFAULT
 
             # 画圆
-            radius = 15
-            ellipse = self._scene.addEllipse(
-                cx - radius, cy - radius, radius * 2, radius * 2, pen,
+            ellipse = QGraphicsEllipseItem(
+                cx - radius, cy - radius, radius * 2, radius * 2,
             )
-            ellipse.setZValue(10)
-            self._marker_items.append(ellipse)
+            ellipse.setPen(pen)
+            items.append(ellipse)
 
             # 选中项 → 十字线
             if is_selected:
-                cross_len = 25
-                cross_pen = QPen(QColor(255, 0, 0, 180), 1, Qt.DashLine)
-                h_line = self._scene.addLine(
-                    cx - cross_len, cy, cx + cross_len, cy, cross_pen,
-                )
-                v_line = self._scene.addLine(
-                    cx, cy - cross_len, cx, cy + cross_len, cross_pen,
+                h_line = QGraphicsLineItem(cx - cross_len, cy, cx + cross_len, cy)
+                v_line = QGraphicsLineItem(cx, cy - cross_len, cx, cy + cross_len)
+                h_line.setPen(self._PEN_CROSS)
+                v_line.setPen(self._PEN_CROSS)
+                items.extend([h_line, v_line])
+
+            # 判决图标 (组内 z=1, 位于其他标记之上): 直接贴预渲染 pixmap
+            verdict = getattr(cand, "verdict", None)
+            if verdict == TargetVerdict.REAL:
+                icon = self._icon_real
+            elif verdict == TargetVerdict.BOGUS:
+                icon = self._icon_bogus
+            else:
+                icon = None
+
+            if icon is not None:
+                vicon = QGraphicsPixmapItem(icon)
+                vicon.setOffset(
+                    cx - radius - 2 - icon.width() / 2,
+                    cy - radius - 2 - icon.height() / 2,
                 )
-                h_line.setZValue(10)
-                v_line.setZValue(10)
-                self._marker_items.extend([h_line, v_line])
-
-            # 判决图标
-            verdict_text = ""
-            verdict_color = QColor(255, 255, 255)
-            if hasattr(cand, "verdict") and cand.verdict is not None:
-                if cand.verdict == TargetVerdict.REAL:
-                    verdict_text = "✓"
-                    verdict_color = QColor(76, 175, 80)  # 绿色
-                elif cand.verdict == TargetVerdict.BOGUS:
-                    verdict_text = "✗"
-                    verdict_color = QColor(244, 67, 54)  # 红色
-
-            if verdict_text:
-                vtext = self._scene.addText(verdict_text, verdict_font)
-                vtext.setDefaultTextColor(verdict_color)
-                vtext.setPos(cx - radius - 12, cy - radius - 12)
-                vtext.setZValue(11)
-                self._marker_items.append(vtext)
+                vicon.setZValue(1)
+                items.append(vicon)
 
             # 编号标签
-            text = self._scene.addText(f"{i + 1}", font)
-            text.setDefaultTextColor(QColor(255, 255, 0))
+            text = QGraphicsTextItem(f"{i + 1}")
+            text.setFont(self._FONT_LABEL)
+            text.setDefaultTextColor(self._COLOR_LABEL)
             text.setPos(cx + radius + 2, cy - 8)
-            text.setZValue(10)
-            self._marker_items.append(text)
+            items.append(text)
+
+        for item in items:
+            group.addToGroup(item)
+
+        # 整组一次加入场景
+        self._scene.addItem(group)
+        self._marker_group = group
 
     # ══════════════════════════════════════════════
     #  导航
@@ -261,14 +326,19 @@ class FitsImageViewer(QGraphicsView):
             zoom_to: 缩放百分比 (如 200 = 200%), None 表示保持当前缩放
         """
         if zoom_to is not None:
-            desired = zoom_to / 100.0
-            desired = max(self.ZOOM_MIN, min(self.ZOOM_MAX, desired))
-            self.resetTransform()
-            self.scale(desired, desired)
-            self._zoom_level = desired
-            self._emit_zoom()
-
-        self.centerOn(QPointF(x, y))
+            desired = min(max(zoom_to / 100.0, self.ZOOM_MIN), self.ZOOM_MAX)
+            # 缩放未变化时跳过矩阵更新与重绘
+            if abs(desired - self._zoom_level) >= 1e-6:
+                self._zoom_level = desired
+                self.setTransform(QTransform.fromScale(desired, desired))
+                self._emit_zoom()
+
+        # 视图中心与目标点相差不足 1 个视口像素时跳过 centerOn
+        # (场景距离 × 缩放 = 视口距离, 高倍放大时亚像素偏移也要移动)
+        target = QPointF(x, y)
+        current = self.mapToScene(self.viewport().rect().center())
+        if (current - target).manhattanLength() >= 1.0 / self._zoom_level:
+            self.centerOn(target)
 
     def fit_in_view(self) -> None:
         """适配视图 (F 键)"""
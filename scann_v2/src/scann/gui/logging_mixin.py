@@ -0,0 +1,41 @@
+"""窗口日志混入类
+
+为 QMainWindow 子类提供统一的 _logger 与 _show_message,
+消息同时输出到状态栏、终端和日志文件。
+
+用法:
+    class MyWindow(LoggingMixin, QMainWindow):
+        ...
+"""
+
+from __future__ import annotations
+
+import logging
+
+from scann.logger_config import get_logger
+
+
+class LoggingMixin:
+    """日志与状态栏消息混入 (需放在 Qt 窗口基类之前)
+
+    _logger 以子类所在模块命名, 例如 MainWindow → scann.gui.main_window。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._logger = get_logger(type(self).__module__)
+
+    def _show_message(self, message: str, timeout: int = 3000, level: str = 'INFO') -> None:
+        """统一的消息输出方法，同时输出到状态栏、终端和日志
+
+        Args:
+            message: 消息内容
+            timeout: 状态栏显示超时时间（毫秒）
+            level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        """
+        # 输出到状态栏（左下角）
+        self.statusBar().showMessage(message, timeout)
+
+        # 输出到终端和日志
+        log_level = getattr(logging, level.upper(), logging.INFO)
+        self._logger.log(log_level, message)
@@ -19,8 +19,6 @@ from typing import Optional
 from pathlib import Path
 import math
 
-import logging
-
 import numpy as np
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QKeySequence
@@ -54,13 +52,13 @@ from scann.core.models import (
     TargetVerdict,
 )
 from scann.core.observation_report import generate_mpc_report, Observation
-from scann.logger_config import get_logger
 from scann.services.query_service import QueryService, QueryResult
 from scann.gui.dialogs.query_result_popup import QueryResultPopup
 from scann.data.file_manager import scan_fits_folder, match_new_old_pairs
 from scann.ai.inference import InferenceEngine
 from scann.services.detection_service import DetectionPipeline
 from scann.gui.image_viewer import FitsImageViewer
+from scann.gui.logging_mixin import LoggingMixin
 from scann.gui.widgets.blink_speed_slider import BlinkSpeedSlider
 from scann.gui.widgets.collapsible_sidebar import CollapsibleSidebar
 from scann.gui.widgets.coordinate_label import CoordinateLabel
@@ -156,9 +154,11 @@ QLabel {
 """
 
 
-class MainWindow(QMainWindow):
+class MainWindow(LoggingMixin, QMainWindow):
     """SCANN v2 主窗口
 
+    日志与状态栏消息 (_logger / _show_message) 由 LoggingMixin 提供。
+
     分区:
     ┌─────────────────────────────────────────────┐
     │ 菜单栏                                       │
@@ -209,9 +209,6 @@ class MainWindow(QMainWindow):
         # ── AI/推理 ──
         self._inference_engine = None
 
-        # ── 日志 ──
-        self._logger = get_logger(__name__)
-
         # ── 用持久化配置初始化服务 ──
         self.blink_service = BlinkService(speed_ms=self._config.blink_speed_ms)
 
@@ -230,25 +227,6 @@ class MainWindow(QMainWindow):
         # ── 从配置恢复 UI 状态 ──
         self._restore_ui_state()
 
-    # ══════════════════════════════════════════════
-    #  日志和消息输出
-    # ══════════════════════════════════════════════
-
-    def _show_message(self, message: str, timeout: int = 3000, level: str = 'INFO') -> None:
-        """统一的消息输出方法，同时输出到状态栏、终端和日志
-
-        Args:
-            message: 消息内容
-            timeout: 状态栏显示超时时间（毫秒）
-            level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        """
-        # 输出到状态栏（左下角）
-        self.statusBar().showMessage(message, timeout)
-
-        # 输出到终端和日志
-        log_level = getattr(logging, level.upper(), logging.INFO)
-        self._logger.log(log_level, message)
-
     # ══════════════════════════════════════════════
     #  菜单栏
     # ══════════════════════════════════════════════
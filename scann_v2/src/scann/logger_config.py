@@ -1,18 +1,55 @@
 """统一日志配置模块
 
 提供全局日志配置，确保整个应用使用统一的日志系统。
+
+root logger 上只挂一个 QueueHandler，调用线程只做入队；
+文件/控制台写入由 QueueListener 后台线程完成。
+文件handler逐条写入缓冲区，监听器在队列空闲或遇到 ERROR 及以上日志时
+才刷新，突发的多条日志合并为一次写盘。
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TextIO, Tuple
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """只写缓冲区、不逐条刷新的文件handler (由监听器批量 flush)"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchingQueueListener(QueueListener):
+    """队列空闲或遇到 ERROR 及以上日志时才刷新handlers"""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if record.levelno >= logging.ERROR or self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+# 后台写日志的监听器 (setup_logging 创建, close_logging 停止)
+_listener: Optional[QueueListener] = None
 
 
 def setup_logging(
     log_file: Optional[Path] = None,
     log_level: int = logging.INFO,
-    console_output: bool = True
+    console_output: bool = True,
+    stream: Optional[TextIO] = None,
 ) -> logging.Logger:
     """配置全局日志系统
 
@@ -20,6 +57,7 @@ def setup_logging(
         log_file: 日志文件路径，如果为None则使用默认路径
         log_level: 日志级别（默认为INFO）
         console_output: 是否输出到控制台（默认为True）
+        stream: 控制台handler的输出流（默认为sys.stdout），测试时可传入io.StringIO
 
     Returns:
         配置好的根logger
@@ -48,8 +86,10 @@ def setup_logging(
     logger = logging.getLogger()
     logger.setLevel(log_level)
 
-    # 清除已有的handlers（避免重复添加）
+    # 停止上一次配置的监听器并清除已有的handlers（避免重复添加）
+    _stop_listener()
     logger.handlers.clear()
+    handlers = []
 
     # 创建formatter
     file_formatter = logging.Formatter(
@@ -63,20 +103,27 @@ def setup_logging(
 
     # 文件handler
     try:
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = _BufferedFileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(log_level)
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except (IOError, OSError) as e:
         # 如果无法创建日志文件，至少保证程序能运行
         print(f"警告：无法创建日志文件 {log_file}: {e}", file=sys.stderr)
 
     # 控制台handler
     if console_output:
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # 调用线程只入队，由监听线程写入文件/控制台
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    global _listener
+    _listener = _BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
 
     # 记录初始化信息
     logger.info(f"日志系统已初始化，日志文件: {log_file}")
@@ -102,12 +149,60 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def get_log_handlers() -> Tuple[logging.Handler, ...]:
+    """返回当前监听器实际写出日志的handlers（文件/控制台）
+
+    Returns:
+        handlers元组，未配置日志系统时为空元组
+    """
+    if _listener is None:
+        return ()
+    return _listener.handlers
+
+
+def drain_logging() -> None:
+    """等待队列中已提交的日志全部写出并刷新handlers
+
+    无需停止监听器，适合在读取日志文件之前调用。
+    """
+    if _listener is None:
+        return
+    _listener.queue.join()
+    for handler in _listener.handlers:
+        handler.flush()
+
+
+def _stop_listener() -> None:
+    """停止监听器（处理完队列剩余日志）并关闭其handlers"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    try:
+        listener.stop()
+    except Exception:
+        pass
+    for handler in listener.handlers:
+        try:
+            handler.flush()
+            handler.close()
+        except Exception:
+            pass
+
+
+# 程序退出时写出队列中剩余的日志
+atexit.register(_stop_listener)
+
+
 def close_logging():
     """关闭日志系统（清理所有handlers）
 
     通常在程序退出时调用。这个函数会遍历并关闭所有logger的所有handlers，
     包括root logger和子logger的handlers，以确保在Windows等系统上释放文件锁。
+    后台监听器会先处理完队列中剩余的日志再停止。
     """
+    _stop_listener()
+
     # 获取root logger
     root_logger = logging.getLogger()
     
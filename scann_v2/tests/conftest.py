@@ -1,6 +1,10 @@
 """测试套件共享 fixtures
 
 提供合成 FITS 数据、临时目录、模拟配置等可复用测试夹具。
+
+临时目录可放在内存文件系统上 (减少日志等小文件的磁盘 IO):
+设置环境变量 PYTEST_RAMDISK 指定目录 (如 PYTEST_RAMDISK=/dev/shm),
+未设置时使用系统临时目录。
 """
 
 from __future__ import annotations
@@ -10,7 +14,7 @@ import os
 import sys
 import tempfile
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Optional
 
 import numpy as np
 import pytest
@@ -30,6 +34,32 @@ def qapp():
     yield app
 
 
+# ─── 主窗口 Mock ───
+
+
+class _SpecNames(dict):
+    """spec 类名 → dir(类) 属性名列表, 首次查询某个类名时才计算
+
+    类名相对 scann.gui.main_window 命名空间 (如 "QTimer"、"FitsImageViewer")。
+    """
+
+    def __missing__(self, name: str) -> list:
+        from scann.gui import main_window
+
+        names = self[name] = dir(getattr(main_window, name))
+        return names
+
+
+@pytest.fixture(scope="session")
+def spec_names() -> _SpecNames:
+    """主窗口控件/服务类的 spec 名字列表 (整个会话共享)
+
+    Mock(spec=类) 每次构造都要 dir() 一遍 Qt 类 (约 1ms),
+    传入预先算好的名字列表则与裸 Mock 开销相当, 拼写检查效果相同。
+    """
+    return _SpecNames()
+
+
 # ─── 合成 FITS 数据 ───
 
 
@@ -70,44 +100,123 @@ def synth_image_pair(synth_fits_data_16bit) -> tuple[np.ndarray, np.ndarray]:
     return new_img, old_img
 
 
+@pytest.fixture(scope="module")
+def zero_image_64() -> np.ndarray:
+    """64x64 float32 全零图像 (模块内共享, 只读)"""
+    data = np.zeros((64, 64), dtype=np.float32)
+    data.setflags(write=False)
+    return data
+
+
+@pytest.fixture(scope="module")
+def empty_fits_header():
+    """空的 FitsHeader (模块内共享, 冻结 dataclass)"""
+    from scann.core.models import FitsHeader
+
+    return FitsHeader(raw={})
+
+
+@pytest.fixture(scope="module")
+def zero_fits_image(zero_image_64, empty_fits_header):
+    """全零图像 + 空头信息组成的 FitsImage (模块内共享, 只读使用)"""
+    from scann.core.models import FitsImage
+
+    return FitsImage(data=zero_image_64, header=empty_fits_header, path=Path("/fake/zero.fits"))
+
+
+# ─── AI 模型 ───
+
+
+@pytest.fixture(scope="module")
+def torch_no_grad_single_thread():
+    """模块内关闭 autograd 并单线程运行 (小批量前向时线程调度开销占主导)
+
+    用法: pytestmark = pytest.mark.usefixtures("torch_no_grad_single_thread");
+    模块结束后恢复原设置, 不影响训练相关测试。
+    """
+    torch = pytest.importorskip("torch")
+
+    grad_enabled = torch.is_grad_enabled()
+    num_threads = torch.get_num_threads()
+    torch.set_grad_enabled(False)
+    torch.set_num_threads(1)
+    yield
+    torch.set_num_threads(num_threads)
+    torch.set_grad_enabled(grad_enabled)
+
+
+@pytest.fixture(scope="module")
+def no_weight_download():
+    """模块内禁止 torch.hub 下载预训练权重 (意外下载立即失败, 而不是拖慢测试)
+
+    只拦截真正的网络下载; 本地缓存中已有的权重仍可加载。
+    """
+    torch = pytest.importorskip("torch")
+
+    def _refuse(url, *args, **kwargs):
+        raise RuntimeError(f"单元测试不应下载权重: {url} (请使用 pretrained=False)")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(torch.hub, "download_url_to_file", _refuse)
+        yield
+
+
+@pytest.fixture(scope="session")
+def scann_classifier():
+    """CPU 上的 SCANNClassifier(pretrained=False), eval 模式 (会话内共享, 只读使用)"""
+    pytest.importorskip("torch")
+    from scann.ai.model import SCANNClassifier
+
+    model = SCANNClassifier(pretrained=False)
+    model.eval()
+    return model
+
+
 # ─── 临时目录与文件 ───
 
 
+def _ramdisk_root() -> Optional[str]:
+    """内存文件系统目录: 仅在设置了 PYTEST_RAMDISK 时使用, 否则为 None (系统临时目录)"""
+    return os.environ.get("PYTEST_RAMDISK") or None
+
+
 @pytest.fixture
 def tmp_dir() -> Generator[Path, None, None]:
-    """临时目录，自动清理日志handlers"""
-    import logging
-    from pathlib import Path
-    
-    with tempfile.TemporaryDirectory() as d:
+    """临时目录 (设置 PYTEST_RAMDISK 时放在内存文件系统)，自动清理日志handlers"""
+    from scann.logger_config import close_logging
+
+    with tempfile.TemporaryDirectory(prefix="scann-", dir=_ramdisk_root()) as d:
         yield Path(d)
-        # 清理后：关闭所有日志handlers以释放文件锁
+        # 清理后：停止日志监听器并关闭所有handlers以释放文件锁
         try:
-            # 关闭root logger的handlers
-            root_logger = logging.getLogger()
-            for handler in root_logger.handlers[:]:
-                try:
-                    handler.flush()
-                    handler.close()
-                except Exception:
-                    pass
-                root_logger.removeHandler(handler)
-            
-            # 关闭所有子logger的handlers
-            for logger_name in list(logging.Logger.manager.loggerDict.keys()):
-                logger = logging.getLogger(logger_name)
-                for handler in logger.handlers[:]:
-                    try:
-                        handler.flush()
-                        handler.close()
-                    except Exception:
-                        pass
-                    logger.removeHandler(handler)
+            close_logging()
         except Exception:
             # 如果关闭handlers失败，继续清理临时目录
             pass
 
 
+@pytest.fixture
+def log_file(tmp_dir, request) -> Path:
+    """tmp_dir 下按测试名命名的日志文件路径 (尚未创建)"""
+    return tmp_dir / f"{request.node.name}.log"
+
+
+@pytest.fixture
+def configured_logger(log_file):
+    """已通过 setup_logging 配置的 root logger
+
+    日志写入 log_file, 测试结束后 close_logging。
+
+    Returns:
+        (logger, log_file)
+    """
+    from scann.logger_config import close_logging, setup_logging
+
+    logger = setup_logging(log_file=log_file)
+    yield logger, log_file
+    close_logging()
+
+
 @pytest.fixture
 def fits_file_pair(tmp_dir, synth_fits_data_16bit) -> tuple[Path, Path]:
     """在临时目录创建一对 FITS 文件 (新/旧)"""
@@ -41,6 +41,9 @@ class TestFitsImageViewerInit:
     def test_initial_zoom(self, viewer):
         assert viewer._zoom_level == 1.0
 
+    def test_scene_no_bsp_index(self, viewer):
+        assert viewer._scene.itemIndexMethod() == QGraphicsScene.NoIndex
+
     def test_marker_items_empty(self, viewer):
         assert viewer._marker_items == []
 
@@ -79,6 +82,39 @@ class TestSetImageData:
         viewer.set_image_data(data)
         assert not viewer._pixmap_item.pixmap().isNull()
 
+    def test_display_buffer_uint8(self, viewer):
+        data = np.array([[0.0, 0.5], [1.0, 2.0]], np.float32)
+        viewer.set_image_data(data)
+        buf = viewer._display_buffer
+        assert buf.dtype == np.uint8
+        assert buf.flags["C_CONTIGUOUS"]
+        assert buf.tolist() == [[0, 127], [255, 255]]
+
+    def test_inverted_uses_lut(self, viewer):
+        data = np.array([[0, 1], [128, 255]], np.uint8)
+        viewer.set_image_data(data, inverted=True)
+        assert viewer._display_buffer.tolist() == [[255, 254], [127, 0]]
+        # 原始数据不应被修改
+        assert data.tolist() == [[0, 1], [128, 255]]
+
+    def test_uint8_buffer_not_shared_with_caller(self, viewer):
+        data = np.array([[0, 1], [128, 255]], np.uint8)
+        viewer.set_image_data(data)
+        assert not np.shares_memory(viewer._display_buffer, data)
+        data[0, 0] = 99
+        assert viewer._display_buffer[0, 0] == 0
+
+    @pytest.mark.parametrize("span", [7, 14, 28, 41, 65535])
+    def test_uint16_max_maps_to_255(self, span):
+        out = FitsImageViewer._to_uint8(np.array([0, span], np.uint16))
+        assert out.tolist() == [0, 255]
+
+    def test_odd_width_pixmap_size(self, viewer):
+        data = (np.random.rand(31, 33) * 65535).astype(np.uint16)
+        viewer.set_image_data(data)
+        pixmap = viewer._pixmap_item.pixmap()
+        assert (pixmap.width(), pixmap.height()) == (33, 31)
+
 
 class TestCenterOnPoint:
     """测试 center_on_point"""
@@ -109,6 +145,30 @@ class TestCenterOnPoint:
         viewer.center_on_point(50, 50, zoom_to=5000)  # 5000% > ZOOM_MAX*100=2000%
         assert viewer._zoom_level <= viewer.ZOOM_MAX
 
+    def test_center_same_zoom_no_signal(self, viewer):
+        data = np.zeros((200, 200), np.float32)
+        viewer.set_image_data(data)
+        viewer.center_on_point(50, 50, zoom_to=200)
+        received = []
+        viewer.zoom_changed.connect(lambda v: received.append(v))
+        viewer.center_on_point(60, 60, zoom_to=200)
+        assert received == []
+        assert abs(viewer._zoom_level - 2.0) < 1e-6
+
+    def test_center_tolerance_in_viewport_pixels(self, viewer, monkeypatch):
+        data = np.zeros((200, 200), np.float32)
+        viewer.set_image_data(data)
+        viewer.center_on_point(100, 100, zoom_to=1000)
+        current = viewer.mapToScene(viewer.viewport().rect().center())
+        calls = []
+        monkeypatch.setattr(viewer, "centerOn", lambda p: calls.append(p))
+        # 10 倍放大: 0.05 场景像素 = 0.5 视口像素, 跳过
+        viewer.center_on_point(current.x() + 0.05, current.y())
+        assert calls == []
+        # 0.3 场景像素 = 3 视口像素, 需要移动
+        viewer.center_on_point(current.x() + 0.3, current.y())
+        assert len(calls) == 1
+
 
 class TestFitInView:
     """测试 fit_in_view"""
@@ -164,6 +224,17 @@ class TestDrawMarkers:
         viewer.draw_markers(c, selected_idx=-1)
         assert len(viewer._marker_items) >= 3
 
+    def test_verdict_icons_are_shared_pixmaps(self, viewer):
+        c = [
+            Candidate(x=50, y=50, verdict=TargetVerdict.REAL),
+            Candidate(x=100, y=100, verdict=TargetVerdict.BOGUS),
+        ]
+        viewer.draw_markers(c)
+        icons = [item for item in viewer._marker_items if hasattr(item, "pixmap")]
+        assert len(icons) == 2
+        assert icons[0].pixmap().cacheKey() == FitsImageViewer._ICON_REAL.cacheKey()
+        assert icons[1].pixmap().cacheKey() == FitsImageViewer._ICON_BOGUS.cacheKey()
+
     def test_manual_candidate_color(self, viewer):
         c = [Candidate(x=50, y=50, is_manual=True)]
         viewer.draw_markers(c)
@@ -174,6 +245,29 @@ class TestDrawMarkers:
         viewer.draw_markers(c)
         assert len(viewer._marker_items) > 0  # 灰色标记
 
+    def test_markers_added_as_single_group(self, viewer):
+        c = [Candidate(x=50, y=50), Candidate(x=100, y=100)]
+        viewer.draw_markers(c, selected_idx=0)
+        group = viewer._marker_group
+        assert group.scene() is viewer._scene
+        assert group.zValue() == 10
+        assert len(group.childItems()) == len(viewer._marker_items)
+
+    def test_redraw_removes_old_group(self, viewer):
+        c = [Candidate(x=50, y=50)]
+        viewer.draw_markers(c)
+        old_group = viewer._marker_group
+        viewer.draw_markers(c)
+        assert old_group.scene() is None
+        assert viewer._marker_group.scene() is viewer._scene
+
+    def test_marker_pens_from_class_cache(self, viewer):
+        c = [Candidate(x=50, y=50), Candidate(x=100, y=100, is_manual=True)]
+        viewer.draw_markers(c, selected_idx=0)
+        pens = [item.pen() for item in viewer._marker_items if hasattr(item, "rect")]
+        assert pens[0] == FitsImageViewer._PEN_SEL
+        assert pens[1] == FitsImageViewer._PEN_MANUAL
+
 
 class TestZoomLimits:
     """测试缩放限制"""
@@ -6,12 +6,20 @@
 3. 边界处理
 """
 
+import subprocess
+import sys
+
 import pytest
 import numpy as np
 import torch
 from unittest.mock import Mock, patch
 
-from scann.ai.inference import InferenceEngine, InferenceConfig
+from scann.ai.inference import (
+    InferenceEngine,
+    InferenceConfig,
+    _prepare_windows,
+    _probability_to_logit,
+)
 from scann.core.models import Candidate
 
 
@@ -259,3 +267,217 @@ class TestBoundaryHandling:
 
         detections = engine.detect_full_image(test_image)
         assert isinstance(detections, list)
+
+
+class TestBatchedWindows:
+    """测试滑动窗口批处理"""
+
+    def _make_engine(self, forward, **config):
+        mock_model = Mock()
+        mock_model.side_effect = forward
+        with patch("torch.load", return_value={"threshold": 0.5}):
+            with patch("scann.ai.model.SCANNClassifier.load_from_checkpoint", return_value=mock_model):
+                engine = InferenceEngine("dummy_path.pt", config=InferenceConfig(**config))
+        return engine
+
+    def test_windows_split_by_batch_size(self):
+        """测试：窗口按 batch_size 分批送入模型，缓冲区复用"""
+        shapes = []
+
+        def mock_forward(x):
+            shapes.append(tuple(x.shape))
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward, batch_size=4)
+        test_image = np.random.rand(448, 448).astype(np.float32)
+
+        engine.detect_full_image(test_image)
+        buf = engine._batch_buf
+        engine.detect_full_image(test_image)
+
+        # 448x448, 窗口 224, 步长 112 → 3x3 = 9 个窗口
+        assert shapes[:3] == [(4, 3, 224, 224), (4, 3, 224, 224), (1, 3, 224, 224)]
+        assert engine._batch_buf is buf
+
+    def test_forward_runs_in_inference_mode(self):
+        """测试：前向在 inference_mode 下执行，模型处于 eval 模式"""
+        modes = []
+
+        def mock_forward(x):
+            modes.append(torch.is_inference_mode_enabled())
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward)
+        engine.detect_full_image(np.random.rand(224, 224).astype(np.float32))
+
+        assert modes == [True]
+        engine.model.eval.assert_called()
+
+    def test_injected_model_without_load(self):
+        """测试：直接赋值 model (不经 _load_model) 时也能推理"""
+        shapes = []
+
+        def mock_forward(x):
+            shapes.append(tuple(x.shape))
+            return torch.zeros(x.shape[0], 2)
+
+        engine = InferenceEngine(model_path="")  # 空路径: 不加载模型
+        engine.model = Mock(side_effect=mock_forward)
+
+        assert engine.detect_full_image(np.random.rand(224, 224).astype(np.float32)) == []
+        assert shapes == [(1, 3, 224, 224)]
+
+    def test_swapped_model_used_on_next_call(self):
+        """测试：两次 detect_full_image 之间替换 model, 第二次使用新模型"""
+        calls = []
+
+        def make_forward(name):
+            def forward(x):
+                calls.append(name)
+                return torch.zeros(x.shape[0], 2)
+            return forward
+
+        engine = self._make_engine(make_forward("first"))
+        test_image = np.random.rand(224, 224).astype(np.float32)
+
+        engine.detect_full_image(test_image)
+        engine.model = Mock(side_effect=make_forward("second"))
+        engine.detect_full_image(test_image)
+
+        assert calls == ["first", "second"]
+
+    def test_flat_image_skips_model(self):
+        """测试：全零图像所有窗口都被方差预过滤跳过"""
+        mock_forward = Mock(side_effect=lambda x: torch.zeros(x.shape[0], 2))
+
+        engine = self._make_engine(mock_forward, min_std=1e-6)
+        detections = engine.detect_full_image(np.zeros((448, 448), dtype=np.float32))
+
+        assert detections == []
+        mock_forward.assert_not_called()
+
+    def test_only_textured_windows_evaluated(self):
+        """测试：只有非平坦窗口送入模型"""
+        shapes = []
+
+        def mock_forward(x):
+            shapes.append(x.shape[0])
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward, min_std=1e-6)
+        test_image = np.zeros((224, 448), dtype=np.float32)
+        test_image[:, 336:] = np.random.rand(224, 112)  # 只有最右侧窗口有纹理
+
+        engine.detect_full_image(test_image)
+
+        # 3 个窗口 (x=0, 112, 224) 中只有 x=224 覆盖纹理区域
+        assert shapes == [1]
+
+    def test_small_unit_image_evaluated_by_default(self):
+        """测试：默认不跳过窗口, 数值很小 (如流量定标) 的图像仍全部送入模型"""
+        shapes = []
+
+        def mock_forward(x):
+            shapes.append(x.shape[0])
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward)
+        engine.detect_full_image((np.random.rand(224, 448) * 1e-9).astype(np.float32))
+
+        assert shapes == [3]
+
+    def test_window_stds_match_numpy(self):
+        """测试：积分图计算的窗口标准差与逐窗口 std 一致"""
+        image = np.random.rand(300, 400).astype(np.float32)
+        y0 = np.array([0, 50, 76])
+        x0 = np.array([0, 100, 176])
+
+        stds = InferenceEngine._window_stds(image, y0, x0, 224)
+        expected = [image[y:y + 224, x:x + 224].astype(np.float64).std() for y, x in zip(y0, x0)]
+
+        assert stds == pytest.approx(expected, rel=1e-6)
+
+    def test_batch_channels_last(self):
+        """测试：模型输入为 channels_last 布局"""
+        layouts = []
+
+        def mock_forward(x):
+            layouts.append(x.is_contiguous(memory_format=torch.channels_last))
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward)
+        engine.detect_full_image(np.random.rand(224, 224).astype(np.float32))
+
+        assert layouts == [True]
+        engine.model.to.assert_called_with(memory_format=torch.channels_last)
+
+    def test_detection_centers(self):
+        """测试：检测中心坐标对应窗口位置"""
+        def mock_forward(x):
+            logits = torch.zeros(x.shape[0], 2)
+            logits[:, 0] = 5.0
+            logits[1, :] = torch.tensor([0.0, 5.0])  # 第二个窗口 (y=0, x=112)
+            return logits
+
+        engine = self._make_engine(mock_forward)
+        test_image = np.random.rand(224, 448).astype(np.float32)
+
+        detections = engine.detect_full_image(test_image)
+
+        assert [(d.x, d.y) for d in detections] == [(224, 112)]
+
+    def test_window_normalized_to_unit_range(self):
+        """测试：每个窗口 min-max 归一化到 0~1"""
+        ranges = []
+
+        def mock_forward(x):
+            ranges.append((float(x.min()), float(x.max())))
+            return torch.zeros(x.shape[0], 2)
+
+        engine = self._make_engine(mock_forward)
+        test_image = (np.random.rand(224, 224) * 60000).astype(np.uint16)
+
+        engine.detect_full_image(test_image)
+
+        assert ranges == [pytest.approx((0.0, 1.0))]
+
+
+class TestPrepareWindows:
+    """测试批次预处理"""
+
+    def test_minmax_and_three_channels(self):
+        batch = torch.tensor([[[[2.0, 4.0], [6.0, 10.0]]], [[[3.0, 3.0], [3.0, 3.0]]]])
+
+        out = _prepare_windows(batch)
+
+        assert out.shape == (2, 3, 2, 2)
+        assert torch.allclose(out[0, 2], torch.tensor([[0.0, 0.25], [0.5, 1.0]]))
+        # 平坦窗口保持原值
+        assert torch.equal(out[1, 0], batch[1, 0])
+
+
+class TestLogitThreshold:
+    """测试 logit 差阈值筛选"""
+
+    @pytest.mark.parametrize("p", [0.1, 0.5, 0.73, 0.99])
+    def test_logit_threshold_matches_softmax(self, p):
+        thr = _probability_to_logit(p)
+        logits = torch.tensor([[0.0, thr - 1e-3], [0.0, thr + 1e-3]])
+        probs = torch.softmax(logits.double(), dim=1)[:, 1]
+        assert probs[0] < p < probs[1]
+
+    def test_logit_threshold_bounds(self):
+        assert _probability_to_logit(0.0) == -float("inf")
+        assert _probability_to_logit(1.0) == float("inf")
+
+
+class TestLazyTorchImport:
+    """测试 torch 延迟导入"""
+
+    def test_import_inference_does_not_import_torch(self):
+        code = (
+            "import sys, scann.ai.inference, scann.gui.image_viewer; "
+            "sys.exit(1 if 'torch' in sys.modules else 0)"
+        )
+        result = subprocess.run([sys.executable, "-c", code])
+        assert result.returncode == 0
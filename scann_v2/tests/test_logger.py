@@ -3,189 +3,198 @@
 import logging
 import os
 import sys
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
 import time
+from pathlib import Path
 
 import pytest
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+pytest.importorskip("PyQt5")
 
-class TestLoggingConfig:
-    """测试日志配置模块"""
+from PyQt5.QtWidgets import QMainWindow
 
-    def setup_method(self):
-        """每个测试前：清理handlers"""
-        logging.root.handlers.clear()
+from scann.gui.logging_mixin import LoggingMixin
+from scann.gui.main_window import MainWindow
+from scann.logger_config import (
+    close_logging,
+    drain_logging,
+    get_log_handlers,
+    get_logger,
+    setup_logging,
+)
 
-    def teardown_method(self):
-        """每个测试后：清理"""
-        from scann.logger_config import close_logging
-        close_logging()
 
-    def test_setup_logging_creates_root_logger(self, tmp_dir):
-        """测试：setup_logging应创建root logger"""
-        from scann.logger_config import setup_logging
+def _drain_log_handlers():
+    """等待日志队列写完, 并将文件 handler fsync 到磁盘 (无需 sleep 等待)"""
+    drain_logging()
+    for handler in get_log_handlers():
+        if isinstance(handler, logging.FileHandler) and handler.stream is not None:
+            handler.acquire()
+            try:
+                handler.flush()
+                os.fsync(handler.stream.fileno())
+            finally:
+                handler.release()
 
-        log_file = tmp_dir / f"test_{self.test_setup_logging_creates_root_logger.__name__}.log"
-        logger = setup_logging(log_file=log_file)
 
-        assert logger is not None
-        assert logger.name == "root"
-        assert isinstance(logger, logging.Logger)
+def wait_until(cond, timeout=1.0, interval=0.002):
+    """轮询等待条件成立 (代替固定 sleep), 超时则断言失败"""
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        if cond():
+            return True
+        time.sleep(interval)
+    raise AssertionError(f"等待条件超时 ({timeout}s)")
 
-    def test_setup_logging_creates_file_handler(self, tmp_dir):
-        """测试：setup_logging应创建文件handler"""
-        from scann.logger_config import setup_logging
 
-        log_file = tmp_dir / f"test_{self.test_setup_logging_creates_file_handler.__name__}.log"
-        logger = setup_logging(log_file=log_file)
+@pytest.fixture(autouse=True)
+def _clean_logging():
+    """每个测试前清理root handlers, 测试后关闭日志系统"""
+    logging.root.handlers.clear()
+    yield
+    close_logging()
 
-        file_handlers = [h for h in logger.handlers if isinstance(h, logging.FileHandler)]
-        assert len(file_handlers) == 1
 
-    def test_setup_logging_creates_console_handler(self, tmp_dir):
-        """测试：setup_logging应创建控制台handler"""
-        from scann.logger_config import setup_logging
+class _Probe(LoggingMixin, QMainWindow):
+    """只挂载日志混入的最小窗口 (不构建 MainWindow 的菜单/侧边栏等)"""
 
-        log_file = tmp_dir / f"test_{self.test_setup_logging_creates_console_handler.__name__}.log"
-        logger = setup_logging(log_file=log_file, console_output=True)
 
-        console_handlers = [h for h in logger.handlers if isinstance(h, logging.StreamHandler)]
-        assert len(console_handlers) >= 1
+@pytest.fixture
+def probe_window(qapp):
+    """测试 _show_message 用的轻量窗口"""
+    window = _Probe()
+    yield window
+    window.close()
 
-    def test_setup_logging_creates_log_file(self, tmp_dir):
-        """测试：setup_logging应创建日志文件"""
-        from scann.logger_config import setup_logging
 
-        log_file = tmp_dir / f"test_{self.test_setup_logging_creates_log_file.__name__}.log"
-        setup_logging(log_file=log_file)
+@pytest.fixture(scope="module")
+def _shared_main_window(qapp):
+    """模块内共享的 MainWindow (避免每个测试重复构建 Qt 控件树)"""
+    window = MainWindow()
+    yield window
+    window.close()
 
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
 
-        assert log_file.exists()
+@pytest.fixture
+def main_window(_shared_main_window):
+    """共享 MainWindow, 测试结束后清空状态栏消息"""
+    yield _shared_main_window
+    _shared_main_window.statusBar().clearMessage()
 
-    def test_log_file_contains_message(self, tmp_dir):
-        """测试：日志文件应包含消息"""
-        from scann.logger_config import setup_logging
 
-        log_file = tmp_dir / f"test_{self.test_log_file_contains_message.__name__}.log"
-        setup_logging(log_file=log_file)
+class TestLoggingConfig:
+    """测试日志配置模块"""
 
-        logging.info("Test message")
+    def test_setup_logging_creates_root_logger(self, configured_logger):
+        """测试：setup_logging应创建root logger"""
+        logger, _ = configured_logger
 
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
+        assert logger is not None
+        assert logger.name == "root"
+        assert isinstance(logger, logging.Logger)
 
-        content = log_file.read_text(encoding='utf-8')
-        assert "Test message" in content
+    def test_setup_logging_creates_file_handler(self, configured_logger):
+        """测试：setup_logging应创建文件handler"""
+        file_handlers = [h for h in get_log_handlers() if isinstance(h, logging.FileHandler)]
+        assert len(file_handlers) == 1
 
-    def test_log_file_has_correct_format(self, tmp_dir):
-        """测试：日志文件格式应正确"""
-        from scann.logger_config import setup_logging
+    def test_setup_logging_creates_console_handler(self, configured_logger):
+        """测试：setup_logging应创建控制台handler"""
+        console_handlers = [h for h in get_log_handlers() if isinstance(h, logging.StreamHandler)]
+        assert len(console_handlers) >= 1
 
-        log_file = tmp_dir / f"test_{self.test_log_file_has_correct_format.__name__}.log"
-        setup_logging(log_file=log_file)
+    def test_root_logger_only_enqueues(self, configured_logger):
+        """测试：root logger只挂QueueHandler，写出由后台监听器完成"""
+        from logging.handlers import QueueHandler
 
-        logging.info("Format test")
+        logger, _ = configured_logger
 
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
+        assert sum(isinstance(h, QueueHandler) for h in logger.handlers) == 1
+        assert not any(isinstance(h, logging.FileHandler) for h in logger.handlers)
 
-        content = log_file.read_text(encoding='utf-8')
-        lines = content.strip().split('\n')
+    def test_setup_logging_creates_log_file(self, configured_logger):
+        """测试：setup_logging应创建日志文件"""
+        _, log_file = configured_logger
 
-        assert len(lines) > 0
-        # 找到包含"Format test"的那一行
-        format_line = None
-        for line in lines:
-            if "Format test" in line:
-                format_line = line
-                break
+        # 刷新到磁盘
+        _drain_log_handlers()
 
-        assert format_line is not None
-        # 应包含时间戳、级别和消息
-        assert "INFO" in format_line
-        assert "Format test" in format_line
-        assert "-" in format_line  # 时间戳分隔符
+        assert log_file.exists()
 
-    def test_log_levels(self, tmp_dir):
-        """测试：日志级别应正确过滤"""
-        from scann.logger_config import setup_logging
+    def test_log_file_contains_message(self, configured_logger, caplog):
+        """测试：日志应包含消息"""
+        logging.info("Test message")
 
-        log_file = tmp_dir / f"test_{self.test_log_levels.__name__}.log"
-        setup_logging(log_file=log_file, log_level=logging.WARNING)
+        assert "Test message" in caplog.text
 
-        logging.debug("DEBUG message")
-        logging.info("INFO message")
-        logging.warning("WARNING message")
-        logging.error("ERROR message")
+    def test_log_file_has_correct_format(self, configured_logger):
+        """测试：日志文件格式应正确"""
+        _, log_file = configured_logger
 
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
+        logging.info("Format test")
 
-        content = log_file.read_text(encoding='utf-8')
+        # 刷新到磁盘
+        _drain_log_handlers()
 
-        # WARNING及以上应该记录
-        assert "WARNING message" in content
-        assert "ERROR message" in content
-        # DEBUG和INFO不应该记录
-        assert "DEBUG message" not in content
-        assert "INFO message" not in content
+        # 找到包含"Format test"的那一行 (只做 ASCII 匹配, 无需解码整个文件)
+        format_line = next(
+            (line for line in log_file.read_bytes().splitlines() if b"Format test" in line),
+            None,
+        )
 
-    def test_utf8_encoding(self, tmp_dir):
+        assert format_line is not None
+        # 应包含时间戳、级别和消息
+        assert b"INFO" in format_line
+        assert b"-" in format_line  # 时间戳分隔符
+
+    def test_log_levels(self, log_file):
+        """测试：setup_logging 的 log_level 应正确过滤"""
+        setup_logging(log_file=log_file, log_level=logging.WARNING, console_output=False)
+
+        cases = [
+            (logging.DEBUG, "DEBUG message"),
+            (logging.INFO, "INFO message"),
+            (logging.WARNING, "WARNING message"),
+            (logging.ERROR, "ERROR message"),
+        ]
+        for level, msg in cases:
+            logging.log(level, msg)
+
+        _drain_log_handlers()
+
+        # WARNING及以上应该记录, DEBUG和INFO不应该记录
+        content = log_file.read_bytes()
+        for level, msg in cases:
+            assert (msg.encode() in content) == (level >= logging.WARNING)
+
+    def test_utf8_encoding(self, configured_logger):
         """测试：日志文件应支持UTF-8编码"""
-        from scann.logger_config import setup_logging
-
-        log_file = tmp_dir / f"test_{self.test_utf8_encoding.__name__}.log"
-        setup_logging(log_file=log_file)
+        _, log_file = configured_logger
 
         chinese_msg = "测试中文消息"
         emoji_msg = "Emoji test "
         logging.info(chinese_msg)
         logging.info(emoji_msg)
 
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
+        # 刷新到磁盘
+        _drain_log_handlers()
 
-        content = log_file.read_text(encoding='utf-8')
-        assert chinese_msg in content
-        assert emoji_msg in content
+        raw = log_file.read_bytes()
+        assert chinese_msg.encode('utf-8') in raw
+        assert emoji_msg.encode('utf-8') in raw
 
-    def test_console_output_disabled(self, tmp_dir):
+    def test_console_output_disabled(self, log_file):
         """测试：可以禁用控制台输出"""
-        from scann.logger_config import setup_logging
-
-        log_file = tmp_dir / f"test_{self.test_console_output_disabled.__name__}.log"
-
-        with patch('sys.stdout') as mock_stdout:
-            logger = setup_logging(log_file=log_file, console_output=False)
-            console_handlers = [h for h in logger.handlers
-                                if isinstance(h, logging.StreamHandler)
-                                and not isinstance(h, logging.FileHandler)]
-            assert len(console_handlers) == 0
+        setup_logging(log_file=log_file, console_output=False)
+        console_handlers = [h for h in get_log_handlers()
+                            if isinstance(h, logging.StreamHandler)
+                            and not isinstance(h, logging.FileHandler)]
+        assert len(console_handlers) == 0
 
     def test_setup_logging_default_log_file(self, tmp_dir):
         """测试：默认日志文件路径"""
-        from scann.logger_config import setup_logging
-
         # Monkey patch临时目录
         import scann.logger_config
         original_path = scann.logger_config.Path
@@ -200,129 +209,60 @@ class TestLoggingConfig:
 class TestMainWindowLogging:
     """测试MainWindow日志集成"""
 
-    def setup_method(self):
-        """每个测试前：清理handlers"""
-        logging.root.handlers.clear()
-
-    def teardown_method(self):
-        """每个测试后：清理"""
-        for handler in logging.root.handlers[:]:
-            try:
-                handler.close()
-            except:
-                pass
-            logging.root.removeHandler(handler)
-
-    def test_main_window_has_logger(self, qapp, tmp_dir):
+    def test_main_window_has_logger(self, main_window, configured_logger):
         """测试：MainWindow应有logger"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging
-
-        log_file = tmp_dir / f"test_{self.test_main_window_has_logger.__name__}.log"
-        setup_logging(log_file=log_file)
+        assert main_window._logger is not None
+        assert isinstance(main_window._logger, logging.Logger)
+        assert main_window._logger.name == "scann.gui.main_window"
 
-        window = MainWindow()
-
-        assert window._logger is not None
-        assert isinstance(window._logger, logging.Logger)
-        assert window._logger.name == "scann.gui.main_window"
-
-        window.close()
-
-    def test_show_message_logs_to_file(self, qapp, tmp_dir):
+    def test_show_message_logs_to_file(self, probe_window, configured_logger):
         """测试：_show_message应记录到文件"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging
-
-        log_file = tmp_dir / f"test_{self.test_show_message_logs_to_file.__name__}.log"
-        setup_logging(log_file=log_file)
-
-        window = MainWindow()
-        window._show_message("Test message", timeout=0, level='INFO')
-
-        # 刷新并等待文件写入
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
+        _, log_file = configured_logger
 
-        content = log_file.read_text(encoding='utf-8')
-        assert "Test message" in content
+        probe_window._show_message("Test message", timeout=0, level='INFO')
 
-        window.close()
+        # 作为外部读者观察文件, 等待后台监听器写出
+        wait_until(lambda: b"Test message" in log_file.read_bytes())
 
-    def test_show_message_updates_status_bar(self, qapp):
+    def test_show_message_updates_status_bar(self, probe_window):
         """测试：_show_message应更新status bar"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging
-
         # 不记录到文件
         setup_logging(console_output=True)
 
-        window = MainWindow()
-        window._show_message("Status message", timeout=0)
+        probe_window._show_message("Status message", timeout=0)
 
-        current_message = window.statusBar().currentMessage()
+        current_message = probe_window.statusBar().currentMessage()
         assert "Status message" == current_message
 
-        window.close()
-
-    def test_show_message_with_different_levels(self, qapp):
+    @pytest.mark.parametrize("level", ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    def test_show_message_with_level(self, probe_window, configured_logger, level):
         """测试：_show_message应支持不同日志级别"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging
-
-        setup_logging(console_output=True)
+        probe_window._show_message(level, timeout=0, level=level)
 
-        window = MainWindow()
+        assert probe_window.statusBar().currentMessage() == level
 
-        # 测试不同级别
-        window._show_message("DEBUG", timeout=0, level='DEBUG')
-        window._show_message("INFO", timeout=0, level='INFO')
-        window._show_message("WARNING", timeout=0, level='WARNING')
-        window._show_message("ERROR", timeout=0, level='ERROR')
-        window._show_message("CRITICAL", timeout=0, level='CRITICAL')
-
-        window.close()
-
-    def test_logger_name_in_main_window(self, qapp):
+    def test_logger_name_in_main_window(self, main_window):
         """测试：MainWindow中logger名称正确"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging, get_logger
-
         setup_logging(console_output=True)
 
-        window = MainWindow()
-
         # logger应该有正确的名称
-        assert "scann.gui.main_window" in window._logger.name
+        assert "scann.gui.main_window" in main_window._logger.name
 
-        window.close()
+    def test_main_window_uses_logging_mixin(self):
+        """测试：MainWindow的日志能力来自LoggingMixin"""
+        assert issubclass(MainWindow, LoggingMixin)
+        assert MainWindow._show_message is LoggingMixin._show_message
+
+    def test_mixin_logger_named_after_subclass_module(self, probe_window):
+        """测试：混入的logger以子类所在模块命名"""
+        assert probe_window._logger.name == __name__
 
 
 class TestLoggingCleanup:
     """测试日志系统清理"""
 
-    def setup_method(self):
-        """每个测试前：清理handlers"""
-        logging.root.handlers.clear()
-
-    def teardown_method(self):
-        """每个测试后：清理"""
-        for handler in logging.root.handlers[:]:
-            try:
-                handler.close()
-            except:
-                pass
-            logging.root.removeHandler(handler)
-
-    def test_close_logging_removes_all_handlers(self, tmp_dir):
+    def test_close_logging_removes_all_handlers(self, configured_logger):
         """测试：close_logging应移除所有handlers"""
-        from scann.logger_config import setup_logging, close_logging
-
-        log_file = tmp_dir / f"test_{self.test_close_logging_removes_all_handlers.__name__}.log"
-        setup_logging(log_file=log_file)
-
         logger = logging.getLogger()
         initial_handlers_count = len(logger.handlers)
         assert initial_handlers_count > 0
@@ -332,36 +272,48 @@ class TestLoggingCleanup:
         final_handlers_count = len(logger.handlers)
         assert final_handlers_count == 0
 
-    def test_close_logging_allows_file_deletion(self, tmp_dir):
-        """测试：close_logging后应能删除日志文件（Windows兼容性测试）"""
-        from scann.logger_config import setup_logging, close_logging
+    def test_close_logging_stops_listener(self, configured_logger):
+        """测试：close_logging应先写完队列中的日志再停止后台监听"""
+        _, log_file = configured_logger
 
-        log_file = tmp_dir / f"test_{self.test_close_logging_allows_file_deletion.__name__}.log"
-        setup_logging(log_file=log_file)
+        logging.info("Queued before close")
+        close_logging()
+
+        assert get_log_handlers() == ()
+        assert b"Queued before close" in log_file.read_bytes()
+
+    def test_burst_written_after_drain(self, configured_logger):
+        """测试：突发的多条日志在队列排空后全部写入文件"""
+        _, log_file = configured_logger
+
+        for i in range(200):
+            logging.info("Burst message %03d", i)
+        drain_logging()
+
+        raw = log_file.read_bytes()
+        assert raw.count(b"Burst message") == 200
+        assert b"Burst message 199" in raw
+
+    @pytest.mark.skipif(sys.platform != 'win32', reason="tests Windows file-handle semantics")
+    def test_close_logging_allows_file_deletion(self, configured_logger):
+        """测试：close_logging后应能删除日志文件（Windows兼容性测试）"""
+        _, log_file = configured_logger
 
         logging.info("Test message")
 
         # 刷新并关闭
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
+        _drain_log_handlers()
 
         close_logging()
 
         # 验证文件可以删除
-        import os
         try:
             os.remove(log_file)
         except PermissionError:
             pytest.fail("无法删除日志文件，可能文件句柄未正确关闭")
 
-    def test_close_logging_handles_sublogger_handlers(self, tmp_dir):
+    def test_close_logging_handles_sublogger_handlers(self, tmp_dir, configured_logger):
         """测试：close_logging应清理子logger的handlers"""
-        from scann.logger_config import setup_logging, close_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_close_logging_handles_sublogger_handlers.__name__}.log"
-        setup_logging(log_file=log_file)
-
         # 创建子logger并添加handler
         sub_logger = get_logger("test.sublogger")
         custom_handler = logging.FileHandler(tmp_dir / "custom.log")
@@ -379,22 +331,8 @@ class TestLoggingCleanup:
 class TestAdvancedLogging:
     """测试高级日志场景"""
 
-    def setup_method(self):
-        """每个测试前：清理handlers"""
-        logging.root.handlers.clear()
-
-    def teardown_method(self):
-        """每个测试后：清理"""
-        from scann.logger_config import close_logging
-        close_logging()
-
-    def test_multiple_modules_logging(self, tmp_dir):
+    def test_multiple_modules_logging(self, configured_logger, caplog):
         """测试：多个模块的logger应该正确记录"""
-        from scann.logger_config import setup_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_multiple_modules_logging.__name__}.log"
-        setup_logging(log_file=log_file)
-
         # 模拟多个模块
         module1_logger = get_logger("scann.module1")
         module2_logger = get_logger("scann.module2")
@@ -404,28 +342,15 @@ class TestAdvancedLogging:
         module2_logger.info("Message from module2")
         module3_logger.info("Message from submodule")
 
-        # 刷新
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-
-        time.sleep(0.1)
-
-        content = log_file.read_text(encoding='utf-8')
-        assert "Message from module1" in content
-        assert "Message from module2" in content
-        assert "Message from submodule" in content
-        assert "scann.module1" in content
-        assert "scann.module2" in content
-        assert "scann.services.submodule" in content
+        records = [(r.name, r.getMessage()) for r in caplog.records]
+        assert records == [
+            ("scann.module1", "Message from module1"),
+            ("scann.module2", "Message from module2"),
+            ("scann.services.submodule", "Message from submodule"),
+        ]
 
-    def test_exception_logging_with_traceback(self, tmp_dir):
+    def test_exception_logging_with_traceback(self, configured_logger, caplog):
         """测试：异常日志应包含traceback"""
-        from scann.logger_config import setup_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_exception_logging_with_traceback.__name__}.log"
-        setup_logging(log_file=log_file)
-
         logger = get_logger(__name__)
 
         try:
@@ -433,24 +358,14 @@ class TestAdvancedLogging:
         except Exception as e:
             logger.error("An error occurred", exc_info=True)
 
-        # 刷新
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-
-        time.sleep(0.1)
-
-        content = log_file.read_text(encoding='utf-8')
+        content = caplog.text
         assert "An error occurred" in content
         assert "ValueError" in content
         assert "Test exception" in content
         assert "Traceback" in content
 
-    def test_logger_hierarchical_structure(self, tmp_dir):
+    def test_logger_hierarchical_structure(self, log_file):
         """测试：logger层级结构应正确传播"""
-        from scann.logger_config import setup_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_logger_hierarchical_structure.__name__}.log"
         setup_logging(log_file=log_file, log_level=logging.DEBUG)
 
         parent_logger = get_logger("scann")
@@ -462,23 +377,16 @@ class TestAdvancedLogging:
         grandchild_logger.warning("Grandchild warning message")
 
         # 刷新
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
+        _drain_log_handlers()
 
-        time.sleep(0.1)
+        raw = log_file.read_bytes()
+        assert b"Parent debug message" in raw
+        assert b"Child info message" in raw
+        assert b"Grandchild warning message" in raw
 
-        content = log_file.read_text(encoding='utf-8')
-        assert "Parent debug message" in content
-        assert "Child info message" in content
-        assert "Grandchild warning message" in content
-
-    def test_log_format_different_levels(self, tmp_dir):
+    def test_log_format_different_levels(self, configured_logger, caplog):
         """测试：不同日志级别的日志应该有正确的格式"""
-        from scann.logger_config import setup_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_log_format_different_levels.__name__}.log"
-        setup_logging(log_file=log_file, log_level=logging.DEBUG)  # 使用DEBUG级别以记录所有消息
+        caplog.set_level(logging.DEBUG)  # 使用DEBUG级别以记录所有消息
 
         logger = get_logger(__name__)
 
@@ -488,25 +396,14 @@ class TestAdvancedLogging:
         logger.error("ERROR level message")
         logger.critical("CRITICAL level message")
 
-        # 刷新
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-
-        time.sleep(0.1)
+        for record in caplog.records:
+            assert record.getMessage() == f"{record.levelname} level message"
+        assert [r.levelname for r in caplog.records] == [
+            "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL",
+        ]
 
-        content = log_file.read_text(encoding='utf-8')
-        assert "DEBUG level message" in content
-        assert "INFO level message" in content
-        assert "WARNING level message" in content
-        assert "ERROR level message" in content
-        assert "CRITICAL level message" in content
-
-    def test_logger_level_filtering_sublogger(self, tmp_dir):
+    def test_logger_level_filtering_sublogger(self, log_file):
         """测试：子logger的级别过滤应该正确工作"""
-        from scann.logger_config import setup_logging, get_logger
-
-        log_file = tmp_dir / f"test_{self.test_logger_level_filtering_sublogger.__name__}.log"
         setup_logging(log_file=log_file, log_level=logging.INFO)
 
         logger = get_logger("test.module")
@@ -518,53 +415,26 @@ class TestAdvancedLogging:
         logger.error("This should appear")
 
         # 刷新
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-
-        time.sleep(0.1)
+        _drain_log_handlers()
 
-        content = log_file.read_text(encoding='utf-8')
-        assert "This should not appear" not in content
-        assert "This should appear" in content
+        raw = log_file.read_bytes()
+        assert b"This should not appear" not in raw
+        assert b"This should appear" in raw
 
 
 class TestLoggingIntegration:
     """集成测试"""
 
-    def setup_method(self):
-        """每个测试前：清理handlers"""
-        logging.root.handlers.clear()
-
-    def teardown_method(self):
-        """每个测试后：清理"""
-        from scann.logger_config import close_logging
-        close_logging()
-
-    def test_end_to_end_logging(self, qapp, tmp_dir):
+    def test_end_to_end_logging(self, main_window, configured_logger):
         """端到端测试：setup -> main window -> status bar -> file"""
-        from scann.gui.main_window import MainWindow
-        from scann.logger_config import setup_logging
-
-        log_file = tmp_dir / f"test_{self.test_end_to_end_logging.__name__}.log"
-        setup_logging(log_file=log_file)
-
-        window = MainWindow()
+        _, log_file = configured_logger
 
         # 测试消息
-        window._show_message("Integration test message", timeout=0)
+        main_window._show_message("Integration test message", timeout=0)
 
         # 检查status bar
-        status_message = window.statusBar().currentMessage()
+        status_message = main_window.statusBar().currentMessage()
         assert "Integration test message" in status_message
 
-        # 检查文件
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.FileHandler):
-                handler.flush()
-        time.sleep(0.1)
-
-        content = log_file.read_text(encoding='utf-8')
-        assert "Integration test message" in content
-
-        window.close()
+        # 检查文件 (等待后台监听器写出)
+        wait_until(lambda: b"Integration test message" in log_file.read_bytes())
@@ -1,113 +1,103 @@
 """Test Logging System - TDD Test Suite"""
 
+import io
 import logging
 import os
 import sys
-from pathlib import Path
 from unittest.mock import Mock, patch
 import pytest
 
+pytest.importorskip("PyQt5.QtWidgets")
+
+from scann.gui.main_window import MainWindow
+from scann.logger_config import close_logging, drain_logging, get_log_handlers, setup_logging
+
 
 class TestLoggingSystem:
     """Logging System Test Suite"""
 
-    def setup_method(self):
-        """Execute before each test method"""
-        # Clear existing handlers
+    @pytest.fixture(autouse=True)
+    def _clean_logging(self):
+        """Clear root handlers before each test, stop the listener after"""
         logging.root.handlers.clear()
-        # Test log file path
-        self.test_log_file = Path("test_scann.log")
+        yield
+        close_logging()
 
-    def teardown_method(self):
-        """Execute after each test method"""
-        # Clear handlers
-        logging.root.handlers.clear()
-        # Delete test log file
-        if self.test_log_file.exists():
-            self.test_log_file.unlink()
-
-    def test_global_logger_initialization(self):
+    def test_global_logger_initialization(self, log_file):
         """Test 1: Global logger initialization should succeed"""
-        from scann.logger_config import setup_logging
-
-        logger = setup_logging(log_file=self.test_log_file)
+        logger = setup_logging(log_file=log_file)
 
         # Verify logger is created
         assert logger is not None
         assert isinstance(logger, logging.Logger)
         assert logger.name == "root"
 
-    def test_logger_has_file_handler(self):
+    def test_logger_has_file_handler(self, log_file):
         """Test 2: Logger should have file handler"""
-        from scann.logger_config import setup_logging
-
-        logger = setup_logging(log_file=self.test_log_file)
+        setup_logging(log_file=log_file)
 
         # Verify file handler exists
-        file_handlers = [h for h in logger.handlers if isinstance(h, logging.FileHandler)]
+        file_handlers = [h for h in get_log_handlers() if isinstance(h, logging.FileHandler)]
         assert len(file_handlers) > 0, "Should have file handler"
 
-    def test_logger_has_console_handler(self):
+    def test_logger_has_console_handler(self, log_file):
         """Test 3: Logger should have console handler"""
-        from scann.logger_config import setup_logging
-
-        logger = setup_logging(log_file=self.test_log_file)
+        setup_logging(log_file=log_file)
 
         # Verify console handler exists
-        console_handlers = [h for h in logger.handlers if isinstance(h, logging.StreamHandler)]
+        console_handlers = [h for h in get_log_handlers() if isinstance(h, logging.StreamHandler)]
         assert len(console_handlers) > 0, "Should have console handler"
 
-    def test_log_file_is_created(self):
+    def test_log_file_is_created(self, log_file):
         """Test 4: Log file should be created"""
-        from scann.logger_config import setup_logging
-
-        setup_logging(log_file=self.test_log_file)
+        setup_logging(log_file=log_file)
 
         # Write log
         logging.info("Test message")
 
         # Verify log file exists
-        assert self.test_log_file.exists(), "Log file should exist"
-
-    def test_log_file_contains_message(self):
-        """Test 5: Log file should contain message"""
-        from scann.logger_config import setup_logging
-
-        setup_logging(log_file=self.test_log_file)
+        assert log_file.exists(), "Log file should exist"
+
+    @staticmethod
+    def _setup_in_memory(log_file) -> io.StringIO:
+        """Configure logging with the console sink redirected to a StringIO"""
+        stream = io.StringIO()
+        setup_logging(log_file=log_file, stream=stream)
+        return stream
+
+    def test_log_file_contains_message(self, log_file):
+        """Test 5: Log output should contain message"""
+        stream = self._setup_in_memory(log_file)
         test_message = "This is a test log message"
 
         logging.info(test_message)
 
-        # Read log file
-        log_content = self.test_log_file.read_text(encoding='utf-8')
-        assert test_message in log_content, "Log file should contain test message"
-
-    def test_log_file_has_correct_format(self):
-        """Test 6: Log file should have correct format"""
-        from scann.logger_config import setup_logging
+        # Read captured output
+        drain_logging()
+        assert test_message in stream.getvalue(), "Log output should contain test message"
 
-        setup_logging(log_file=self.test_log_file)
+    def test_log_file_has_correct_format(self, log_file):
+        """Test 6: Log output should have correct format"""
+        stream = self._setup_in_memory(log_file)
         test_message = "Format test message"
 
         logging.info(test_message)
 
-        # Read log file
-        log_content = self.test_log_file.read_text(encoding='utf-8')
-        lines = log_content.strip().split('\n')
+        # Read captured output (setup_logging writes its own init lines first)
+        drain_logging()
+        lines = [line for line in stream.getvalue().splitlines() if test_message in line]
 
         # Verify format: should contain timestamp, level and message
-        assert len(lines) > 0
+        assert len(lines) == 1
         log_line = lines[0]
         assert "INFO" in log_line, "Should contain log level"
         assert test_message in log_line, "Should contain message"
         # Should have timestamp format
         assert any(c in log_line for c in ['-', ':']), "Should contain timestamp format"
 
-    def test_logger_log_levels(self):
+    def test_logger_log_levels(self, log_file):
         """Test 7: Logger should support different log levels"""
-        from scann.logger_config import setup_logging
-
-        setup_logging(log_file=self.test_log_file)
+        stream = self._setup_in_memory(log_file)
 
         # Test different levels
         logging.debug("DEBUG message")
@@ -115,8 +105,9 @@ class TestLoggingSystem:
         logging.warning("WARNING message")
         logging.error("ERROR message")
 
-        # Read log file
-        log_content = self.test_log_file.read_text(encoding='utf-8')
+        # Read captured output
+        drain_logging()
+        log_content = stream.getvalue()
 
         # INFO and above should be recorded (since logger is set to INFO)
         assert "INFO message" in log_content
@@ -125,35 +116,25 @@ class TestLoggingSystem:
         # DEBUG should not be recorded
         assert "DEBUG message" not in log_content
 
-    def test_logger_utf8_encoding(self):
-        """Test 8: Log file should support UTF-8 encoding"""
-        from scann.logger_config import setup_logging
-
-        setup_logging(log_file=self.test_log_file)
-        test_message = "Test Chinese message"
+    def test_logger_utf8_encoding(self, log_file):
+        """Test 8: Log output should support non-ASCII text"""
+        stream = self._setup_in_memory(log_file)
+        test_message = "测试中文消息"
 
         logging.info(test_message)
 
-        # Read log file
-        log_content = self.test_log_file.read_text(encoding='utf-8')
-        assert test_message in log_content, "Should handle UTF-8 encoding correctly"
+        # Read captured output
+        drain_logging()
+        assert test_message in stream.getvalue(), "Should handle UTF-8 encoding correctly"
 
-    def test_show_message_outputs_to_statusbar(self):
+    def test_show_message_outputs_to_statusbar(self, qapp):
         """Test 9: _show_message should output to status bar"""
-        from PyQt5.QtWidgets import QApplication
-        from scann.gui.main_window import MainWindow
-
-        if not QApplication.instance():
-            app = QApplication([])
-        else:
-            app = QApplication.instance()
-
         # Create main window (but don't show)
         window = MainWindow()
 
         # Mock status bar
         mock_statusbar = Mock()
-        window.setStatusBar(mock_statusbar)
+        window.statusBar = lambda: mock_statusbar
 
         # Call _show_message
         test_message = "Test status bar message"
@@ -164,28 +145,17 @@ class TestLoggingSystem:
         args = mock_statusbar.showMessage.call_args[0]
         assert test_message in args[0]
 
-        app.quit()
-
-    def test_show_message_outputs_to_logger(self):
+    def test_show_message_outputs_to_logger(self, qapp):
         """Test 10: _show_message should output to logger"""
-        from PyQt5.QtWidgets import QApplication
-        from scann.gui.main_window import MainWindow
-        import logging
-
         # Initialize logger for testing
         logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-        if not QApplication.instance():
-            app = QApplication([])
-        else:
-            app = QApplication.instance()
-
         # Create main window (but don't show)
         window = MainWindow()
 
         # Mock status bar (to avoid actual display)
         mock_statusbar = Mock()
-        window.setStatusBar(mock_statusbar)
+        window.statusBar = lambda: mock_statusbar
 
         # Mock logger output
         with patch.object(window._logger, 'log') as mock_log:
@@ -197,28 +167,17 @@ class TestLoggingSystem:
             call_args = mock_log.call_args[0]
             assert test_message in call_args[1], "Message should be passed to logger"
 
-        app.quit()
-
-    def test_show_message_with_different_levels(self):
+    def test_show_message_with_different_levels(self, qapp):
         """Test 11: _show_message should support different log levels"""
-        from PyQt5.QtWidgets import QApplication
-        from scann.gui.main_window import MainWindow
-        import logging
-
         # Initialize logger for testing
         logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 
-        if not QApplication.instance():
-            app = QApplication([])
-        else:
-            app = QApplication.instance()
-
         # Create main window
         window = MainWindow()
 
         # Mock
         mock_statusbar = Mock()
-        window.setStatusBar(mock_statusbar)
+        window.statusBar = lambda: mock_statusbar
 
         # Test different levels
         with patch.object(window._logger, 'log') as mock_log:
@@ -233,21 +192,10 @@ class TestLoggingSystem:
             call_args = mock_log.call_args[0]
             assert call_args[0] == logging.ERROR
 
-        app.quit()
-
-    def test_main_window_uses_global_logger(self):
+    def test_main_window_uses_global_logger(self, qapp, log_file):
         """Test 12: MainWindow should use global logger"""
-        from PyQt5.QtWidgets import QApplication
-        from scann.logger_config import setup_logging
-        from scann.gui.main_window import MainWindow
-
         # Initialize global logging
-        logger = setup_logging(log_file=self.test_log_file)
-
-        if not QApplication.instance():
-            app = QApplication([])
-        else:
-            app = QApplication.instance()
+        logger = setup_logging(log_file=log_file)
 
         # Create main window
         window = MainWindow()
@@ -261,60 +209,41 @@ class TestLoggingSystem:
         window._show_message(test_message)
 
         # Verify log file contains message
-        log_content = self.test_log_file.read_text(encoding='utf-8')
+        drain_logging()
+        log_content = log_file.read_text(encoding='utf-8')
         assert test_message in log_content
 
-        app.quit()
-
 
-def test_integration_logging_with_app():
+def test_integration_logging_with_app(qapp, log_file):
     """Integration test: Verify complete app logging flow"""
-    from scann.logger_config import setup_logging
-    from PyQt5.QtWidgets import QApplication
-    from scann.gui.main_window import MainWindow
-    import logging
-
     # Setup logging
-    test_log_file = Path("test_integration.log")
-    logger = setup_logging(log_file=test_log_file)
-
-    try:
-        if not QApplication.instance():
-            app = QApplication([])
-        else:
-            app = QApplication.instance()
-
-        # Create main window
-        window = MainWindow()
-
-        # Mock status bar
-        mock_statusbar = Mock()
-        window.setStatusBar(mock_statusbar)
+    setup_logging(log_file=log_file)
 
-        # Send multiple messages
-        messages = [
-            ("Startup message", "INFO"),
-            ("Warning message", "WARNING"),
-            ("Error message", "ERROR"),
-        ]
+    # Create main window
+    window = MainWindow()
 
-        for msg, level in messages:
-            window._show_message(msg, level=level)
+    # Mock status bar
+    mock_statusbar = Mock()
+    window.statusBar = lambda: mock_statusbar
 
-        # Verify status bar calls
-        assert mock_statusbar.showMessage.call_count == len(messages)
+    # Send multiple messages
+    messages = [
+        ("Startup message", "INFO"),
+        ("Warning message", "WARNING"),
+        ("Error message", "ERROR"),
+    ]
 
-        # Verify log file
-        log_content = test_log_file.read_text(encoding='utf-8')
-        for msg, level in messages:
-            assert msg in log_content, f"Log should contain: {msg}"
+    for msg, level in messages:
+        window._show_message(msg, level=level)
 
-        app.quit()
+    # Verify status bar calls
+    assert mock_statusbar.showMessage.call_count == len(messages)
 
-    finally:
-        # Cleanup
-        if test_log_file.exists():
-            test_log_file.unlink()
+    # Verify log file
+    drain_logging()
+    log_content = log_file.read_text(encoding='utf-8')
+    for msg, level in messages:
+        assert msg in log_content, f"Log should contain: {msg}"
 
 
 if __name__ == "__main__":
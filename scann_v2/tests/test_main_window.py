@@ -13,7 +13,7 @@
 
 import pytest
 import numpy as np
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, MagicMock
 from PyQt5.QtCore import Qt
 
 from scann.core.models import Candidate, TargetVerdict
@@ -24,18 +24,33 @@ from scann.services.blink_service import BlinkState
 #  辅助: 创建 Mock 化的 MainWindow 实例
 # ═══════════════════════════════════════════════
 
-def _make_mock_window():
-    """创建一个跳过 __init__ 的 MainWindow, 手动挂载 Mock 属性"""
+# 只读的共享测试图像 (各测试只读取, 避免重复分配)
+_ZEROS_64 = np.zeros((64, 64), np.float32)
+_ZEROS_64.setflags(write=False)
+_ZEROS_32 = np.zeros((32, 32), np.float32)
+_ZEROS_32.setflags(write=False)
+
+
+@pytest.fixture
+def w(spec_names):
+    """跳过 __init__ 的 MainWindow, 手动挂载 Mock 属性 (每个测试独立一份)
+
+    控件/服务的 Mock 带 spec, 访问真实类上不存在的属性 (拼写错误、
+    方法改名) 会立即报 AttributeError。
+    """
     from scann.gui.main_window import MainWindow
 
-    with patch("scann.gui.main_window.QMainWindow.__init__"):
-        w = MainWindow.__new__(MainWindow)
+    def spec(name):
+        return Mock(spec=spec_names[name])
+
+    # __new__ 不会调用 __init__, 无需 patch
+    w = MainWindow.__new__(MainWindow)
 
     # 图像查看器
-    w.image_viewer = Mock()
+    w.image_viewer = spec("FitsImageViewer")
 
     # 闪烁服务
-    w.blink_service = Mock()
+    w.blink_service = spec("BlinkService")
     w.blink_service.is_inverted = False
     w.blink_service.is_running = False
     w.blink_service.speed_ms = 500
@@ -43,47 +58,47 @@ def _make_mock_window():
     w.blink_service.set_state = Mock()  # 添加 set_state 方法
 
     # 定时器
-    w.blink_timer = Mock()
+    w.blink_timer = spec("QTimer")
 
     # 浮层标签
-    w.overlay_state = Mock()
-    w.overlay_inv = Mock()
-    w.overlay_blink = Mock()
+    w.overlay_state = spec("OverlayLabel")
+    w.overlay_inv = spec("OverlayLabel")
+    w.overlay_blink = spec("OverlayLabel")
 
     # 控制栏按钮
-    w.btn_show_new = Mock()
-    w.btn_show_old = Mock()
-    w.btn_blink = Mock()
-    w.btn_invert = Mock()
-    w.btn_mark_real = Mock()
-    w.btn_mark_bogus = Mock()
-    w.btn_next_candidate = Mock()
+    w.btn_show_new = spec("QPushButton")
+    w.btn_show_old = spec("QPushButton")
+    w.btn_blink = spec("QPushButton")
+    w.btn_invert = spec("QPushButton")
+    w.btn_mark_real = spec("QPushButton")
+    w.btn_mark_bogus = spec("QPushButton")
+    w.btn_next_candidate = spec("QPushButton")
 
     # 侧边栏
-    w.sidebar = Mock()
+    w.sidebar = spec("CollapsibleSidebar")
 
     # 候选表格
-    w.suspect_table = Mock()
+    w.suspect_table = spec("SuspectTableWidget")
 
     # 闪烁速度
-    w.blink_speed = Mock()
+    w.blink_speed = spec("BlinkSpeedSlider")
 
     # 直方图面板
-    w.histogram_panel = Mock()
+    w.histogram_panel = spec("HistogramPanel")
     w.histogram_panel.black_point = 0.0
     w.histogram_panel.white_point = 1.0
 
     # 文件列表
-    w.file_list = Mock()
+    w.file_list = spec("QListWidget")
 
     # 状态栏
-    w.status_image_type = Mock()
-    w.status_pixel_coord = Mock()
-    w.status_wcs_coord = Mock()
-    w.status_zoom = Mock()
+    w.status_image_type = spec("QLabel")
+    w.status_pixel_coord = spec("CoordinateLabel")
+    w.status_wcs_coord = spec("CoordinateLabel")
+    w.status_zoom = spec("QLabel")
 
     # 动作
-    w.act_show_markers = Mock()
+    w.act_show_markers = spec("QAction")
     w.act_show_markers.isChecked.return_value = True
 
     # statusBar mock
@@ -105,6 +120,16 @@ def _make_mock_window():
     return w
 
 
+class TestMockWindowSpec:
+    """w fixture 的 Mock 仍按真实类的属性名校验"""
+
+    def test_unknown_attribute_raises(self, w):
+        with pytest.raises(AttributeError):
+            w.image_viewer.no_such_method
+        with pytest.raises(AttributeError):
+            w.blink_service.no_such_attr
+
+
 # ═══════════════════════════════════════════════
 #  图像切换
 # ═══════════════════════════════════════════════
@@ -113,36 +138,34 @@ def _make_mock_window():
 class TestShowImage:
     """测试 _show_image 统一入口"""
 
-    def test_show_new(self):
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((64, 64), np.float32)
-        w._show_image("new")
-        w.image_viewer.set_image_data.assert_called_once()
-        w.overlay_state.setText.assert_called_with("NEW")
-        w.overlay_state.set_state.assert_called_with("new")
-
-    def test_show_old(self):
-        w = _make_mock_window()
-        w._old_image_data = np.zeros((64, 64), np.float32)
-        w._show_image("old")
-        w.image_viewer.set_image_data.assert_called_once()
-        w.overlay_state.setText.assert_called_with("OLD")
-        w.overlay_state.set_state.assert_called_with("old")
-
-    def test_show_new_none_data(self):
-        w = _make_mock_window()
+    def test_show_image_variants(self, w):
+        """新图 / 旧图 / 无数据 / 反色 四种情况共用一个窗口"""
+        w._new_image_data = _ZEROS_64
+        w._old_image_data = _ZEROS_64
+        w.blink_service.is_inverted = False
+
+        for kind in ("new", "old"):
+            w.image_viewer.reset_mock()
+            w.overlay_state.reset_mock()
+            w._show_image(kind)
+            w.image_viewer.set_image_data.assert_called_once()
+            w.overlay_state.setText.assert_called_with(kind.upper())
+            w.overlay_state.set_state.assert_called_with(kind)
+
+        # 无数据: 只提示, 不刷新图像
+        w.image_viewer.reset_mock()
+        w.overlay_state.reset_mock()
         w._new_image_data = None
         w._show_image("new")
         w.image_viewer.set_image_data.assert_not_called()
-        w.overlay_state.setText.assert_called()
+        w.overlay_state.setText.assert_called_with("无NEW")
 
-    def test_show_inverted(self):
-        w = _make_mock_window()
+        # 反色: inverted 参数被正确传递
+        w.image_viewer.reset_mock()
         w.blink_service.is_inverted = True
-        w._new_image_data = np.zeros((32, 32), np.float32)
+        w._new_image_data = _ZEROS_32
         w._show_image("new")
         w.image_viewer.set_image_data.assert_called_once()
-        # 验证 inverted 参数被正确传递
         call_kwargs = w.image_viewer.set_image_data.call_args[1]
         assert call_kwargs.get('inverted') == True
 
@@ -150,19 +173,12 @@ class TestShowImage:
 class TestOnShowNewOld:
     """测试 _on_show_new / _on_show_old"""
 
-    def test_on_show_new_sets_buttons(self):
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((32, 32), np.float32)
-        w._on_show_new()
-        w.btn_show_new.setChecked.assert_called_with(True)
-        w.btn_show_old.setChecked.assert_called_with(False)
-
-    def test_on_show_old_sets_buttons(self):
-        w = _make_mock_window()
-        w._old_image_data = np.zeros((32, 32), np.float32)
-        w._on_show_old()
-        w.btn_show_new.setChecked.assert_called_with(False)
-        w.btn_show_old.setChecked.assert_called_with(True)
+    @pytest.mark.parametrize("kind", ["new", "old"])
+    def test_on_show_sets_buttons(self, w, kind):
+        setattr(w, f"_{kind}_image_data", _ZEROS_32)
+        getattr(w, f"_on_show_{kind}")()
+        w.btn_show_new.setChecked.assert_called_with(kind == "new")
+        w.btn_show_old.setChecked.assert_called_with(kind == "old")
 
 
 # ═══════════════════════════════════════════════
@@ -173,8 +189,7 @@ class TestOnShowNewOld:
 class TestBlinkMode:
     """测试闪烁模式"""
 
-    def test_toggle_starts_timer(self):
-        w = _make_mock_window()
+    def test_toggle_starts_timer(self, w):
         w.blink_service.toggle.return_value = True
         w.blink_service.speed_ms = 400
         w._on_blink_toggle()
@@ -184,8 +199,7 @@ class TestBlinkMode:
         w.overlay_blink.show_label.assert_called_once()
         w.overlay_blink.start_pulse.assert_called_once()
 
-    def test_toggle_stops_timer(self):
-        w = _make_mock_window()
+    def test_toggle_stops_timer(self, w):
         w.blink_service.toggle.return_value = False
         w._on_blink_toggle()
         w.blink_timer.stop.assert_called_once()
@@ -193,29 +207,23 @@ class TestBlinkMode:
         w.overlay_blink.stop_pulse.assert_called_once()
         w.overlay_blink.hide_label.assert_called_once()
 
-    def test_blink_tick_new(self):
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((32, 32), np.float32)
-        w.blink_service.tick.return_value = BlinkState.NEW
-        w._on_blink_tick()
-        w.overlay_state.set_state.assert_called_with("new")
-
-    def test_blink_tick_old(self):
-        w = _make_mock_window()
-        w._old_image_data = np.zeros((32, 32), np.float32)
-        w.blink_service.tick.return_value = BlinkState.OLD
+    @pytest.mark.parametrize("kind,state", [
+        ("new", BlinkState.NEW),
+        ("old", BlinkState.OLD),
+    ])
+    def test_blink_tick(self, w, kind, state):
+        setattr(w, f"_{kind}_image_data", _ZEROS_32)
+        w.blink_service.tick.return_value = state
         w._on_blink_tick()
-        w.overlay_state.set_state.assert_called_with("old")
+        w.overlay_state.set_state.assert_called_with(kind)
 
-    def test_blink_speed_changed(self):
-        w = _make_mock_window()
+    def test_blink_speed_changed(self, w):
         w.blink_service.is_running = True
         w._on_blink_speed_changed(300)
         assert w.blink_service.speed_ms == 300
         w.blink_timer.setInterval.assert_called_with(300)
 
-    def test_blink_speed_changed_not_running(self):
-        w = _make_mock_window()
+    def test_blink_speed_changed_not_running(self, w):
         w.blink_service.is_running = False
         w._on_blink_speed_changed(300)
         w.blink_timer.setInterval.assert_not_called()
@@ -229,29 +237,22 @@ class TestBlinkMode:
 class TestInvertDisplay:
     """测试反色切换"""
 
-    def test_invert_shows_overlay(self):
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((32, 32), np.float32)
-        w.blink_service.toggle_invert.return_value = True
-        w.blink_service.current_state = BlinkState.NEW
-        w._on_invert_toggle()
-        w.overlay_inv.show_label.assert_called_once()
-        w.btn_invert.setChecked.assert_called_with(True)
-
-    def test_uninvert_hides_overlay(self):
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((32, 32), np.float32)
-        w.blink_service.toggle_invert.return_value = False
+    @pytest.mark.parametrize("inverted,overlay_method", [
+        (True, "show_label"),
+        (False, "hide_label"),
+    ])
+    def test_invert_toggles_overlay(self, w, inverted, overlay_method):
+        w._new_image_data = _ZEROS_32
+        w.blink_service.toggle_invert.return_value = inverted
         w.blink_service.current_state = BlinkState.NEW
         w._on_invert_toggle()
-        w.overlay_inv.hide_label.assert_called_once()
-        w.btn_invert.setChecked.assert_called_with(False)
+        getattr(w.overlay_inv, overlay_method).assert_called_once()
+        w.btn_invert.setChecked.assert_called_with(inverted)
 
-    def test_invert_refreshes_display(self):
-        w = _make_mock_window()
+    def test_invert_refreshes_display(self, w):
         w.blink_service.toggle_invert.return_value = True
         w.blink_service.current_state = BlinkState.OLD
-        w._old_image_data = np.zeros((32, 32), np.float32)
+        w._old_image_data = _ZEROS_32
         w._on_invert_toggle()
         w.image_viewer.set_image_data.assert_called_once()
 
@@ -264,40 +265,31 @@ class TestInvertDisplay:
 class TestCandidateMarking:
     """测试候选标记 (真/假)"""
 
-    def test_mark_real(self):
-        w = _make_mock_window()
+    @pytest.mark.parametrize("slot,verdict", [
+        ("_on_mark_real", TargetVerdict.REAL),
+        ("_on_mark_bogus", TargetVerdict.BOGUS),
+    ])
+    def test_mark(self, w, slot, verdict):
         cand = Candidate(x=100, y=200)
         w._candidates = [cand]
         w._current_candidate_idx = 0
-        w._on_mark_real()
-        assert cand.verdict == TargetVerdict.REAL
+        getattr(w, slot)()
+        assert cand.verdict == verdict
         w.suspect_table.update_candidate.assert_called_with(0)
 
-    def test_mark_bogus(self):
-        w = _make_mock_window()
-        cand = Candidate(x=100, y=200)
-        w._candidates = [cand]
-        w._current_candidate_idx = 0
-        w._on_mark_bogus()
-        assert cand.verdict == TargetVerdict.BOGUS
-        w.suspect_table.update_candidate.assert_called_with(0)
-
-    def test_mark_empty_list_no_crash(self):
-        w = _make_mock_window()
+    def test_mark_empty_list_no_crash(self, w):
         w._candidates = []
         w._current_candidate_idx = -1
         w._on_mark_real()  # 不应崩溃
         w.suspect_table.update_candidate.assert_not_called()
 
-    def test_mark_out_of_range_no_crash(self):
-        w = _make_mock_window()
+    def test_mark_out_of_range_no_crash(self, w):
         w._candidates = [Candidate(x=1, y=1)]
         w._current_candidate_idx = 5  # 越界
         w._on_mark_bogus()
         w.suspect_table.update_candidate.assert_not_called()
 
-    def test_mark_shows_status_message(self):
-        w = _make_mock_window()
+    def test_mark_shows_status_message(self, w):
         w._candidates = [Candidate(x=10, y=20)]
         w._current_candidate_idx = 0
         w._on_mark_real()
@@ -312,8 +304,7 @@ class TestCandidateMarking:
 class TestCandidateNavigation:
     """测试候选导航"""
 
-    def test_next_candidate_cycles(self):
-        w = _make_mock_window()
+    def test_next_candidate_cycles(self, w):
         w._candidates = [Candidate(x=1, y=1), Candidate(x=2, y=2), Candidate(x=3, y=3)]
         w._current_candidate_idx = 0
 
@@ -324,28 +315,24 @@ class TestCandidateNavigation:
         w._on_next_candidate()
         assert w._current_candidate_idx == 0  # 循环
 
-    def test_next_candidate_empty_list(self):
-        w = _make_mock_window()
+    def test_next_candidate_empty_list(self, w):
         w._candidates = []
         w._on_next_candidate()  # 不应崩溃
 
-    def test_focus_candidate_centers_view(self):
-        w = _make_mock_window()
+    def test_focus_candidate_centers_view(self, w):
         cand = Candidate(x=150, y=250)
         w._candidates = [cand]
         w._focus_candidate(0)
         w.image_viewer.center_on_point.assert_called_with(150, 250)
 
-    def test_candidate_selected_from_table(self):
-        w = _make_mock_window()
+    def test_candidate_selected_from_table(self, w):
         cand = Candidate(x=50, y=60)
         w._candidates = [cand]
         w._on_candidate_selected(0)
         assert w._current_candidate_idx == 0
         w.image_viewer.center_on_point.assert_called()
 
-    def test_candidate_double_clicked_zooms(self):
-        w = _make_mock_window()
+    def test_candidate_double_clicked_zooms(self, w):
         cand = Candidate(x=50, y=60)
         w._candidates = [cand]
         w._on_candidate_double_clicked(0)
@@ -360,30 +347,24 @@ class TestCandidateNavigation:
 class TestPairNavigation:
     """测试配对导航 (← →)"""
 
-    def test_prev_pair(self):
-        w = _make_mock_window()
-        w.file_list.currentRow.return_value = 2
-        w._on_prev_pair()
-        w.file_list.setCurrentRow.assert_called_with(1)
-
-    def test_prev_pair_at_zero(self):
-        w = _make_mock_window()
-        w.file_list.currentRow.return_value = 0
-        w._on_prev_pair()
-        w.file_list.setCurrentRow.assert_not_called()
-
-    def test_next_pair(self):
-        w = _make_mock_window()
-        w.file_list.currentRow.return_value = 1
+    @pytest.mark.parametrize("slot,row,expected", [
+        ("_on_prev_pair", 2, 1),
+        ("_on_next_pair", 1, 2),
+    ])
+    def test_step_pair(self, w, slot, row, expected):
+        w.file_list.currentRow.return_value = row
         w.file_list.count.return_value = 5
-        w._on_next_pair()
-        w.file_list.setCurrentRow.assert_called_with(2)
-
-    def test_next_pair_at_last(self):
-        w = _make_mock_window()
-        w.file_list.currentRow.return_value = 4
+        getattr(w, slot)()
+        w.file_list.setCurrentRow.assert_called_with(expected)
+
+    @pytest.mark.parametrize("slot,row", [
+        ("_on_prev_pair", 0),
+        ("_on_next_pair", 4),
+    ])
+    def test_step_pair_at_edge(self, w, slot, row):
+        w.file_list.currentRow.return_value = row
         w.file_list.count.return_value = 5
-        w._on_next_pair()
+        getattr(w, slot)()
         w.file_list.setCurrentRow.assert_not_called()
 
 
@@ -395,31 +376,27 @@ class TestPairNavigation:
 class TestPublicAPI:
     """测试公共 API"""
 
-    def test_set_image_data(self):
-        w = _make_mock_window()
-        new_data = np.zeros((64, 64), np.float32)
-        old_data = np.ones((64, 64), np.float32)
+    def test_set_image_data(self, w):
+        # 只校验对象身份, 内容无关: 旧图用未初始化数组即可
+        new_data = _ZEROS_64
+        old_data = np.empty((64, 64), np.float32)
         w.set_image_data(new_data, old_data)
         assert w._new_image_data is new_data
         assert w._old_image_data is old_data
         w.image_viewer.set_image_data.assert_called()
 
-    def test_set_image_data_updates_histogram(self):
-        w = _make_mock_window()
-        data = np.zeros((32, 32), np.float32)
-        w.set_image_data(data, None)
-        w.histogram_panel.set_image_data.assert_called_with(data)
+    def test_set_image_data_updates_histogram(self, w):
+        w.set_image_data(_ZEROS_32, None)
+        w.histogram_panel.set_image_data.assert_called_with(_ZEROS_32)
 
-    def test_set_candidates(self):
-        w = _make_mock_window()
+    def test_set_candidates(self, w):
         cands = [Candidate(x=10, y=20), Candidate(x=30, y=40)]
         w.set_candidates(cands)
         assert w._candidates is cands
         assert w._current_candidate_idx == 0
         w.suspect_table.set_candidates.assert_called_with(cands)
 
-    def test_set_candidates_empty(self):
-        w = _make_mock_window()
+    def test_set_candidates_empty(self, w):
         w.set_candidates([])
         assert w._current_candidate_idx == -1
 
@@ -432,14 +409,12 @@ class TestPublicAPI:
 class TestHistogramToggle:
     """测试直方图面板切换"""
 
-    def test_toggle_histogram_shows(self):
-        w = _make_mock_window()
+    def test_toggle_histogram_shows(self, w):
         w.histogram_panel.isVisible.return_value = False
         w._on_toggle_histogram()
         w.histogram_panel.setVisible.assert_called_with(True)
 
-    def test_toggle_histogram_hides(self):
-        w = _make_mock_window()
+    def test_toggle_histogram_hides(self, w):
         w.histogram_panel.isVisible.return_value = True
         w._on_toggle_histogram()
         w.histogram_panel.setVisible.assert_called_with(False)
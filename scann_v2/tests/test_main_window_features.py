@@ -13,10 +13,14 @@
 - 最近打开菜单
 """
 
+import copy
+import importlib
+import inspect
+
 import pytest
 import numpy as np
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock, call, PropertyMock
+from unittest.mock import Mock, MagicMock, call, PropertyMock
 
 from scann.core.models import (
     Candidate,
@@ -27,114 +31,238 @@ from scann.core.models import (
     Detection,
     MarkerType,
     AppConfig,
+    SkyPosition,
 )
 from scann.services.blink_service import BlinkState
 from scann.services.query_service import QueryResult
 
+# 全部基于 Mock 窗口, 可用 -m gui_mock 单独运行并关闭用不到的插件
+pytestmark = pytest.mark.gui_mock
+
 
 # ═══════════════════════════════════════════════
 #  辅助: 创建增强版 Mock MainWindow
 # ═══════════════════════════════════════════════
 
+# 只读的小尺寸共享图像: 只传给 Mock 或只检查调用的测试不关心尺寸和数值
+_TINY_F32 = np.zeros((4, 4), np.float32)
+_TINY_F32.setflags(write=False)
+_TINY_HALF = np.full((4, 4), 0.5, np.float32)
+_TINY_HALF.setflags(write=False)
+
+
+# 控件/服务 → spec 类名 (scann.gui.main_window 中的名字)
+# 首次访问时才创建 Mock (多数测试只用到其中一两个);
+# 带 spec 的 Mock 访问真实类上不存在的属性会立即报 AttributeError
+_LAZY_MOCK_SPECS = {
+    # 图像查看器 / 定时器 / 闪烁服务
+    "image_viewer": "FitsImageViewer",
+    "blink_timer": "QTimer",
+    "blink_service": "BlinkService",
+    # 浮层标签
+    "overlay_state": "OverlayLabel",
+    "overlay_inv": "OverlayLabel",
+    "overlay_blink": "OverlayLabel",
+    # 控制栏按钮
+    "btn_show_new": "QPushButton",
+    "btn_show_old": "QPushButton",
+    "btn_blink": "QPushButton",
+    "btn_invert": "QPushButton",
+    "btn_mark_real": "QPushButton",
+    "btn_mark_bogus": "QPushButton",
+    "btn_next_candidate": "QPushButton",
+    "btn_align": "QPushButton",
+    # 侧边栏 / 文件列表 / 候选表格 / 闪烁速度 / 进度条 / 直方图面板
+    "sidebar": "CollapsibleSidebar",
+    "file_list": "QListWidget",
+    "suspect_table": "SuspectTableWidget",
+    "blink_speed": "BlinkSpeedSlider",
+    "progress_bar": "QProgressBar",
+    "histogram_panel": "HistogramPanel",
+    # 状态栏
+    "status_image_type": "QLabel",
+    "status_pixel_coord": "CoordinateLabel",
+    "status_wcs_coord": "CoordinateLabel",
+    "status_zoom": "QLabel",
+    # 动作 / 最近打开菜单
+    "act_show_markers": "QAction",
+    "act_show_mpcorb": "QAction",
+    "act_show_known": "QAction",
+    "act_align": "QAction",
+    "menu_recent": "QMenu",
+}
+
+# 创建时需要预设的属性/返回值 (Mock(**kwargs) 形式, 支持 "a.return_value")
+_LAZY_MOCK_CONFIG = {
+    "blink_service": {
+        "is_inverted": False,
+        "is_running": False,
+        "speed_ms": 500,
+        "current_state": BlinkState.NEW,
+    },
+    "histogram_panel": {"black_point": 0.0, "white_point": 1.0},
+    "file_list": {"count.return_value": 0},
+    "act_show_markers": {"isChecked.return_value": True},
+}
+
+
+class _StatusBarStub:
+    """statusBar() 的轻量替身: 按顺序记录 showMessage 收到的消息文本"""
+
+    def __init__(self):
+        self.messages: list[str] = []
+
+    def showMessage(self, message: str, timeout: int = 0) -> None:
+        self.messages.append(message)
+
+
+@pytest.fixture(scope="session")
+def main_window_module():
+    """scann.gui.main_window 模块
+
+    首个测试用到时才导入 (PyQt 等 GUI 依赖约 0.3s),
+    仅收集或被 -k 排除时不付出导入开销。
+    """
+    from scann.gui import main_window
+
+    return main_window
+
+
+@pytest.fixture(scope="session")
+def _lazy_mock_window_cls(main_window_module, spec_names):
+    """MainWindow 子类: _LAZY_MOCK_SPECS 中的属性在首次访问时挂载带 spec 的 Mock"""
+
+    class _LazyMockWindow(main_window_module.MainWindow):
+        """其余未设置的属性照常抛出 AttributeError (hasattr 判断不受影响)
+
+        不可变的数据属性以类属性给出默认值, 测试赋值时落到实例上。
+        """
+
+        _current_candidate_idx = -1
+        _new_image_data = None
+        _old_image_data = None
+        _new_folder = ""
+        _old_folder = ""
+        _current_pair_idx = -1
+        _new_fits_header = None
+        _old_fits_header = None
+        _inference_engine = None
+        _annotation_dialog = None
+        _training_worker = None
+
+        def __getattr__(self, name):
+            if name not in _LAZY_MOCK_SPECS:
+                raise AttributeError(name)
+            mock = Mock(
+                spec=spec_names[_LAZY_MOCK_SPECS[name]],
+                **_LAZY_MOCK_CONFIG.get(name, {}),
+            )
+            setattr(self, name, mock)
+            return mock
+
+    return _LazyMockWindow
+
+
+@pytest.fixture(scope="session")
+def _app_config_template():
+    """默认 AppConfig (整个会话只构造一次, 各测试取浅拷贝)"""
+    return AppConfig()
+
+
+@pytest.fixture
+def mw(_lazy_mock_window_cls, _app_config_template):
+    """跳过 __init__ 的 MainWindow, 只挂载可变数据; 控件 Mock 按需创建 (每个测试独立一份)"""
+    # __new__ 不会调用 __init__, 无需 patch
+    w = _lazy_mock_window_cls.__new__(_lazy_mock_window_cls)
+
+    # 状态栏: statusBar() 总是返回同一个记录器, 测试直接检查 w._status_bar.messages
+    w._status_bar = _StatusBarStub()
+    w.statusBar = lambda: w._status_bar
+
+    # 可变数据 (不可变默认值见 _LazyMockWindow 类属性)
+    w._candidates = []
+    w._image_pairs = []
+    # 浅拷贝共享嵌套的 telescope/observatory (测试不修改);
+    # recent_folders 会被就地 insert/remove, 每个测试独立一份
+    w._config = copy.copy(_app_config_template)
+    w._config.recent_folders = []
+    w._candidates_cache = {}
 
-def _make_mock_window():
-    """创建一个跳过 __init__ 的 MainWindow, 手动挂载 Mock 属性"""
-    from scann.gui.main_window import MainWindow
-
-    with patch("scann.gui.main_window.QMainWindow.__init__"):
-        w = MainWindow.__new__(MainWindow)
-
-    # 图像查看器
-    w.image_viewer = Mock()
+    # logger mock（_show_message 依赖 self._logger）
+    w._logger = Mock()
 
-    # 闪烁服务
-    w.blink_service = Mock()
-    w.blink_service.is_inverted = False
-    w.blink_service.is_running = False
-    w.blink_service.speed_ms = 500
-    w.blink_service.current_state = BlinkState.NEW
+    return w
 
-    # 定时器
-    w.blink_timer = Mock()
 
-    # 浮层标签
-    w.overlay_state = Mock()
-    w.overlay_inv = Mock()
-    w.overlay_blink = Mock()
+def _patched(target):
+    """生成在 main_window 模块上替换 target 的 fixture, 返回替身 MagicMock
 
-    # 控制栏按钮
-    w.btn_show_new = Mock()
-    w.btn_show_old = Mock()
-    w.btn_blink = Mock()
-    w.btn_invert = Mock()
-    w.btn_mark_real = Mock()
-    w.btn_mark_bogus = Mock()
-    w.btn_next_candidate = Mock()
-    w.btn_align = Mock()
+    target 相对 scann.gui.main_window, 如 "read_fits" 或 "QFileDialog.getOpenFileName"。
+    """
+    owner_path, _, attr = target.rpartition(".")
 
-    # 侧边栏
-    w.sidebar = Mock()
+    @pytest.fixture
+    def _fixture(monkeypatch, main_window_module):
+        owner = getattr(main_window_module, owner_path) if owner_path else main_window_module
+        mock = MagicMock()
+        monkeypatch.setattr(owner, attr, mock)
+        return mock
 
-    # 候选表格
-    w.suspect_table = Mock()
+    return _fixture
 
-    # 闪烁速度
-    w.blink_speed = Mock()
 
-    # 直方图面板
-    w.histogram_panel = Mock()
-    w.histogram_panel.black_point = 0.0
-    w.histogram_panel.white_point = 1.0
+mock_dir_dialog = _patched("QFileDialog.getExistingDirectory")
+mock_open_dialog = _patched("QFileDialog.getOpenFileName")
+mock_save_dialog = _patched("QFileDialog.getSaveFileName")
+mock_scan = _patched("scan_fits_folder")
+mock_match = _patched("match_new_old_pairs")
+mock_read = _patched("read_fits")
+mock_write = _patched("write_fits")
+mock_align = _patched("align")
+mock_stretch = _patched("histogram_stretch")
+mock_denoise = _patched("denoise")
+mock_flat = _patched("pseudo_flat_field")
+mock_engine_cls = _patched("InferenceEngine")
+mock_pipeline_cls = _patched("DetectionPipeline")
+mock_qapp = _patched("QApplication")
+mock_p2w = _patched("pixel_to_wcs")
+mock_query_svc_cls = _patched("QueryService")
+mock_popup_cls = _patched("QueryResultPopup")
+mock_msgbox_cls = _patched("QMessageBox")
+mock_gen_mpc = _patched("generate_mpc_report")
 
-    # 文件列表
-    w.file_list = Mock()
-    w.file_list.count.return_value = 0
 
-    # 进度条
-    w.progress_bar = Mock()
+def _patched_lazy(module_path, attr):
+    """生成替换 module_path.attr 的 fixture, 返回替身 MagicMock
 
-    # 状态栏
-    w.status_image_type = Mock()
-    w.status_pixel_coord = Mock()
-    w.status_wcs_coord = Mock()
-    w.status_zoom = Mock()
+    用于 main_window 在方法内部延迟导入的类 (需替换其定义模块上的名字)。
+    """
 
-    # 动作
-    w.act_show_markers = Mock()
-    w.act_show_markers.isChecked.return_value = True
-    w.act_show_mpcorb = Mock()
-    w.act_show_known = Mock()
-    w.act_align = Mock()
+    @pytest.fixture
+    def _fixture(monkeypatch):
+        module = importlib.import_module(module_path)
+        mock = MagicMock()
+        monkeypatch.setattr(module, attr, mock)
+        return mock
 
-    # 最近打开菜单
-    w.menu_recent = Mock()
+    return _fixture
 
-    # statusBar mock
-    w.statusBar = Mock(return_value=Mock())
 
-    # 数据
-    w._candidates = []
-    w._current_candidate_idx = -1
-    w._new_image_data = None
-    w._old_image_data = None
+mock_mpc_dialog_cls = _patched_lazy("scann.gui.dialogs.mpc_report_dialog", "MpcReportDialog")
+mock_batch_dialog_cls = _patched_lazy("scann.gui.dialogs.batch_process_dialog", "BatchProcessDialog")
+mock_training_dialog_cls = _patched_lazy("scann.gui.dialogs.training_dialog", "TrainingDialog")
+mock_annotation_dialog_cls = _patched_lazy("scann.gui.dialogs.annotation_dialog", "AnnotationDialog")
+mock_training_worker_cls = _patched_lazy("scann.ai.training_worker", "TrainingWorker")
 
-    # 新增: 文件管理相关数据
-    w._new_folder = ""
-    w._old_folder = ""
-    w._image_pairs = []
-    w._current_pair_idx = -1
-    w._new_fits_header = None
-    w._old_fits_header = None
-    w._inference_engine = None
-    w._config = AppConfig()
-    w._annotation_dialog = None
-    w._training_worker = None
-    w._candidates_cache = {}
+# pixel_to_wcs 替身返回的固定天球坐标
+_FAKE_SKY = SkyPosition(ra=180.0, dec=45.0)
 
-    # logger mock（_show_message 依赖 self._logger）
-    w._logger = Mock()
 
-    return w
+@pytest.fixture
+def fake_pixel_to_wcs(mock_p2w):
+    """pixel_to_wcs 总是返回 _FAKE_SKY (返回其 Mock 以便断言调用)"""
+    mock_p2w.return_value = _FAKE_SKY
+    return mock_p2w
 
 
 # ═══════════════════════════════════════════════
@@ -145,13 +273,10 @@ def _make_mock_window():
 class TestOpenNewFolder:
     """测试打开新图文件夹功能"""
 
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    @patch("scann.gui.main_window.scan_fits_folder")
-    def test_open_new_folder_loads_files(self, mock_scan, mock_dialog):
+    def test_open_new_folder_loads_files(self, mock_scan, mock_dir_dialog, mw):
         """打开新图文件夹应扫描FITS文件并填充file_list"""
         from scann.data.file_manager import FitsFileInfo
-        w = _make_mock_window()
-        mock_dialog.return_value = "/path/to/new"
+        mock_dir_dialog.return_value = "/path/to/new"
         mock_scan.return_value = [
             FitsFileInfo(path=Path("/path/to/new/img_001.fits"), stem="img_001",
                         size_bytes=1024, modified_time=0.0),
@@ -159,46 +284,28 @@ class TestOpenNewFolder:
                         size_bytes=1024, modified_time=0.0),
         ]
 
-        w._on_open_new_folder()
+        mw._on_open_new_folder()
 
-        assert w._new_folder == "/path/to/new"
+        assert mw._new_folder == "/path/to/new"
         mock_scan.assert_called_once_with("/path/to/new")
         # 应该向 file_list 中添加了项目
-        assert w.file_list.addItem.call_count == 2
-
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    def test_open_new_folder_cancelled(self, mock_dialog):
-        """取消对话框不应改变状态"""
-        w = _make_mock_window()
-        mock_dialog.return_value = ""  # 取消
+        assert mw.file_list.addItem.call_count == 2
 
-        w._on_open_new_folder()
-
-        assert w._new_folder == ""
-        w.file_list.clear.assert_not_called()
-
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    @patch("scann.gui.main_window.scan_fits_folder")
-    def test_open_new_folder_clears_old_list(self, mock_scan, mock_dialog):
+    def test_open_new_folder_clears_old_list(self, mock_scan, mock_dir_dialog, mw):
         """打开新文件夹应先清空旧列表"""
-        w = _make_mock_window()
-        mock_dialog.return_value = "/new/path"
+        mock_dir_dialog.return_value = "/new/path"
         mock_scan.return_value = []
 
-        w._on_open_new_folder()
+        mw._on_open_new_folder()
 
-        w.file_list.clear.assert_called_once()
+        mw.file_list.clear.assert_called_once()
 
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    @patch("scann.gui.main_window.scan_fits_folder")
-    @patch("scann.gui.main_window.read_fits")
-    def test_open_new_folder_loads_first_image(self, mock_read, mock_scan, mock_dialog):
+    def test_open_new_folder_loads_first_image(self, mock_read, mock_scan, mock_dir_dialog, mw):
         """打开文件夹后应自动加载第一张图"""
         from scann.data.file_manager import FitsFileInfo
-        w = _make_mock_window()
-        mock_dialog.return_value = "/path/to/new"
+        mock_dir_dialog.return_value = "/path/to/new"
 
-        test_data = np.zeros((64, 64), dtype=np.uint16)
+        test_data = _TINY_F32
         test_header = FitsHeader(raw={"OBJECT": "TestField"})
         mock_scan.return_value = [
             FitsFileInfo(path=Path("/path/to/new/img_001.fits"), stem="img_001",
@@ -208,36 +315,29 @@ class TestOpenNewFolder:
             data=test_data, header=test_header, path=Path("/path/to/new/img_001.fits")
         )
 
-        w._on_open_new_folder()
+        mw._on_open_new_folder()
 
-        assert w._new_image_data is not None
-        w.image_viewer.set_image_data.assert_called()
+        assert mw._new_image_data is not None
+        mw.image_viewer.set_image_data.assert_called()
 
 
 class TestOpenOldFolder:
     """测试打开旧图文件夹功能"""
 
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    @patch("scann.gui.main_window.scan_fits_folder")
-    def test_open_old_folder_stores_path(self, mock_scan, mock_dialog):
+    def test_open_old_folder_stores_path(self, mock_scan, mock_dir_dialog, mw):
         """打开旧图文件夹应保存路径"""
-        w = _make_mock_window()
-        mock_dialog.return_value = "/path/to/old"
+        mock_dir_dialog.return_value = "/path/to/old"
         mock_scan.return_value = []
 
-        w._on_open_old_folder()
+        mw._on_open_old_folder()
 
-        assert w._old_folder == "/path/to/old"
+        assert mw._old_folder == "/path/to/old"
 
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    @patch("scann.gui.main_window.scan_fits_folder")
-    @patch("scann.gui.main_window.match_new_old_pairs")
-    def test_open_old_folder_triggers_pairing(self, mock_match, mock_scan, mock_dialog):
+    def test_open_old_folder_triggers_pairing(self, mock_match, mock_scan, mock_dir_dialog, mw):
         """打开旧图文件夹应自动与新图配对"""
         from scann.data.file_manager import FitsImagePair
-        w = _make_mock_window()
-        w._new_folder = "/path/to/new"
-        mock_dialog.return_value = "/path/to/old"
+        mw._new_folder = "/path/to/new"
+        mock_dir_dialog.return_value = "/path/to/old"
         mock_scan.return_value = []
         mock_match.return_value = (
             [FitsImagePair(name="img_001",
@@ -247,20 +347,10 @@ class TestOpenOldFolder:
             [],  # only_old
         )
 
-        w._on_open_old_folder()
+        mw._on_open_old_folder()
 
         mock_match.assert_called_once_with("/path/to/new", "/path/to/old")
-        assert len(w._image_pairs) == 1
-
-    @patch("scann.gui.main_window.QFileDialog.getExistingDirectory")
-    def test_open_old_folder_cancelled(self, mock_dialog):
-        """取消不应改变状态"""
-        w = _make_mock_window()
-        mock_dialog.return_value = ""
-
-        w._on_open_old_folder()
-
-        assert w._old_folder == ""
+        assert len(mw._image_pairs) == 1
 
 
 # ═══════════════════════════════════════════════
@@ -271,38 +361,35 @@ class TestOpenOldFolder:
 class TestStretchChanged:
     """测试直方图拉伸回调"""
 
-    def test_stretch_with_new_image(self):
+    def test_stretch_with_new_image(self, mock_stretch, mw):
         """拉伸参数变化时应通过ImageProcessor处理并刷新显示"""
-        w = _make_mock_window()
-        w._new_image_data = np.random.random((64, 64)).astype(np.float32) * 65535
-        w.blink_service.current_state = BlinkState.NEW
+        mw._new_image_data = _TINY_HALF
+        mw.blink_service.current_state = BlinkState.NEW
+        mock_stretch.return_value = _TINY_F32
 
-        with patch("scann.gui.main_window.histogram_stretch") as mock_stretch:
-            mock_stretch.return_value = np.zeros((64, 64), dtype=np.float32)
-            w._on_stretch_changed(100.0, 50000.0)
-            mock_stretch.assert_called_once()
-            w.image_viewer.set_image_data.assert_called_once()
+        mw._on_stretch_changed(100.0, 50000.0)
 
-    def test_stretch_with_no_image(self):
+        mock_stretch.assert_called_once()
+        mw.image_viewer.set_image_data.assert_called_once()
+
+    def test_stretch_with_no_image(self, mw):
         """无图像数据时拉伸不应崩溃"""
-        w = _make_mock_window()
-        w._new_image_data = None
-        w._old_image_data = None
+        mw._new_image_data = None
+        mw._old_image_data = None
 
         # 不应崩溃
-        w._on_stretch_changed(0.0, 65535.0)
+        mw._on_stretch_changed(0.0, 65535.0)
 
-    def test_stretch_uses_black_white_points(self):
+    def test_stretch_uses_black_white_points(self, mock_stretch, mw):
         """拉伸应使用传入的黑白点参数"""
-        w = _make_mock_window()
-        w._new_image_data = np.ones((32, 32), dtype=np.float32) * 1000
-        w.blink_service.current_state = BlinkState.NEW
+        mw._new_image_data = _TINY_HALF
+        mw.blink_service.current_state = BlinkState.NEW
+        mock_stretch.return_value = _TINY_F32
+
+        mw._on_stretch_changed(200.0, 800.0)
 
-        with patch("scann.gui.main_window.histogram_stretch") as mock_stretch:
-            mock_stretch.return_value = np.zeros((32, 32), dtype=np.float32)
-            w._on_stretch_changed(200.0, 800.0)
-            args, kwargs = mock_stretch.call_args
-            assert kwargs.get("black_point") == 200.0 or args[1] == 200.0
+        args, kwargs = mock_stretch.call_args
+        assert kwargs.get("black_point") == 200.0 or args[1] == 200.0
 
 
 # ═══════════════════════════════════════════════
@@ -313,12 +400,9 @@ class TestStretchChanged:
 class TestBatchAlign:
     """测试批量对齐功能"""
 
-    @patch("scann.gui.main_window.read_fits")
-    @patch("scann.gui.main_window.align")
-    def test_batch_align_processes_pairs(self, mock_align, mock_read, tmp_path):
+    def test_batch_align_processes_pairs(self, mock_align, mock_read, tmp_path, mw, empty_fits_header):
         """批量对齐应处理所有图像配对"""
         from scann.data.file_manager import FitsImagePair
-        w = _make_mock_window()
 
         pair = FitsImagePair(
             name="img_001",
@@ -327,7 +411,7 @@ class TestBatchAlign:
         )
         pair.new_path.parent.mkdir(parents=True, exist_ok=True)
         pair.old_path.parent.mkdir(parents=True, exist_ok=True)
-        w._image_pairs = [pair]
+        mw._image_pairs = [pair]
 
         yy, xx = np.mgrid[0:64, 0:64]
         new_data = (xx + yy).astype(np.float32)
@@ -335,29 +419,26 @@ class TestBatchAlign:
         aligned_old = old_data.copy()
 
         mock_read.side_effect = [
-            FitsImage(data=new_data, header=FitsHeader(raw={}), path=pair.new_path),
-            FitsImage(data=old_data, header=FitsHeader(raw={}), path=pair.old_path),
+            FitsImage(data=new_data, header=empty_fits_header, path=pair.new_path),
+            FitsImage(data=old_data, header=empty_fits_header, path=pair.old_path),
         ]
         mock_align.return_value = AlignResult(aligned_old=aligned_old, dx=1.0, dy=2.0, success=True)
 
-        w._on_batch_align()
+        mw._on_batch_align()
 
         mock_align.assert_called_once()
 
-    @patch("scann.gui.main_window.write_fits")
-    @patch("scann.gui.main_window.read_fits")
-    @patch("scann.gui.main_window.align")
     def test_batch_align_saves_cropped_artifacts_without_overwriting_original(
         self,
         mock_align,
         mock_read,
         mock_write,
         tmp_path,
+        mw,
     ):
         """对齐后应保存裁剪重叠图，并保留原图不变"""
         from scann.data.file_manager import FitsImagePair
 
-        w = _make_mock_window()
         pair = FitsImagePair(
             name="img_001",
             new_path=tmp_path / "new" / "img_001.fits",
@@ -365,7 +446,7 @@ class TestBatchAlign:
         )
         pair.new_path.parent.mkdir(parents=True, exist_ok=True)
         pair.old_path.parent.mkdir(parents=True, exist_ok=True)
-        w._image_pairs = [pair]
+        mw._image_pairs = [pair]
 
         base = np.arange(64 * 64, dtype=np.float32).reshape(64, 64)
         new_data = base
@@ -378,33 +459,30 @@ class TestBatchAlign:
         ]
         mock_align.return_value = AlignResult(aligned_old=aligned_old, dx=3.0, dy=2.0, success=True)
 
-        w._on_batch_align()
+        mw._on_batch_align()
 
         written_paths = [c.args[0] for c in mock_write.call_args_list]
         assert pair.old_path not in written_paths
         assert pair.new_path not in written_paths
         assert len(written_paths) == 2
 
-        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = w._aligned_artifact_paths(pair)
+        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = mw._aligned_artifact_paths(pair)
         assert new_aligned_path in written_paths
         assert old_aligned_path in written_paths
         assert new_marker_path.exists()
         assert old_marker_path.exists()
 
-    @patch("scann.gui.main_window.write_fits")
-    @patch("scann.gui.main_window.read_fits")
-    @patch("scann.gui.main_window.align")
     def test_batch_align_skips_pair_when_marked(
         self,
         mock_align,
         mock_read,
         mock_write,
         tmp_path,
+        mw,
     ):
         """已标记为对齐完成的配对应在下次对齐时跳过"""
         from scann.data.file_manager import FitsImagePair
 
-        w = _make_mock_window()
         pair = FitsImagePair(
             name="img_001",
             new_path=tmp_path / "new" / "img_001.fits",
@@ -412,29 +490,28 @@ class TestBatchAlign:
         )
         pair.new_path.parent.mkdir(parents=True, exist_ok=True)
         pair.old_path.parent.mkdir(parents=True, exist_ok=True)
-        w._image_pairs = [pair]
+        mw._image_pairs = [pair]
 
-        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = w._aligned_artifact_paths(pair)
+        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = mw._aligned_artifact_paths(pair)
         new_aligned_path.write_text("dummy", encoding="utf-8")
         old_aligned_path.write_text("dummy", encoding="utf-8")
         new_marker_path.write_text("aligned", encoding="utf-8")
         old_marker_path.write_text("aligned", encoding="utf-8")
 
-        w._on_batch_align()
+        mw._on_batch_align()
 
         mock_read.assert_not_called()
         mock_align.assert_not_called()
         mock_write.assert_not_called()
 
-    def test_batch_align_no_pairs_shows_message(self):
+    def test_batch_align_no_pairs_shows_message(self, mw):
         """无配对时应显示提示信息"""
-        w = _make_mock_window()
-        w._image_pairs = []
+        mw._image_pairs = []
 
-        w._on_batch_align()
+        mw._on_batch_align()
 
-        w.statusBar().showMessage.assert_called()
-        msg = w.statusBar().showMessage.call_args[0][0]
+        assert mw._status_bar.messages
+        msg = mw._status_bar.messages[-1]
         assert "配对" in msg or "对齐" in msg or "文件" in msg
 
 
@@ -446,49 +523,32 @@ class TestBatchAlign:
 class TestLoadModel:
     """测试加载AI模型功能"""
 
-    @patch("scann.gui.main_window.QFileDialog.getOpenFileName")
-    @patch("scann.gui.main_window.InferenceEngine")
-    def test_load_model_success(self, mock_engine_cls, mock_dialog):
+    def test_load_model_success(self, mock_engine_cls, mock_open_dialog, mw):
         """成功加载模型应设置inference_engine"""
-        w = _make_mock_window()
-        mock_dialog.return_value = ("/path/to/model.pth", "")
+        mock_open_dialog.return_value = ("/path/to/model.pth", "")
         mock_engine = Mock()
         mock_engine.is_ready = True
         mock_engine.threshold = 0.5
         mock_engine_cls.return_value = mock_engine
 
-        w._on_load_model()
+        mw._on_load_model()
 
         mock_engine_cls.assert_called_once()
         # 验证 model_path 关键字参数
         call_kwargs = mock_engine_cls.call_args[1]
         assert call_kwargs["model_path"] == "/path/to/model.pth"
-        assert w._inference_engine is mock_engine
-        w.statusBar().showMessage.assert_called()
-
-    @patch("scann.gui.main_window.QFileDialog.getOpenFileName")
-    def test_load_model_cancelled(self, mock_dialog):
-        """取消不应改变状态"""
-        w = _make_mock_window()
-        w._inference_engine = None
-        mock_dialog.return_value = ("", "")
-
-        w._on_load_model()
-
-        assert w._inference_engine is None
+        assert mw._inference_engine is mock_engine
+        assert mw._status_bar.messages
 
-    @patch("scann.gui.main_window.QFileDialog.getOpenFileName")
-    @patch("scann.gui.main_window.InferenceEngine")
-    def test_load_model_failure_shows_error(self, mock_engine_cls, mock_dialog):
+    def test_load_model_failure_shows_error(self, mock_engine_cls, mock_open_dialog, mw):
         """加载失败应显示错误信息"""
-        w = _make_mock_window()
-        mock_dialog.return_value = ("/bad/model.pth", "")
+        mock_open_dialog.return_value = ("/bad/model.pth", "")
         mock_engine_cls.side_effect = Exception("模型文件损坏")
 
-        w._on_load_model()
+        mw._on_load_model()
 
-        w.statusBar().showMessage.assert_called()
-        msg = w.statusBar().showMessage.call_args[0][0]
+        assert mw._status_bar.messages
+        msg = mw._status_bar.messages[-1]
         assert "失败" in msg or "错误" in msg or "损坏" in msg
 
 
@@ -500,22 +560,11 @@ class TestLoadModel:
 class TestBatchDetect:
     """测试批量检测功能"""
 
-    def test_batch_detect_requires_image_data(self):
-        """无图像数据时应显示提示"""
-        w = _make_mock_window()
-        w._new_image_data = None
-
-        w._on_batch_detect()
-
-        w.statusBar().showMessage.assert_called()
-
-    @patch("scann.gui.main_window.DetectionPipeline")
-    def test_batch_detect_with_data(self, mock_pipeline_cls):
+    def test_batch_detect_with_data(self, mock_pipeline_cls, mw):
         """有图像数据时应执行检测管线"""
         from scann.services.detection_service import PipelineResult
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((64, 64), dtype=np.float32)
-        w._old_image_data = np.ones((64, 64), dtype=np.float32)
+        mw._new_image_data = _TINY_F32
+        mw._old_image_data = _TINY_HALF
 
         mock_pipeline = Mock()
         mock_pipeline.process_pair.return_value = PipelineResult(
@@ -524,19 +573,17 @@ class TestBatchDetect:
         )
         mock_pipeline_cls.return_value = mock_pipeline
 
-        w._on_batch_detect()
+        mw._on_batch_detect()
 
         mock_pipeline.process_pair.assert_called_once()
-        assert len(w._candidates) > 0
-        w.suspect_table.set_candidates.assert_called()
+        assert len(mw._candidates) > 0
+        mw.suspect_table.set_candidates.assert_called()
 
-    @patch("scann.gui.main_window.DetectionPipeline")
-    def test_batch_detect_updates_candidates(self, mock_pipeline_cls):
+    def test_batch_detect_updates_candidates(self, mock_pipeline_cls, mw):
         """检测结果应正确设置到界面"""
         from scann.services.detection_service import PipelineResult
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((64, 64), dtype=np.float32)
-        w._old_image_data = np.ones((64, 64), dtype=np.float32)
+        mw._new_image_data = _TINY_F32
+        mw._old_image_data = _TINY_HALF
 
         cands = [Candidate(x=10, y=20, ai_score=0.9), Candidate(x=30, y=40, ai_score=0.7)]
         mock_pipeline = Mock()
@@ -545,10 +592,10 @@ class TestBatchDetect:
         )
         mock_pipeline_cls.return_value = mock_pipeline
 
-        w._on_batch_detect()
+        mw._on_batch_detect()
 
-        assert w._candidates == cands
-        assert w._current_candidate_idx == 0
+        assert mw._candidates == cands
+        assert mw._current_candidate_idx == 0
 
 
 # ═══════════════════════════════════════════════
@@ -559,38 +606,24 @@ class TestBatchDetect:
 class TestSaveImage:
     """测试保存图像功能"""
 
-    @patch("scann.gui.main_window.QFileDialog.getSaveFileName")
-    @patch("scann.gui.main_window.write_fits")
-    def test_save_image_with_data(self, mock_write, mock_dialog):
+    def test_save_image_with_data(self, mock_write, mock_save_dialog, mw):
         """有数据时应保存"""
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((64, 64), dtype=np.uint16)
-        mock_dialog.return_value = ("/save/test.fits", "")
+        mw._new_image_data = _TINY_F32
+        mock_save_dialog.return_value = ("/save/test.fits", "")
 
-        w._on_save_image()
+        mw._on_save_image()
 
         mock_write.assert_called_once()
 
-    def test_save_image_no_data(self):
-        """无数据时应提示"""
-        w = _make_mock_window()
-        w._new_image_data = None
-
-        w._on_save_image()
-
-        w.statusBar().showMessage.assert_called()
-
-    @patch("scann.gui.main_window.QFileDialog.getSaveFileName")
-    def test_save_marked_image_creates_file(self, mock_dialog):
+    def test_save_marked_image_creates_file(self, mock_save_dialog, mw):
         """另存标记图应导出PNG/FITS"""
-        w = _make_mock_window()
-        w._new_image_data = np.zeros((64, 64), dtype=np.uint16)
-        w._candidates = [Candidate(x=10, y=20)]
-        mock_dialog.return_value = ("/save/marked.png", "")
+        mw._new_image_data = _TINY_F32
+        mw._candidates = [Candidate(x=10, y=20)]
+        mock_save_dialog.return_value = ("/save/marked.png", "")
 
-        w._on_save_marked_image()
+        mw._on_save_marked_image()
 
-        w.statusBar().showMessage.assert_called()
+        assert mw._status_bar.messages
 
 
 # ═══════════════════════════════════════════════
@@ -601,36 +634,33 @@ class TestSaveImage:
 class TestContextAddCandidate:
     """测试右键菜单手动添加候选体"""
 
-    def test_add_candidate_creates_new(self):
+    def test_add_candidate_creates_new(self, mw):
         """应在指定坐标创建手动候选体"""
-        w = _make_mock_window()
-        w._candidates = []
+        mw._candidates = []
 
-        w._on_context_add_candidate(100, 200)
+        mw._on_context_add_candidate(100, 200)
 
-        assert len(w._candidates) == 1
-        assert w._candidates[0].x == 100
-        assert w._candidates[0].y == 200
-        assert w._candidates[0].is_manual is True
+        assert len(mw._candidates) == 1
+        assert mw._candidates[0].x == 100
+        assert mw._candidates[0].y == 200
+        assert mw._candidates[0].is_manual is True
 
-    def test_add_candidate_appends_to_existing(self):
+    def test_add_candidate_appends_to_existing(self, mw):
         """应追加到现有列表"""
-        w = _make_mock_window()
-        w._candidates = [Candidate(x=1, y=1)]
+        mw._candidates = [Candidate(x=1, y=1)]
 
-        w._on_context_add_candidate(50, 60)
+        mw._on_context_add_candidate(50, 60)
 
-        assert len(w._candidates) == 2
-        assert w._candidates[-1].x == 50
+        assert len(mw._candidates) == 2
+        assert mw._candidates[-1].x == 50
 
-    def test_add_candidate_updates_table(self):
+    def test_add_candidate_updates_table(self, mw):
         """添加后应刷新表格"""
-        w = _make_mock_window()
-        w._candidates = []
+        mw._candidates = []
 
-        w._on_context_add_candidate(10, 20)
+        mw._on_context_add_candidate(10, 20)
 
-        w.suspect_table.set_candidates.assert_called()
+        mw.suspect_table.set_candidates.assert_called()
 
 
 # ═══════════════════════════════════════════════
@@ -641,10 +671,9 @@ class TestContextAddCandidate:
 class TestWCSSync:
     """测试WCS坐标同步更新"""
 
-    def test_mouse_moved_updates_wcs_with_header(self):
+    def test_mouse_moved_updates_wcs_with_header(self, fake_pixel_to_wcs, mw):
         """有WCS头信息时鼠标移动应更新天球坐标"""
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={
+        mw._new_fits_header = FitsHeader(raw={
             "CTYPE1": "RA---TAN", "CTYPE2": "DEC--TAN",
             "CRVAL1": 180.0, "CRVAL2": 45.0,
             "CRPIX1": 64.0, "CRPIX2": 64.0,
@@ -653,24 +682,19 @@ class TestWCSSync:
             "NAXIS1": 128, "NAXIS2": 128,
         })
 
-        with patch("scann.gui.main_window.pixel_to_wcs") as mock_p2w:
-            from scann.core.models import SkyPosition
-            mock_p2w.return_value = SkyPosition(ra=180.5, dec=45.3)
+        mw._on_mouse_moved(64, 64)
 
-            w._on_mouse_moved(64, 64)
+        fake_pixel_to_wcs.assert_called_once()
+        mw.status_wcs_coord.set_wcs_coordinates.assert_called()
 
-            mock_p2w.assert_called_once()
-            w.status_wcs_coord.set_wcs_coordinates.assert_called()
-
-    def test_mouse_moved_no_wcs_header(self):
+    def test_mouse_moved_no_wcs_header(self, mw):
         """无WCS头信息时不应更新天球坐标"""
-        w = _make_mock_window()
-        w._new_fits_header = None
+        mw._new_fits_header = None
 
-        w._on_mouse_moved(64, 64)
+        mw._on_mouse_moved(64, 64)
 
-        w.status_pixel_coord.set_pixel_coordinates.assert_called_with(64, 64)
-        w.status_wcs_coord.set_wcs_coordinates.assert_not_called()
+        mw.status_pixel_coord.set_pixel_coordinates.assert_called_with(64, 64)
+        mw.status_wcs_coord.set_wcs_coordinates.assert_not_called()
 
 
 # ═══════════════════════════════════════════════
@@ -681,31 +705,25 @@ class TestWCSSync:
 class TestCopyWCSCoordinates:
     """测试复制天球坐标功能"""
 
-    @patch("scann.gui.main_window.QApplication")
-    @patch("scann.gui.main_window.pixel_to_wcs")
-    def test_copy_wcs_with_header(self, mock_p2w, mock_qapp):
+    def test_copy_wcs_with_header(self, fake_pixel_to_wcs, mock_qapp, mw):
         """有WCS时应复制RA/Dec到剪贴板"""
-        from scann.core.models import SkyPosition
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
-        mock_p2w.return_value = SkyPosition(ra=180.5, dec=45.3)
+        mw._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
         mock_clipboard = Mock()
         mock_qapp.clipboard.return_value = mock_clipboard
 
-        w._on_copy_wcs_coordinates(64, 64)
+        mw._on_copy_wcs_coordinates(64, 64)
 
         mock_clipboard.setText.assert_called_once()
         text = mock_clipboard.setText.call_args[0][0]
         assert "180" in text or "12" in text  # RA
 
-    def test_copy_wcs_no_header_shows_message(self):
+    def test_copy_wcs_no_header_shows_message(self, mw):
         """无WCS时应显示提示"""
-        w = _make_mock_window()
-        w._new_fits_header = None
+        mw._new_fits_header = None
 
-        w._on_copy_wcs_coordinates(64, 64)
+        mw._on_copy_wcs_coordinates(64, 64)
 
-        w.statusBar().showMessage.assert_called()
+        assert mw._status_bar.messages
 
 
 # ═══════════════════════════════════════════════
@@ -716,34 +734,65 @@ class TestCopyWCSCoordinates:
 class TestModelInfo:
     """测试模型信息显示"""
 
-    def test_model_info_no_model(self):
-        """无模型时应提示"""
-        w = _make_mock_window()
-        w._inference_engine = None
-
-        w._on_model_info()
-
-        w.statusBar().showMessage.assert_called()
-        msg = w.statusBar().showMessage.call_args[0][0]
-        assert "模型" in msg or "加载" in msg
-
-    @patch("scann.gui.main_window.QMessageBox")
-    def test_model_info_with_model(self, mock_msgbox_cls):
+    def test_model_info_with_model(self, mock_msgbox_cls, mw):
         """有模型时应显示信息"""
-        w = _make_mock_window()
-        w._inference_engine = Mock()
-        w._inference_engine.is_ready = True
-        w._inference_engine.model = Mock()
-        w._inference_engine.threshold = 0.5
-        w._inference_engine.device = "cpu"
+        mw._inference_engine = Mock()
+        mw._inference_engine.is_ready = True
+        mw._inference_engine.model = Mock()
+        mw._inference_engine.threshold = 0.5
+        mw._inference_engine.device = "cpu"
         # 模拟 parameters()
-        w._inference_engine.model.parameters.return_value = [
+        mw._inference_engine.model.parameters.return_value = [
             Mock(numel=Mock(return_value=100)),
             Mock(numel=Mock(return_value=200)),
         ]
 
         # 不应崩溃
-        w._on_model_info()
+        mw._on_model_info()
+
+
+# ═══════════════════════════════════════════════
+#  无数据 / 无模型提示
+# ═══════════════════════════════════════════════
+
+
+class TestMissingDataMessage:
+    """缺少图像数据或模型时, 各操作只在状态栏提示"""
+
+    @pytest.mark.parametrize("handler,keyword", [
+        ("_on_save_image", "图像"),      # 保存图像
+        ("_on_batch_detect", "图像"),    # 批量检测
+        ("_on_model_info", "模型"),      # 模型信息
+    ])
+    def test_shows_message(self, mw, handler, keyword):
+        # mw 默认无图像数据、无推理引擎
+        getattr(mw, handler)()
+
+        assert mw._status_bar.messages
+        msg = mw._status_bar.messages[-1]
+        assert keyword in msg
+
+
+# ═══════════════════════════════════════════════
+#  取消文件对话框
+# ═══════════════════════════════════════════════
+
+
+class TestDialogCancelled:
+    """用户取消文件对话框时, 各操作不应改变状态"""
+
+    @pytest.mark.parametrize("handler,dialog,cancelled,attr,unchanged", [
+        ("_on_open_new_folder", "mock_dir_dialog", "", "_new_folder", ""),
+        ("_on_open_old_folder", "mock_dir_dialog", "", "_old_folder", ""),
+        ("_on_load_model", "mock_open_dialog", ("", ""), "_inference_engine", None),
+    ])
+    def test_cancel_keeps_state(self, request, mw, handler, dialog, cancelled, attr, unchanged):
+        request.getfixturevalue(dialog).return_value = cancelled
+
+        getattr(mw, handler)()
+
+        assert getattr(mw, attr) == unchanged
+        mw.file_list.clear.assert_not_called()
 
 
 # ═══════════════════════════════════════════════
@@ -754,25 +803,20 @@ class TestModelInfo:
 class TestRecentMenu:
     """测试最近打开菜单"""
 
-    def test_update_recent_menu_empty(self):
+    def test_update_recent_menu_empty(self, mw):
         """无最近文件时应显示占位文本"""
-        w = _make_mock_window()
-        w._config = AppConfig()
-
-        w._on_update_recent_menu()
+        mw._on_update_recent_menu()
 
-        w.menu_recent.clear.assert_called_once()
+        mw.menu_recent.clear.assert_called_once()
 
-    def test_update_recent_menu_with_items(self):
+    def test_update_recent_menu_with_items(self, mw):
         """有最近文件时应填充菜单"""
-        w = _make_mock_window()
-        w._config = AppConfig()
-        w._config.recent_folders = ["/path/a", "/path/b"]
+        mw._config.recent_folders = ["/path/a", "/path/b"]
 
-        w._on_update_recent_menu()
+        mw._on_update_recent_menu()
 
-        w.menu_recent.clear.assert_called_once()
-        assert w.menu_recent.addAction.call_count >= 2
+        mw.menu_recent.clear.assert_called_once()
+        assert mw.menu_recent.addAction.call_count >= 2
 
 
 # ═══════════════════════════════════════════════
@@ -783,43 +827,37 @@ class TestRecentMenu:
 class TestPairListSelection:
     """测试配对列表选择触发图像加载"""
 
-    @patch("scann.gui.main_window.read_fits")
-    def test_file_list_selection_loads_pair(self, mock_read):
+    def test_file_list_selection_loads_pair(self, mock_read, mw, zero_fits_image, empty_fits_header):
         """选择配对列表项应加载对应图像"""
         from scann.data.file_manager import FitsImagePair
-        w = _make_mock_window()
         pair = FitsImagePair(
             name="img_001",
             new_path=Path("/new/img_001.fits"),
             old_path=Path("/old/img_001.fits"),
         )
-        w._image_pairs = [pair]
+        mw._image_pairs = [pair]
 
-        test_header = FitsHeader(raw={})
         mock_read.side_effect = [
-            FitsImage(data=np.zeros((64, 64)), header=test_header, path=pair.new_path),
-            FitsImage(data=np.ones((64, 64)), header=test_header, path=pair.old_path),
+            zero_fits_image,
+            FitsImage(data=np.ones((64, 64)), header=empty_fits_header, path=pair.old_path),
         ]
 
-        w._on_pair_selected(0)
+        mw._on_pair_selected(0)
 
-        assert w._new_image_data is not None
-        assert w._old_image_data is not None
+        assert mw._new_image_data is not None
+        assert mw._old_image_data is not None
         assert mock_read.call_count == 2
 
-    def test_pair_selected_out_of_range(self):
+    def test_pair_selected_out_of_range(self, mw):
         """越界索引不应崩溃"""
-        w = _make_mock_window()
-        w._image_pairs = []
+        mw._image_pairs = []
 
-        w._on_pair_selected(5)  # 不应崩溃
+        mw._on_pair_selected(5)  # 不应崩溃
 
-    @patch("scann.gui.main_window.read_fits")
-    def test_load_pair_prefers_aligned_cropped_files(self, mock_read, tmp_path):
+    def test_load_pair_prefers_aligned_cropped_files(self, mock_read, tmp_path, mw, empty_fits_header):
         """加载配对时应优先使用已对齐裁剪后的新旧图"""
         from scann.data.file_manager import FitsImagePair
 
-        w = _make_mock_window()
         pair = FitsImagePair(
             name="img_001",
             new_path=tmp_path / "new" / "img_001.fits",
@@ -827,15 +865,15 @@ class TestPairListSelection:
         )
         pair.new_path.parent.mkdir(parents=True, exist_ok=True)
         pair.old_path.parent.mkdir(parents=True, exist_ok=True)
-        w._image_pairs = [pair]
+        mw._image_pairs = [pair]
 
-        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = w._aligned_artifact_paths(pair)
+        new_aligned_path, old_aligned_path, new_marker_path, old_marker_path = mw._aligned_artifact_paths(pair)
         new_aligned_path.write_text("dummy", encoding="utf-8")
         old_aligned_path.write_text("dummy", encoding="utf-8")
         new_marker_path.write_text("aligned", encoding="utf-8")
         old_marker_path.write_text("aligned", encoding="utf-8")
 
-        test_header = FitsHeader(raw={})
+        test_header = empty_fits_header
 
         def _fake_read(path):
             path = Path(path)
@@ -847,10 +885,10 @@ class TestPairListSelection:
 
         mock_read.side_effect = _fake_read
 
-        w._load_pair(0)
+        mw._load_pair(0)
 
-        assert w._new_image_data.shape == (16, 16)
-        assert w._old_image_data.shape == (16, 16)
+        assert mw._new_image_data.shape == (16, 16)
+        assert mw._old_image_data.shape == (16, 16)
         read_paths = [Path(c.args[0]) for c in mock_read.call_args_list]
         assert new_aligned_path in read_paths
         assert old_aligned_path in read_paths
@@ -864,69 +902,59 @@ class TestPairListSelection:
 class TestBatchProcess:
     """测试批量处理对话框集成"""
 
-    def test_batch_process_opens_dialog(self):
+    def test_batch_process_opens_dialog(self, mock_batch_dialog_cls, mw):
         """应打开批量处理对话框"""
-        w = _make_mock_window()
-        with patch("scann.gui.dialogs.batch_process_dialog.BatchProcessDialog") as mock_dlg:
-            mock_instance = Mock()
-            mock_dlg.return_value = mock_instance
-            w._on_batch_process()
-            mock_dlg.assert_called_once()
-
-    @patch("scann.gui.main_window.write_fits")
-    @patch("scann.gui.main_window.read_fits")
-    def test_batch_process_denoise(self, mock_read, mock_write):
+        mw._on_batch_process()
+        mock_batch_dialog_cls.assert_called_once()
+
+    def test_batch_process_denoise(
+        self, mock_scan, mock_read, mock_write, mock_denoise, mw, zero_fits_image
+    ):
         """process_started 信号应触发降噪处理"""
-        w = _make_mock_window()
-        w._new_folder = "/fake/new"
-        w._batch_dialog = None
-
-        test_data = np.random.rand(64, 64).astype(np.float32)
-        test_header = FitsHeader(raw={})
-        mock_read.return_value = FitsImage(data=test_data, header=test_header, path="/fake/f.fits")
-
-        with patch("scann.gui.main_window.scan_fits_folder", return_value=[Path("/fake/f.fits")]):
-            with patch("scann.gui.main_window.denoise") as mock_denoise:
-                mock_denoise.return_value = test_data
-                w._run_batch_process({
-                    "input_dir": "/fake/new",
-                    "output_dir": "/fake/out",
-                    "denoise": True,
-                    "denoise_method": "中值滤波",
-                    "kernel_size": 3,
-                    "flat_field": False,
-                    "flat_sigma": 100.0,
-                    "bit_depth": "16-bit (保持原样)",
-                    "overwrite": False,
-                })
-                mock_denoise.assert_called_once()
-
-    @patch("scann.gui.main_window.write_fits")
-    @patch("scann.gui.main_window.read_fits")
-    def test_batch_process_flat_field(self, mock_read, mock_write):
+        mw._new_folder = "/fake/new"
+        mw._batch_dialog = None
+
+        mock_scan.return_value = [Path("/fake/f.fits")]
+        mock_read.return_value = zero_fits_image
+        mock_denoise.return_value = zero_fits_image.data
+
+        mw._run_batch_process({
+            "input_dir": "/fake/new",
+            "output_dir": "/fake/out",
+            "denoise": True,
+            "denoise_method": "中值滤波",
+            "kernel_size": 3,
+            "flat_field": False,
+            "flat_sigma": 100.0,
+            "bit_depth": "16-bit (保持原样)",
+            "overwrite": False,
+        })
+
+        mock_denoise.assert_called_once()
+
+    def test_batch_process_flat_field(
+        self, mock_scan, mock_read, mock_write, mock_flat, mw, zero_fits_image
+    ):
         """process_started 信号应触发伪平场校正"""
-        w = _make_mock_window()
-        w._new_folder = "/fake/new"
-
-        test_data = np.random.rand(64, 64).astype(np.float32)
-        test_header = FitsHeader(raw={})
-        mock_read.return_value = FitsImage(data=test_data, header=test_header, path="/fake/f.fits")
-
-        with patch("scann.gui.main_window.scan_fits_folder", return_value=[Path("/fake/f.fits")]):
-            with patch("scann.gui.main_window.pseudo_flat_field") as mock_flat:
-                mock_flat.return_value = test_data
-                w._run_batch_process({
-                    "input_dir": "/fake/new",
-                    "output_dir": "/fake/out",
-                    "denoise": False,
-                    "denoise_method": "中值滤波",
-                    "kernel_size": 3,
-                    "flat_field": True,
-                    "flat_sigma": 100.0,
-                    "bit_depth": "16-bit (保持原样)",
-                    "overwrite": False,
-                })
-                mock_flat.assert_called_once()
+        mw._new_folder = "/fake/new"
+
+        mock_scan.return_value = [Path("/fake/f.fits")]
+        mock_read.return_value = zero_fits_image
+        mock_flat.return_value = zero_fits_image.data
+
+        mw._run_batch_process({
+            "input_dir": "/fake/new",
+            "output_dir": "/fake/out",
+            "denoise": False,
+            "denoise_method": "中值滤波",
+            "kernel_size": 3,
+            "flat_field": True,
+            "flat_sigma": 100.0,
+            "bit_depth": "16-bit (保持原样)",
+            "overwrite": False,
+        })
+
+        mock_flat.assert_called_once()
 
 
 # ═══════════════════════════════════════════════
@@ -937,21 +965,13 @@ class TestBatchProcess:
 class TestTrainingIntegration:
     """测试训练对话框与后台 Trainer 集成"""
 
-    def test_training_dialog_opens(self):
+    def test_training_dialog_opens(self, mock_training_dialog_cls, mw):
         """应打开训练对话框"""
-        w = _make_mock_window()
-        with patch("scann.gui.dialogs.training_dialog.TrainingDialog") as mock_dlg:
-            mock_instance = Mock()
-            mock_dlg.return_value = mock_instance
-            w._on_open_training()
-            mock_dlg.assert_called_once()
-
-    @patch("scann.ai.training_worker.TrainingWorker")
-    def test_training_started_calls_trainer(self, mock_worker_cls):
+        mw._on_open_training()
+        mock_training_dialog_cls.assert_called_once()
+
+    def test_training_started_calls_trainer(self, mock_training_worker_cls, mw):
         """training_started 信号应启动后台训练"""
-        w = _make_mock_window()
-        mock_worker = Mock()
-        mock_worker_cls.return_value = mock_worker
         params = {
             "pos_dir": "/fake/pos",
             "neg_dir": "/fake/neg",
@@ -966,16 +986,15 @@ class TestTrainingIntegration:
             "patience": 10,
         }
         # _on_training_started should be a method that receives the params dict
-        w._on_training_started(params)
+        mw._on_training_started(params)
         # 应该创建了 TrainConfig 或发起了训练流程
-        w.statusBar().showMessage.assert_called()
+        assert mw._status_bar.messages
 
-    def test_training_stopped(self):
+    def test_training_stopped(self, mw):
         """training_stopped 信号应停止训练"""
-        w = _make_mock_window()
-        w._training_thread = None
-        w._on_training_stopped()
-        w.statusBar().showMessage.assert_called()
+        mw._training_thread = None
+        mw._on_training_stopped()
+        assert mw._status_bar.messages
 
 
 # ═══════════════════════════════════════════════
@@ -986,116 +1005,49 @@ class TestTrainingIntegration:
 class TestQueryIntegration:
     """测试查询服务集成"""
 
-    def test_do_query_vsx_with_wcs(self):
-        """有 WCS 时 _do_query 应调用 QueryService 并显示结果"""
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
-
-        mock_sky = Mock()
-        mock_sky.ra = 180.0
-        mock_sky.dec = 45.0
-
-        with patch("scann.gui.main_window.pixel_to_wcs", return_value=mock_sky):
-            with patch("scann.gui.main_window.QueryService") as mock_svc_cls:
-                mock_svc = Mock()
-                mock_svc.query_vsx.return_value = [
-                    QueryResult(
-                        source="VSX", name="V1234 Sgr",
-                        object_type="EA", distance_arcsec=2.5,
-                    )
-                ]
-                mock_svc_cls.return_value = mock_svc
-
-                with patch("scann.gui.main_window.QueryResultPopup") as mock_popup_cls:
-                    mock_popup = Mock()
-                    mock_popup_cls.return_value = mock_popup
-
-                    w._do_query("vsx", 50, 50)
-
-                    mock_svc.query_vsx.assert_called_once()
-                    mock_popup.set_content.assert_called_once()
-                    mock_popup.show.assert_called_once()
-
-    def test_do_query_mpc(self):
-        """MPC 查询应调用 query_mpc"""
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
-
-        mock_sky = Mock()
-        mock_sky.ra = 200.0
-        mock_sky.dec = -10.0
-
-        with patch("scann.gui.main_window.pixel_to_wcs", return_value=mock_sky):
-            with patch("scann.gui.main_window.QueryService") as mock_svc_cls:
-                mock_svc = Mock()
-                mock_svc.query_mpc.return_value = []
-                mock_svc_cls.return_value = mock_svc
-
-                with patch("scann.gui.main_window.QueryResultPopup") as mock_popup_cls:
-                    mock_popup = Mock()
-                    mock_popup_cls.return_value = mock_popup
-
-                    w._do_query("mpc", 50, 50)
-
-                    mock_svc.query_mpc.assert_called_once()
-
-    def test_do_query_simbad(self):
-        """SIMBAD 查询应调用 query_simbad"""
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
+    @pytest.mark.parametrize("kind", ["vsx", "mpc", "simbad", "tns"])
+    def test_do_query_calls_service(
+        self, fake_pixel_to_wcs, mock_query_svc_cls, mock_popup_cls, mw, kind
+    ):
+        """有 WCS 时应调用对应的 QueryService.query_<kind> 并弹出结果窗口"""
+        mw._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
+        query_fn = getattr(mock_query_svc_cls.return_value, f"query_{kind}")
+        query_fn.return_value = []
 
-        mock_sky = Mock()
-        mock_sky.ra = 100.0
-        mock_sky.dec = 20.0
+        mw._do_query(kind, 50, 50)
 
-        with patch("scann.gui.main_window.pixel_to_wcs", return_value=mock_sky):
-            with patch("scann.gui.main_window.QueryService") as mock_svc_cls:
-                mock_svc = Mock()
-                mock_svc.query_simbad.return_value = []
-                mock_svc_cls.return_value = mock_svc
+        query_fn.assert_called_once_with(_FAKE_SKY.ra, _FAKE_SKY.dec)
+        mock_popup_cls.return_value.show.assert_called_once()
 
-                with patch("scann.gui.main_window.QueryResultPopup") as mock_popup_cls:
-                    mock_popup = Mock()
-                    mock_popup_cls.return_value = mock_popup
+    def test_do_query_shows_results(
+        self, fake_pixel_to_wcs, mock_query_svc_cls, mock_popup_cls, mw
+    ):
+        """查询有结果时应填充弹窗内容"""
+        mw._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
+        mock_query_svc_cls.return_value.query_vsx.return_value = [
+            QueryResult(
+                source="VSX", name="V1234 Sgr",
+                object_type="EA", distance_arcsec=2.5,
+            )
+        ]
 
-                    w._do_query("simbad", 50, 50)
+        mw._do_query("vsx", 50, 50)
 
-                    mock_svc.query_simbad.assert_called_once()
+        popup = mock_popup_cls.return_value
+        popup.set_content.assert_called_once()
+        assert "V1234 Sgr" in popup.set_content.call_args[0][0]
+        popup.show.assert_called_once()
 
-    def test_do_query_no_wcs_fallback(self):
+    def test_do_query_no_wcs_fallback(self, mw):
         """无 WCS 时应提示并使用像素坐标"""
-        w = _make_mock_window()
-        w._new_fits_header = None
+        mw._new_fits_header = None
 
-        w._do_query("vsx", 50, 50)
+        mw._do_query("vsx", 50, 50)
 
-        w.statusBar().showMessage.assert_called()
-        msg = w.statusBar().showMessage.call_args[0][0]
+        assert mw._status_bar.messages
+        msg = mw._status_bar.messages[-1]
         assert "像素坐标" in msg
 
-    def test_do_query_tns(self):
-        """TNS 查询应调用 query_tns"""
-        w = _make_mock_window()
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
-
-        mock_sky = Mock()
-        mock_sky.ra = 150.0
-        mock_sky.dec = 30.0
-
-        with patch("scann.gui.main_window.pixel_to_wcs", return_value=mock_sky):
-            with patch("scann.gui.main_window.QueryService") as mock_svc_cls:
-                mock_svc = Mock()
-                mock_svc.query_tns.return_value = []
-                mock_svc_cls.return_value = mock_svc
-
-                with patch("scann.gui.main_window.QueryResultPopup") as mock_popup_cls:
-                    mock_popup = Mock()
-                    mock_popup_cls.return_value = mock_popup
-
-                    w._do_query("tns", 50, 50)
-
-                    mock_svc.query_tns.assert_called_once()
-
 
 # ═══════════════════════════════════════════════
 #  功能 16: MPC 报告集成
@@ -1105,63 +1057,43 @@ class TestQueryIntegration:
 class TestMpcReportIntegration:
     """测试 MPC 报告生成集成"""
 
-    def test_mpc_report_with_candidates(self):
+    def test_mpc_report_with_candidates(
+        self, fake_pixel_to_wcs, mock_gen_mpc, mock_mpc_dialog_cls, mw
+    ):
         """有候选体时应生成报告并传入对话框"""
-        w = _make_mock_window()
-        w._candidates = [
+        mw._candidates = [
             Candidate(x=100, y=200, verdict=TargetVerdict.REAL),
             Candidate(x=300, y=400, verdict=TargetVerdict.REAL),
         ]
-        w._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
-
-        with patch("scann.gui.dialogs.mpc_report_dialog.MpcReportDialog") as mock_dlg_cls:
-            mock_dlg = Mock()
-            mock_dlg_cls.return_value = mock_dlg
+        mw._new_fits_header = FitsHeader(raw={"CTYPE1": "RA---TAN"})
+        mock_gen_mpc.return_value = "     K24A01A  C2024 01 15.12345 12 00 00.00 +45 00 00.0          20.0R      XXX"
 
-            with patch("scann.gui.main_window.pixel_to_wcs") as mock_wcs:
-                mock_sky = Mock()
-                mock_sky.ra = 180.0
-                mock_sky.dec = 45.0
-                mock_wcs.return_value = mock_sky
+        mw._on_mpc_report()
 
-                with patch("scann.gui.main_window.generate_mpc_report") as mock_gen:
-                    mock_gen.return_value = "     K24A01A  C2024 01 15.12345 12 00 00.00 +45 00 00.0          20.0R      XXX"
-                    w._on_mpc_report()
+        mock_gen_mpc.assert_called_once()
+        mock_mpc_dialog_cls.return_value.set_report.assert_called_once()
 
-                    mock_gen.assert_called_once()
-                    mock_dlg.set_report.assert_called_once()
-
-    def test_mpc_report_no_candidates(self):
+    def test_mpc_report_no_candidates(self, mock_mpc_dialog_cls, mw):
         """无候选体时应显示提示"""
-        w = _make_mock_window()
-        w._candidates = []
-        w._new_fits_header = None
-
-        with patch("scann.gui.dialogs.mpc_report_dialog.MpcReportDialog") as mock_dlg_cls:
-            mock_dlg = Mock()
-            mock_dlg_cls.return_value = mock_dlg
+        mw._candidates = []
+        mw._new_fits_header = None
 
-            w._on_mpc_report()
+        mw._on_mpc_report()
 
-            # 无候选体时不应调用 set_report
-            mock_dlg.set_report.assert_not_called()
+        # 无候选体时不应调用 set_report
+        mock_mpc_dialog_cls.return_value.set_report.assert_not_called()
 
-    def test_mpc_report_no_wcs(self):
+    def test_mpc_report_no_wcs(self, mock_mpc_dialog_cls, mw):
         """无 WCS 时报告应使用像素坐标（或提示）"""
-        w = _make_mock_window()
-        w._candidates = [
+        mw._candidates = [
             Candidate(x=100, y=200, verdict=TargetVerdict.REAL),
         ]
-        w._new_fits_header = None
+        mw._new_fits_header = None
 
-        with patch("scann.gui.dialogs.mpc_report_dialog.MpcReportDialog") as mock_dlg_cls:
-            mock_dlg = Mock()
-            mock_dlg_cls.return_value = mock_dlg
+        mw._on_mpc_report()
 
-            w._on_mpc_report()
-
-            # 无 WCS 时应显示提示
-            w.statusBar().showMessage.assert_called()
+        # 无 WCS 时应显示提示
+        assert mw._status_bar.messages
 
 
 # ═══════════════════════════════════════════════
@@ -1169,71 +1101,57 @@ class TestMpcReportIntegration:
 # ═══════════════════════════════════════════════
 
 
+@pytest.fixture(scope="session")
+def main_window_sources(main_window_module):
+    """菜单/信号连接方法的源码 (会话内只读取一次)"""
+    cls = main_window_module.MainWindow
+    return {
+        "menu": inspect.getsource(cls._init_menu_bar),
+        "signals": inspect.getsource(cls._connect_signals),
+    }
+
+
 class TestAnnotationToolEntry:
     """测试标注工具系统在主窗口中的入口"""
 
-    def test_annotation_menu_exists(self):
+    def test_annotation_menu_exists(self, main_window_sources):
         """AI 菜单中应有标注工具菜单项"""
-        from scann.gui.main_window import MainWindow
-        import inspect
-        src = inspect.getsource(MainWindow._init_menu_bar)
+        src = main_window_sources["menu"]
         assert "标注工具" in src
         assert "act_annotation" in src
 
-    def test_annotation_shortcut_ctrl_l(self):
+    def test_annotation_shortcut_ctrl_l(self, main_window_sources):
         """标注工具应绑定 Ctrl+L 快捷键"""
-        from scann.gui.main_window import MainWindow
-        import inspect
-        src = inspect.getsource(MainWindow._init_menu_bar)
-        assert "Ctrl+L" in src
+        assert "Ctrl+L" in main_window_sources["menu"]
 
-    def test_on_open_annotation_creates_dialog(self):
+    def test_on_open_annotation_creates_dialog(self, mock_annotation_dialog_cls, mw):
         """调用 _on_open_annotation 应创建 AnnotationDialog 实例"""
-        w = _make_mock_window()
+        mw._on_open_annotation()
 
-        with patch("scann.gui.dialogs.annotation_dialog.AnnotationDialog") as mock_cls:
-            mock_dlg = Mock()
-            mock_cls.return_value = mock_dlg
+        # 验证调用，包括 config 参数
+        mock_annotation_dialog_cls.assert_called_once()
+        call_args = mock_annotation_dialog_cls.call_args
+        assert call_args[0][0] == mw
+        assert 'config' in call_args[1]
+        mock_annotation_dialog_cls.return_value.show.assert_called_once()
 
-            w._on_open_annotation()
-
-            # 验证调用，包括 config 参数
-            mock_cls.assert_called_once()
-            call_args = mock_cls.call_args
-            assert call_args[0][0] == w
-            assert 'config' in call_args[1]
-            mock_dlg.show.assert_called_once()
-
-    def test_on_open_annotation_stores_reference(self):
+    def test_on_open_annotation_stores_reference(self, mock_annotation_dialog_cls, mw):
         """打开标注对话框后应保存引用到 _annotation_dialog"""
-        w = _make_mock_window()
-
-        with patch("scann.gui.dialogs.annotation_dialog.AnnotationDialog") as mock_cls:
-            mock_dlg = Mock()
-            mock_cls.return_value = mock_dlg
+        mw._on_open_annotation()
 
-            w._on_open_annotation()
+        assert mw._annotation_dialog is mock_annotation_dialog_cls.return_value
 
-            assert w._annotation_dialog is mock_dlg
-
-    def test_annotation_dialog_is_non_modal(self):
+    def test_annotation_dialog_is_non_modal(self, mock_annotation_dialog_cls, mw):
         """标注对话框应以非模态方式打开 (show 而非 exec_)"""
-        w = _make_mock_window()
-
-        with patch("scann.gui.dialogs.annotation_dialog.AnnotationDialog") as mock_cls:
-            mock_dlg = Mock()
-            mock_cls.return_value = mock_dlg
-
-            w._on_open_annotation()
+        mw._on_open_annotation()
 
-            # show() 被调用, exec_() 不应被调用
-            mock_dlg.show.assert_called_once()
-            mock_dlg.exec_.assert_not_called()
+        # show() 被调用, exec_() 不应被调用
+        mock_dlg = mock_annotation_dialog_cls.return_value
+        mock_dlg.show.assert_called_once()
+        mock_dlg.exec_.assert_not_called()
 
-    def test_annotation_signal_connected(self):
+    def test_annotation_signal_connected(self, main_window_sources):
         """act_annotation.triggered 应连接到 _on_open_annotation"""
-        from scann.gui.main_window import MainWindow
-        import inspect
-        src = inspect.getsource(MainWindow._connect_signals)
+        src = main_window_sources["signals"]
         assert "act_annotation" in src
         assert "_on_open_annotation" in src
@@ -2,6 +2,8 @@
 
 import pytest
 
+pytestmark = pytest.mark.usefixtures("torch_no_grad_single_thread", "no_weight_download")
+
 
 class TestSCANNClassifier:
     """测试分类器模型架构 (向后兼容 v1)"""
@@ -13,15 +15,22 @@ class TestSCANNClassifier:
         model = SCANNClassifier(pretrained=False)
         assert model is not None
 
-    def test_forward_shape(self):
+    def test_forward_shape(self, scann_classifier):
+        torch = pytest.importorskip("torch")
+
+        # 只校验输出形状, 小尺寸输入即可 (ResNet18 对 H, W ≥ 32 均可)
+        x = torch.randn(1, 3, 32, 32)
+        with torch.no_grad():
+            out = scann_classifier(x)
+        assert out.shape == (1, 2)
+
+    @pytest.mark.slow
+    def test_forward_shape_full_resolution(self, scann_classifier):
         torch = pytest.importorskip("torch")
-        from scann.ai.model import SCANNClassifier
 
-        model = SCANNClassifier(pretrained=False)
-        model.eval()
         x = torch.randn(4, 3, 224, 224)
         with torch.no_grad():
-            out = model(x)
+            out = scann_classifier(x)
         assert out.shape == (4, 2)
 
     def test_load_checkpoint_nonexistent_raises(self):
@@ -46,6 +55,18 @@ class TestSCANNDetector:
         torch = pytest.importorskip("torch")
         from scann.ai.model import SCANNDetector
 
+        model = SCANNDetector(in_channels=1, pretrained=False)
+        model.eval()
+        x = torch.randn(1, 1, 64, 64)
+        with torch.no_grad():
+            out = model(x)
+        assert out is not None
+
+    @pytest.mark.slow
+    def test_detector_forward_full_resolution(self):
+        torch = pytest.importorskip("torch")
+        from scann.ai.model import SCANNDetector
+
         model = SCANNDetector(in_channels=1, pretrained=False)
         model.eval()
         x = torch.randn(1, 1, 512, 512)
@@ -10,8 +10,8 @@
 - InferenceEngine 对不同格式的支持
 """
 
+import io
 import sys
-import tempfile
 from pathlib import Path
 
 import pytest
@@ -20,13 +20,27 @@ import pytest
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-# 设置PyTorch模型缓存目录
+# PyTorch模型缓存目录
 project_root = src_path.parent
 model_cache_dir = project_root / "models" / "torch_cache"
-model_cache_dir.mkdir(parents=True, exist_ok=True)
 
+# torchvision 只在构建 checkpoint 的 helper / 被测代码中延迟导入
 torch = pytest.importorskip("torch")
-torch.hub.set_dir(str(model_cache_dir))
+
+pytestmark = pytest.mark.usefixtures("torch_no_grad_single_thread", "no_weight_download")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _torch_hub_dir():
+    """运行本模块测试时才设置 torch.hub 缓存目录 (收集阶段不创建目录), 结束后恢复"""
+    previous = torch.hub.get_dir()
+    model_cache_dir.mkdir(parents=True, exist_ok=True)
+    torch.hub.set_dir(str(model_cache_dir))
+    yield
+    torch.hub.set_dir(previous)
+
+# 格式检测/键名转换只看键名、值原样传递: 所有键共用一个空张量
+_ANY_TENSOR = torch.zeros(0)
 
 
 # ──────────────────── ModelFormat 枚举 ────────────────────
@@ -64,60 +78,39 @@ class TestModelFormat:
 class TestDetectModelFormat:
     """测试 state_dict 格式自动检测"""
 
-    def test_detect_v1_format(self):
-        """v1 格式: 键没有 backbone. 前缀 (原始 ResNet18)"""
-        from scann.ai.model import ModelFormat, detect_model_format
-
-        # 构造 v1 风格的 state_dict 键
-        v1_keys = [
+    @pytest.mark.parametrize("keys,expected", [
+        # v1 格式: 键没有 backbone. 前缀 (原始 ResNet18)
+        ([
             "conv1.weight", "bn1.weight", "bn1.bias",
             "layer1.0.conv1.weight", "layer1.0.bn1.weight",
             "fc.weight", "fc.bias",
-        ]
-        v1_state = {k: torch.zeros(1) for k in v1_keys}
-        assert detect_model_format(v1_state) == ModelFormat.V1_CLASSIFIER
-
-    def test_detect_v2_format(self):
-        """v2 格式: 键有 backbone. 前缀"""
-        from scann.ai.model import ModelFormat, detect_model_format
-
-        v2_keys = [
+        ], "V1_CLASSIFIER"),
+        # v2 格式: 键有 backbone. 前缀
+        ([
             "backbone.conv1.weight", "backbone.bn1.weight",
             "backbone.layer1.0.conv1.weight",
             "backbone.fc.weight", "backbone.fc.bias",
-        ]
-        v2_state = {k: torch.zeros(1) for k in v2_keys}
-        assert detect_model_format(v2_state) == ModelFormat.V2_CLASSIFIER
-
-    def test_detect_with_module_prefix(self):
-        """带 module. 前缀的 v1 格式 (DataParallel 保存)"""
-        from scann.ai.model import ModelFormat, detect_model_format
-
-        keys = [
+        ], "V2_CLASSIFIER"),
+        # 带 module. 前缀的 v1 格式 (DataParallel 保存)
+        ([
             "module.conv1.weight", "module.bn1.weight",
             "module.layer1.0.conv1.weight",
             "module.fc.weight",
-        ]
-        state = {k: torch.zeros(1) for k in keys}
-        assert detect_model_format(state) == ModelFormat.V1_CLASSIFIER
-
-    def test_detect_with_module_backbone_prefix(self):
-        """带 module.backbone. 前缀的 v2 格式"""
-        from scann.ai.model import ModelFormat, detect_model_format
-
-        keys = [
+        ], "V1_CLASSIFIER"),
+        # 带 module.backbone. 前缀的 v2 格式
+        ([
             "module.backbone.conv1.weight", "module.backbone.bn1.weight",
             "module.backbone.layer1.0.conv1.weight",
             "module.backbone.fc.weight",
-        ]
-        state = {k: torch.zeros(1) for k in keys}
-        assert detect_model_format(state) == ModelFormat.V2_CLASSIFIER
-
-    def test_detect_empty_state(self):
-        """空 state_dict 默认返回 AUTO"""
+        ], "V2_CLASSIFIER"),
+        # 空 state_dict 默认返回 AUTO
+        ([], "AUTO"),
+    ], ids=["v1", "v2", "v1_module", "v2_module", "empty"])
+    def test_detect(self, keys, expected):
         from scann.ai.model import ModelFormat, detect_model_format
 
-        assert detect_model_format({}) == ModelFormat.AUTO
+        state = dict.fromkeys(keys, _ANY_TENSOR)
+        assert detect_model_format(state) == getattr(ModelFormat, expected)
 
 
 # ──────────────────── state_dict 键转换 ────────────────────
@@ -131,11 +124,11 @@ class TestConvertStateDict:
         from scann.ai.model import convert_state_dict_v1_to_v2
 
         v1_state = {
-            "conv1.weight": torch.zeros(64, 3, 7, 7),
-            "bn1.weight": torch.zeros(64),
-            "layer1.0.conv1.weight": torch.zeros(64, 64, 3, 3),
-            "fc.weight": torch.zeros(2, 512),
-            "fc.bias": torch.zeros(2),
+            "conv1.weight": _ANY_TENSOR,
+            "bn1.weight": _ANY_TENSOR,
+            "layer1.0.conv1.weight": _ANY_TENSOR,
+            "fc.weight": _ANY_TENSOR,
+            "fc.bias": _ANY_TENSOR,
         }
         v2_state = convert_state_dict_v1_to_v2(v1_state)
 
@@ -153,8 +146,8 @@ class TestConvertStateDict:
         from scann.ai.model import convert_state_dict_v1_to_v2
 
         v1_state = {
-            "module.conv1.weight": torch.zeros(64, 3, 7, 7),
-            "module.fc.weight": torch.zeros(2, 512),
+            "module.conv1.weight": _ANY_TENSOR,
+            "module.fc.weight": _ANY_TENSOR,
         }
         v2_state = convert_state_dict_v1_to_v2(v1_state)
         assert "backbone.conv1.weight" in v2_state
@@ -165,8 +158,8 @@ class TestConvertStateDict:
         from scann.ai.model import convert_state_dict_v1_to_v2
 
         v1_state = {
-            "conv1.weight": torch.zeros(64, 3, 7, 7),
-            "bn1.num_batches_tracked": torch.tensor(100),
+            "conv1.weight": _ANY_TENSOR,
+            "bn1.num_batches_tracked": _ANY_TENSOR,
         }
         v2_state = convert_state_dict_v1_to_v2(v1_state)
         assert "backbone.conv1.weight" in v2_state
@@ -174,131 +167,82 @@ class TestConvertStateDict:
         # 关键是 conv1 被正确转换
 
 
+# ──────────────────── 共享 checkpoint (会话内各生成一次) ────────────────────
+
+
+def _v1_resnet_state() -> dict:
+    """v1 格式的 state_dict: 原始 ResNet18 (无 backbone. 前缀)"""
+    from torchvision import models
+    resnet = models.resnet18(weights=None)
+    resnet.fc = torch.nn.Linear(512, 2)
+    return resnet.state_dict()
+
+
+@pytest.fixture(scope="session")
+def v1_ckpt(tmp_path_factory) -> str:
+    """v1 格式的 checkpoint 文件 (直接保存 ResNet18 的 state_dict)"""
+    path = tmp_path_factory.mktemp("ckpt") / "v1.pth"
+    torch.save(_v1_resnet_state(), path)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def v2_ckpt(tmp_path_factory) -> str:
+    """v2 格式的 checkpoint 文件"""
+    from scann.ai.model import SCANNClassifier
+    path = tmp_path_factory.mktemp("ckpt") / "v2.pth"
+    torch.save(SCANNClassifier(pretrained=False).state_dict(), path)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def v1_dict_ckpt(tmp_path_factory) -> str:
+    """v1 格式的字典 checkpoint (包含 state 键和 threshold)"""
+    path = tmp_path_factory.mktemp("ckpt") / "v1_dict.pth"
+    torch.save({"state": _v1_resnet_state(), "threshold": 0.75}, path)
+    return str(path)
+
+
 # ──────────────────── 模型加载兼容性 ────────────────────
 
 
+@pytest.mark.slow
 class TestModelLoadCompatibility:
-    """测试不同格式的模型加载"""
-
-    def _create_v1_checkpoint(self, path: str):
-        """创建 v1 格式的 checkpoint 文件"""
-        from torchvision import models
-        resnet = models.resnet18(weights=None)
-        resnet.fc = torch.nn.Linear(512, 2)
-        # v1 直接保存 ResNet18 的 state_dict (无 backbone. 前缀)
-        torch.save(resnet.state_dict(), path)
-
-    def _create_v2_checkpoint(self, path: str):
-        """创建 v2 格式的 checkpoint 文件"""
-        from scann.ai.model import SCANNClassifier
-        model = SCANNClassifier(pretrained=False)
-        torch.save(model.state_dict(), path)
-
-    def _create_v1_dict_checkpoint(self, path: str):
-        """创建 v1 格式的字典 checkpoint (包含 state 键)"""
-        from torchvision import models
-        resnet = models.resnet18(weights=None)
-        resnet.fc = torch.nn.Linear(512, 2)
-        torch.save({
-            "state": resnet.state_dict(),
-            "threshold": 0.75,
-        }, path)
-
-    def test_load_v1_checkpoint_auto_detect(self):
-        """自动检测并加载 v1 格式的 checkpoint"""
-        from scann.ai.model import SCANNClassifier
-
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v1_checkpoint(path)
-            model = SCANNClassifier.load_from_checkpoint(
-                path, device=torch.device("cpu")
-            )
-            assert model is not None
-            # 验证模型能正常前向传播
-            model.eval()
-            x = torch.randn(1, 3, 224, 224)
-            with torch.no_grad():
-                out = model(x)
-            assert out.shape == (1, 2)
-        finally:
-            Path(path).unlink(missing_ok=True)
-
-    def test_load_v2_checkpoint(self):
-        """正常加载 v2 格式 checkpoint"""
-        from scann.ai.model import SCANNClassifier
+    """测试不同格式的模型加载 (每个用例构建 ResNet18 并加载权重, 较慢)"""
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v2_checkpoint(path)
-            model = SCANNClassifier.load_from_checkpoint(
-                path, device=torch.device("cpu")
-            )
-            assert model is not None
-            model.eval()
-            x = torch.randn(1, 3, 224, 224)
-            with torch.no_grad():
-                out = model(x)
-            assert out.shape == (1, 2)
-        finally:
-            Path(path).unlink(missing_ok=True)
-
-    def test_load_v1_dict_checkpoint(self):
-        """加载 v1 格式的字典 checkpoint (含 state 键和 threshold)"""
+    @pytest.mark.parametrize("ckpt", ["v1_ckpt", "v2_ckpt", "v1_dict_ckpt"])
+    def test_load_checkpoint_auto_detect(self, ckpt, request):
+        """自动检测格式并加载 v1 / v2 / v1 字典 checkpoint"""
         from scann.ai.model import SCANNClassifier
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v1_dict_checkpoint(path)
-            model = SCANNClassifier.load_from_checkpoint(
-                path, device=torch.device("cpu")
-            )
-            assert model is not None
-            model.eval()
-            x = torch.randn(1, 3, 224, 224)
-            with torch.no_grad():
-                out = model(x)
-            assert out.shape == (1, 2)
-        finally:
-            Path(path).unlink(missing_ok=True)
-
-    def test_load_with_explicit_v1_format(self):
+        model = SCANNClassifier.load_from_checkpoint(
+            request.getfixturevalue(ckpt), device=torch.device("cpu")
+        )
+        assert model is not None
+        # 验证模型能正常前向传播
+        model.eval()
+        x = torch.randn(1, 3, 224, 224)
+        with torch.no_grad():
+            out = model(x)
+        assert out.shape == (1, 2)
+
+    def test_load_with_explicit_v1_format(self, v1_ckpt):
         """显式指定 v1 格式加载"""
         from scann.ai.model import ModelFormat, SCANNClassifier
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
+        model = SCANNClassifier.load_from_checkpoint(
+            v1_ckpt, device=torch.device("cpu"), model_format=ModelFormat.V1_CLASSIFIER
+        )
+        assert model is not None
 
-        try:
-            self._create_v1_checkpoint(path)
-            model = SCANNClassifier.load_from_checkpoint(
-                path, device=torch.device("cpu"), model_format=ModelFormat.V1_CLASSIFIER
-            )
-            assert model is not None
-        finally:
-            Path(path).unlink(missing_ok=True)
-
-    def test_load_with_explicit_v2_format(self):
+    def test_load_with_explicit_v2_format(self, v2_ckpt):
         """显式指定 v2 格式加载"""
         from scann.ai.model import ModelFormat, SCANNClassifier
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v2_checkpoint(path)
-            model = SCANNClassifier.load_from_checkpoint(
-                path, device=torch.device("cpu"), model_format=ModelFormat.V2_CLASSIFIER
-            )
-            assert model is not None
-        finally:
-            Path(path).unlink(missing_ok=True)
+        model = SCANNClassifier.load_from_checkpoint(
+            v2_ckpt, device=torch.device("cpu"), model_format=ModelFormat.V2_CLASSIFIER
+        )
+        assert model is not None
 
 
 # ──────────────────── 保存带格式元数据 ────────────────────
@@ -307,47 +251,35 @@ class TestModelLoadCompatibility:
 class TestSaveWithFormat:
     """测试保存模型时包含格式元数据"""
 
-    def test_save_checkpoint_includes_format(self):
+    def test_save_checkpoint_includes_format(self, scann_classifier):
         """save_checkpoint 应在字典中包含 model_format 字段"""
         from scann.ai.model import ModelFormat, SCANNClassifier
 
-        model = SCANNClassifier(pretrained=False)
-
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            SCANNClassifier.save_checkpoint(model, path, threshold=0.5)
-            ckpt = torch.load(path, map_location="cpu", weights_only=False)
-            assert isinstance(ckpt, dict)
-            assert "model_format" in ckpt
-            assert ckpt["model_format"] == ModelFormat.V2_CLASSIFIER.value
-            assert "state" in ckpt
-            assert "threshold" in ckpt
-        finally:
-            Path(path).unlink(missing_ok=True)
-
-    def test_save_checkpoint_with_custom_format(self):
+        buf = io.BytesIO()  # torch.save 接受文件对象, 无需落盘
+        SCANNClassifier.save_checkpoint(scann_classifier, buf, threshold=0.5)
+        buf.seek(0)
+        ckpt = torch.load(buf, map_location="cpu", weights_only=True)
+        assert isinstance(ckpt, dict)
+        assert "model_format" in ckpt
+        assert ckpt["model_format"] == ModelFormat.V2_CLASSIFIER.value
+        assert "state" in ckpt
+        assert "threshold" in ckpt
+
+    def test_save_checkpoint_with_custom_format(self, scann_classifier):
         """保存 v1 格式 checkpoint"""
         from scann.ai.model import ModelFormat, SCANNClassifier
 
-        model = SCANNClassifier(pretrained=False)
-
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            SCANNClassifier.save_checkpoint(
-                model, path, model_format=ModelFormat.V1_CLASSIFIER
-            )
-            ckpt = torch.load(path, map_location="cpu", weights_only=False)
-            assert ckpt["model_format"] == ModelFormat.V1_CLASSIFIER.value
-            # v1 格式的 state 不应有 backbone. 前缀
-            state = ckpt["state"]
-            for key in state:
-                assert not key.startswith("backbone."), f"v1 格式不应有 backbone. 前缀: {key}"
-        finally:
-            Path(path).unlink(missing_ok=True)
+        buf = io.BytesIO()
+        SCANNClassifier.save_checkpoint(
+            scann_classifier, buf, model_format=ModelFormat.V1_CLASSIFIER
+        )
+        buf.seek(0)
+        ckpt = torch.load(buf, map_location="cpu", weights_only=True)
+        assert ckpt["model_format"] == ModelFormat.V1_CLASSIFIER.value
+        # v1 格式的 state 不应有 backbone. 前缀
+        state = ckpt["state"]
+        for key in state:
+            assert not key.startswith("backbone."), f"v1 格式不应有 backbone. 前缀: {key}"
 
 
 # ──────────────────── InferenceEngine 格式支持 ────────────────────
@@ -356,26 +288,13 @@ class TestSaveWithFormat:
 class TestInferenceEngineFormat:
     """测试推理引擎对不同模型格式的支持"""
 
-    def _create_v1_checkpoint(self, path: str):
-        from torchvision import models
-        resnet = models.resnet18(weights=None)
-        resnet.fc = torch.nn.Linear(512, 2)
-        torch.save(resnet.state_dict(), path)
-
-    def test_inference_engine_loads_v1_model(self):
+    def test_inference_engine_loads_v1_model(self, v1_ckpt):
         """InferenceEngine 应能加载 v1 模型"""
         from scann.ai.inference import InferenceConfig, InferenceEngine
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v1_checkpoint(path)
-            config = InferenceConfig(device="cpu")
-            engine = InferenceEngine(model_path=path, config=config)
-            assert engine.is_ready
-        finally:
-            Path(path).unlink(missing_ok=True)
+        config = InferenceConfig(device="cpu")
+        engine = InferenceEngine(model_path=v1_ckpt, config=config)
+        assert engine.is_ready
 
     def test_inference_config_has_model_format(self):
         """InferenceConfig 应有 model_format 字段"""
@@ -386,18 +305,11 @@ class TestInferenceEngineFormat:
         assert hasattr(config, "model_format")
         assert config.model_format == ModelFormat.AUTO.value
 
-    def test_inference_engine_with_explicit_format(self):
+    def test_inference_engine_with_explicit_format(self, v1_ckpt):
         """显式指定格式加载"""
         from scann.ai.inference import InferenceConfig, InferenceEngine
         from scann.ai.model import ModelFormat
 
-        with tempfile.NamedTemporaryFile(suffix=".pth", delete=False) as f:
-            path = f.name
-
-        try:
-            self._create_v1_checkpoint(path)
-            config = InferenceConfig(device="cpu", model_format=ModelFormat.V1_CLASSIFIER.value)
-            engine = InferenceEngine(model_path=path, config=config)
-            assert engine.is_ready
-        finally:
-            Path(path).unlink(missing_ok=True)
+        config = InferenceConfig(device="cpu", model_format=ModelFormat.V1_CLASSIFIER.value)
+        engine = InferenceEngine(model_path=v1_ckpt, config=config)
+        assert engine.is_ready
@@ -14,14 +14,26 @@ from unittest.mock import patch
 from scann.gui.dialogs.mpc_report_dialog import MpcReportDialog
 
 
+@pytest.fixture(scope="module")
+def _shared_dialog(qapp):
+    """模块内共用一个对话框 (Qt 控件构造代价较高)"""
+    d = MpcReportDialog()
+    yield d
+    d.deleteLater()
+
+
 @pytest.fixture
-def dialog(qapp):
-    return MpcReportDialog()
+def dialog(_shared_dialog):
+    """每个测试开始前清空报告, 恢复到初始状态"""
+    _shared_dialog.set_report("")
+    return _shared_dialog
 
 
 # 标准 MPC 80列报告行 (恰好80字符)
 SAMPLE_80_COL = "     2024 AB1   C2024 01 15.12345 12 34 56.78 +12 34 56.7          15.2 R      C42"
 SAMPLE_SHORT = "short line"
+LINE_80 = "A" * 80
+LINE_60 = "B" * 60
 
 
 class TestMpcReportDialogInit:
@@ -59,30 +71,18 @@ class TestSetReport:
 class TestCharCount:
     """测试字符统计"""
 
-    def test_80_col_all_pass(self, dialog):
-        # 创建恰好80字符的行
-        line = "A" * 80
-        dialog.set_report(line)
-        assert "✅" in dialog.lbl_char_count.text()
-        assert "80" in dialog.lbl_char_count.text()
-
-    def test_non_standard_width(self, dialog):
-        dialog.set_report("short")
-        assert "⚠" in dialog.lbl_char_count.text()
-
-    def test_mixed_widths(self, dialog):
-        lines = "A" * 80 + "\n" + "B" * 60
-        dialog.set_report(lines)
-        assert "⚠" in dialog.lbl_char_count.text()
-
-    def test_empty_report_count(self, dialog):
-        dialog.set_report("")
-        assert "0" in dialog.lbl_char_count.text()
-
-    def test_multiple_lines_count(self, dialog):
-        lines = "\n".join(["A" * 80] * 5)
-        dialog.set_report(lines)
-        assert "5" in dialog.lbl_char_count.text()
+    @pytest.mark.parametrize("text,markers", [
+        (LINE_80, ("✅", "80")),               # 恰好80字符
+        ("short", ("⚠",)),                     # 非标准宽度
+        (LINE_80 + "\n" + LINE_60, ("⚠",)),    # 宽度混杂
+        ("", ("0",)),                          # 空报告
+        ("\n".join([LINE_80] * 5), ("5",)),    # 多行计数
+    ], ids=["80_col_all_pass", "non_standard", "mixed", "empty", "multiple_lines"])
+    def test_char_count(self, dialog, text, markers):
+        dialog.set_report(text)
+        label = dialog.lbl_char_count.text()
+        for marker in markers:
+            assert marker in label
 
 
 class TestCopy:
@@ -105,6 +105,10 @@ class TestReportExportedSignal:
 
     def test_signal_exists(self, dialog):
         received = []
-        dialog.report_exported.connect(lambda p: received.append(p))
-        dialog.report_exported.emit("/test.txt")
+        dialog.report_exported.connect(received.append)
+        try:
+            dialog.report_exported.emit("/test.txt")
+        finally:
+            # 对话框在模块内共享, 不留下额外连接
+            dialog.report_exported.disconnect(received.append)
         assert received == ["/test.txt"]
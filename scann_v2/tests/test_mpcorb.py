@@ -18,6 +18,18 @@ class TestMpcorbParser:
         orbit = _parse_mpcorb_line(self.SAMPLE_MPCORB_LINE)
         assert orbit is not None
         assert orbit.designation == "00001"
+        assert orbit.epoch > 0.0  # epoch应该被正确解析，不再是0.0
+
+    @pytest.mark.parametrize("line", [
+        "",
+        "too short",
+        # 不足 160 列的行在切片/转换之前就被长度检查挡掉
+        SAMPLE_MPCORB_LINE[:159],
+    ], ids=["empty", "short", "truncated"])
+    def test_unparseable_line_returns_none(self, line):
+        from scann.core.mpcorb import _parse_mpcorb_line
+
+        assert _parse_mpcorb_line(line) is None
 
     def test_filter_by_magnitude(self):
         from scann.core.mpcorb import AsteroidOrbit, filter_by_magnitude
@@ -38,46 +50,16 @@ class TestMpcorbParser:
         assert len(bright) == 1
         assert bright[0].designation == "00001"
 
-    def test_empty_line_returns_none(self):
-        from scann.core.mpcorb import _parse_mpcorb_line
-
-        result = _parse_mpcorb_line("")
-        assert result is None
-
-    def test_short_line_returns_none(self):
-        from scann.core.mpcorb import _parse_mpcorb_line
-
-        result = _parse_mpcorb_line("too short")
-        assert result is None
-
-    def test_unpack_epoch_k249a(self):
-        """测试解包packed epoch格式 K249A"""
+    @pytest.mark.parametrize("packed,min_jd", [
+        # K = 2000s, 24 = 2024, 9A = 9月10日; 2024年9月的JD大约是2460580
+        ("K249A", 2460000),
+        # J = 1900s, 83 = 1983, 00 = 年初; 1983年初的JD大约是2445300
+        ("J8300", 2440000),
+    ])
+    def test_unpack_epoch(self, packed, min_jd):
+        """测试解包packed epoch格式"""
         from scann.core.mpcorb import _unpack_packed_epoch
 
-        # K249A = K(2000s) + 24(年份) + 9A(月日分数)
-        # K = 2000s century prefix
-        # 24 = 2024
-        # 9A = 9.x (需要解析为月份/日)
-        jd = _unpack_packed_epoch("K249A")
-        # 2024年9月某日，JD应该在2460000附近
+        jd = _unpack_packed_epoch(packed)
         assert isinstance(jd, float)
-        assert jd > 2460000  # 2024年9月的JD大约是2460580
-
-    def test_unpack_epoch_j8300(self):
-        """测试解包packed epoch格式 J8300 (旧格式示例)"""
-        from scann.core.mpcorb import _unpack_packed_epoch
-
-        # J = 1900s century prefix
-        # 83 = 1983
-        # 00 = 年初
-        jd = _unpack_packed_epoch("J8300")
-        assert isinstance(jd, float)
-        assert jd > 2440000  # 1983年初的JD大约是2445300
-
-    def test_epoch_is_set_in_parsed_orbit(self):
-        """测试解析后epoch被正确设置"""
-        from scann.core.mpcorb import _parse_mpcorb_line
-
-        orbit = _parse_mpcorb_line(self.SAMPLE_MPCORB_LINE)
-        assert orbit is not None
-        assert orbit.epoch > 0.0  # epoch应该被正确解析，不再是0.0
+        assert jd > min_jd
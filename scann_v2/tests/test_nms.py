@@ -1,10 +1,20 @@
 """NMS 和 IoU 计算测试"""
 
+import numpy as np
 import pytest
-from scann.ai.inference import InferenceEngine
+from scann.ai.inference import InferenceConfig, InferenceEngine, _nms_numpy
 from scann.core.models import Detection, MarkerType
 
 
+def _reference_iou(b1, b2) -> float:
+    """逐对纯 Python IoU (独立于被测实现的参照)"""
+    iw = max(0.0, min(b1[2], b2[2]) - max(b1[0], b2[0]))
+    ih = max(0.0, min(b1[3], b2[3]) - max(b1[1], b2[1]))
+    inter = iw * ih
+    union = (b1[2] - b1[0]) * (b1[3] - b1[1]) + (b2[2] - b2[0]) * (b2[3] - b2[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
 class TestNMS:
     """测试非极大值抑制"""
 
@@ -84,9 +94,226 @@ class TestNMS:
         assert len(result_high) == 2
 
 
+class TestNMSNumpy:
+    """测试 NumPy 向量化 NMS"""
+
+    def test_nms_numpy_empty(self):
+        keep = _nms_numpy(np.zeros((0, 4)), np.zeros(0), 0.5)
+        assert keep.size == 0
+
+    def test_nms_numpy_matches_pairwise_reference(self):
+        """测试：与逐对纯 Python IoU 的贪心 NMS 结果一致"""
+        rng = np.random.default_rng(0)
+        xy = rng.integers(0, 500, size=(60, 2))
+        wh = rng.integers(20, 120, size=(60, 2))
+        boxes = np.concatenate([xy, xy + wh], axis=1).astype(np.float64)
+        scores = rng.random(60)
+
+        order = list(np.argsort(-scores, kind="stable"))
+        expected = []
+        while order:
+            i = order.pop(0)
+            expected.append(i)
+            order = [j for j in order
+                     if _reference_iou(boxes[i], boxes[j]) < 0.3]
+
+        assert _nms_numpy(boxes, scores, 0.3).tolist() == expected
+
+    def test_nms_numpy_same_size_matches_general(self):
+        """测试：等尺寸框的特化 IoU 与通用 IoU 结果一致"""
+        rng = np.random.default_rng(1)
+        xy = (rng.integers(0, 20, size=(80, 2)) * 28).astype(np.float64)
+        boxes = np.concatenate([xy, xy + 224], axis=1)
+        scores = rng.random(80)
+        # 追加一个不同尺寸的框强制走通用路径, 且置信度最低不影响其他框
+        general_boxes = np.vstack([boxes, [10000, 10000, 10001, 10001]])
+        general_scores = np.append(scores, -1.0)
+
+        same = _nms_numpy(boxes, scores, 0.5).tolist()
+        general = _nms_numpy(general_boxes, general_scores, 0.5).tolist()
+
+        assert same == general[:-1]
+
+
+class TestNMSMatrix:
+    """测试上三角抑制矩阵 NMS"""
+
+    def test_empty(self):
+        from scann.ai.inference import _nms_matrix
+
+        assert _nms_matrix(np.zeros((0, 4)), np.zeros(0), 0.5).size == 0
+
+    @pytest.mark.parametrize("span", [300, 4000], ids=["dense", "sparse"])
+    def test_matches_greedy(self, span):
+        """测试：与逐轮广播的 _nms_numpy 逐索引一致 (含置信度并列)"""
+        from scann.ai.inference import _nms_matrix
+
+        rng = np.random.default_rng(6)
+        xy = rng.integers(0, span, size=(200, 2))
+        wh = rng.integers(20, 120, size=(200, 2))
+        boxes = np.concatenate([xy, xy + wh], axis=1).astype(np.float64)
+        scores = rng.integers(0, 20, size=200) / 20.0
+
+        assert _nms_matrix(boxes, scores, 0.3).tolist() == _nms_numpy(boxes, scores, 0.3).tolist()
+
+
+class TestIoUBelow:
+    """测试免除法的 IoU 阈值比较"""
+
+    def test_matches_division(self):
+        """测试：与 inter / union < 阈值 结果一致"""
+        from scann.ai.inference import _iou_below
+
+        rng = np.random.default_rng(5)
+        union = rng.integers(1, 1000, size=500).astype(np.float64)
+        inter = np.floor(rng.random(500) * union)
+        for t in (0.1, 0.3, 0.5, 0.9):
+            assert (_iou_below(inter, union, t, False) == (inter / union < t)).all()
+
+    def test_zero_union_counts_as_zero_iou(self):
+        """测试：零面积框 (union = 0) 的 IoU 视为 0"""
+        from scann.ai.inference import _iou_below
+
+        zero = np.zeros(1)
+        assert _iou_below(zero, zero, 0.5).tolist() == [True]
+        assert _iou_below(zero, zero, 0.0).tolist() == [False]
+
+    def test_zero_area_boxes_kept(self):
+        """测试：两个零面积框不会互相抑制"""
+        boxes = np.array([[10, 10, 10, 10], [10, 10, 10, 10]], dtype=np.float64)
+        assert _nms_numpy(boxes, np.array([0.9, 0.8]), 0.5).tolist() == [0, 1]
+
+
+class TestNMSNumba:
+    """测试 Numba JIT NMS 内核 (可选依赖)"""
+
+    def test_large_input_matches_numpy(self):
+        """测试：超过 JIT 阈值的检测数, _nms 结果与 NumPy 实现一致 (无 numba 时走回退路径)"""
+        engine = InferenceEngine.__new__(InferenceEngine)
+        rng = np.random.default_rng(3)
+        xy = rng.integers(0, 2000, size=(300, 2))
+        detections = [
+            Detection(x=int(x), y=int(y), confidence=float(c), width=100, height=80,
+                      marker_type=MarkerType.BOUNDING_BOX)
+            for (x, y), c in zip(xy, rng.random(300))
+        ]
+        boxes = np.array([(d.x - 50, d.y - 40, d.x + 50, d.y + 40) for d in detections], dtype=np.float64)
+        scores = np.array([d.confidence for d in detections])
+
+        expected = [detections[i] for i in _nms_numpy(boxes, scores, 0.4)]
+        assert engine._nms(detections, 0.4) == expected
+
+    def test_kernel_matches_numpy(self):
+        """测试：不同尺寸框上 JIT 内核与 NumPy 实现逐索引一致"""
+        pytest.importorskip("numba")
+        from scann.ai._nms_numba import nms_numba
+
+        rng = np.random.default_rng(4)
+        xy = rng.integers(0, 500, size=(200, 2))
+        wh = rng.integers(10, 120, size=(200, 2))
+        boxes = np.concatenate([xy, xy + wh], axis=1).astype(np.float64)
+        scores = rng.random(200)
+
+        assert nms_numba(boxes, scores, 0.3).tolist() == _nms_numpy(boxes, scores, 0.3).tolist()
+
+
+class TestTiledNMS:
+    """测试两级（分块）NMS"""
+
+    def _make_engine(self, **kwargs):
+        engine = InferenceEngine.__new__(InferenceEngine)
+        engine.config = InferenceConfig(**kwargs)
+        return engine
+
+    def test_tiled_nms_empty_list(self):
+        """测试：空列表"""
+        engine = self._make_engine()
+        assert engine._tiled_nms([], 0.5, 1000) == []
+
+    def test_tiled_nms_matches_global_nms(self):
+        """测试：跨分块边缘的重叠框仍被合并，与全局 NMS 结果一致"""
+        engine = self._make_engine()
+        detections = [
+            # 跨越 x=1000 分块边缘的一组重叠框
+            Detection(x=995, y=500, confidence=0.9, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+            Detection(x=1005, y=500, confidence=0.8, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+            # 分块内部的独立框
+            Detection(x=500, y=500, confidence=0.7, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+            Detection(x=1500, y=500, confidence=0.6, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+        ]
+
+        tiled = engine._tiled_nms(detections, 0.5, 1000)
+        flat = engine._nms(detections, 0.5)
+
+        assert [d.confidence for d in tiled] == [d.confidence for d in flat]
+
+    def test_tiled_nms_keeps_all_non_overlapping(self):
+        """测试：>pre_nms_topk 个互不抑制的滑动窗口全部保留, 与全局 NMS 一致"""
+        engine = self._make_engine(pre_nms_topk=400)
+        rng = np.random.default_rng(7)
+        # 30×30 网格, 步长 112、框 224: 相邻窗口 IoU = 1/3 < 0.5, 互不抑制
+        detections = [
+            Detection(x=112 * i + 112, y=112 * j + 112, confidence=float(c), width=224, height=224,
+                      marker_type=MarkerType.BOUNDING_BOX)
+            for (i, j), c in zip(np.ndindex(30, 30), rng.random(900))
+        ]
+        assert len(detections) > engine.config.pre_nms_topk
+
+        tiled = engine._tiled_nms(detections, 0.5, engine.config.nms_tile_size)
+        flat = engine._nms(detections, 0.5)
+
+        assert len(flat) == 900
+        assert sorted((d.x, d.y) for d in tiled) == sorted((d.x, d.y) for d in flat)
+
+    def test_apply_nms_default_is_global(self):
+        """测试：默认配置下即使检测很多也走全局 NMS, 跨分块边缘的抑制链结果不变"""
+        engine = self._make_engine()
+        detections = [
+            # A 抑制 B, 因此 C 在全局 NMS 中保留; 分块内 B 会先抑制 C
+            Detection(x=970, y=500, confidence=0.9, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+            Detection(x=1000, y=500, confidence=0.8, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+            Detection(x=1030, y=500, confidence=0.7, width=100, height=100, marker_type=MarkerType.BOUNDING_BOX),
+        ]
+        # 大量互不重叠的框, 数量超过旧的默认 pre_nms_topk (400)
+        detections += [
+            Detection(x=2000 + 200 * i, y=2000 + 200 * j, confidence=0.5, width=100, height=100,
+                      marker_type=MarkerType.BOUNDING_BOX)
+            for i, j in np.ndindex(25, 25)
+        ]
+
+        result = engine._apply_nms(detections, 0.5)
+        flat = engine._nms(detections, 0.5)
+
+        assert [(d.x, d.y) for d in result] == [(d.x, d.y) for d in flat]
+        assert (1030, 500) in {(d.x, d.y) for d in result}
+
+    def test_tiled_nms_post_topk_per_tile(self):
+        """测试：每个分块最多保留 post_nms_topk_per_tile 个结果"""
+        engine = self._make_engine(post_nms_topk_per_tile=2)
+        detections = [
+            Detection(x=200 + 200 * i, y=500, confidence=0.9 - 0.1 * i, width=100, height=100,
+                      marker_type=MarkerType.BOUNDING_BOX)
+            for i in range(4)
+        ]
+
+        result = engine._tiled_nms(detections, 0.5, 1000)
+
+        assert [d.confidence for d in result] == pytest.approx([0.9, 0.8])
+
+
 class TestIoUCalculation:
     """测试 IoU 计算"""
 
+    def test_iou_matches_reference(self):
+        """测试：随机框对与纯 Python 参照一致"""
+        engine = InferenceEngine.__new__(InferenceEngine)
+        rng = np.random.default_rng(2)
+        for _ in range(50):
+            xy = rng.integers(-50, 200, size=(2, 2))
+            wh = rng.integers(1, 150, size=(2, 2))
+            b1, b2 = np.concatenate([xy, xy + wh], axis=1).tolist()
+            assert engine._calculate_iou(b1, b2) == pytest.approx(_reference_iou(b1, b2))
+
     def test_iou_identical_boxes(self):
         """测试：相同的边界框"""
         engine = InferenceEngine.__new__(InferenceEngine)